@@ -0,0 +1,66 @@
+"""
+Description:
+    Compare a sequential iter_trades walk with the parallel TradeBackfill against local stub nodes answering
+    get_trades with a fixed latency per request.
+Usage:
+    python -m benchmarks.bench_backfill [--trades 20000] [--latency 0.02] [--nodes 2] [--workers 16]
+"""
+
+import argparse
+import time
+
+from tradehub.backfill import TradeBackfill
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+
+def trade_route(total: int):
+    trades = [{"id": str(n), "market": "swth_eth1", "price": "0.0001", "quantity": "100"}
+              for n in range(total, 0, -1)]
+
+    def get_trades(query: dict) -> list:
+        before_id = int(query.get("before_id", total + 1))
+        after_id = int(query.get("after_id", 0))
+        limit = min(int(query.get("limit", 200)), 200)
+        # trades are sorted newest first, trade n is at index total - n
+        start = max(0, total + 1 - before_id)
+        return [trade for trade in trades[start:start + limit] if int(trade["id"]) > after_id]
+    return get_trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trades', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--nodes', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--range-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    route = trade_route(args.trades)
+    servers = [StubServer(routes={'/get_trades': route}, latency=args.latency).start() for _ in range(args.nodes)]
+    try:
+        clients = [PublicClient(uri=server.url) for server in servers]
+
+        start = time.perf_counter()
+        rows = sum(1 for _ in clients[0].iter_trades(prefetch=False))
+        elapsed = time.perf_counter() - start
+        print(f"{'sequential':<24}{rows / elapsed:>12.1f} rows/s{elapsed:>10.2f}s")
+
+        start = time.perf_counter()
+        rows = sum(1 for _ in clients[0].iter_trades())
+        elapsed = time.perf_counter() - start
+        print(f"{'sequential prefetch':<24}{rows / elapsed:>12.1f} rows/s{elapsed:>10.2f}s")
+
+        backfill = TradeBackfill(clients, workers=args.workers, range_size=args.range_size)
+        rows = sum(1 for _ in backfill.iter_trades())
+        stats = backfill.stats
+        print(f"{'backfill':<24}{stats.rows_per_second:>12.1f} rows/s{stats.elapsed:>10.2f}s"
+              f"  {rows} rows, {stats.requests} requests, {len(stats.gaps)} gaps")
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
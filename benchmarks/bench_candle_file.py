@@ -0,0 +1,69 @@
+"""
+Description:
+    Repeated backtest reads of a 1 minute candle series: decoding the cached get_candlesticks JSON and converting
+    it to columns on every run compared to mapping a CandleFile and slicing a window by binary search. Also
+    measures appending one new candle at a time.
+Usage:
+    python -m benchmarks.bench_candle_file [--candles 525600] [--runs 5] [--appends 1000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from datetime import timedelta
+
+from benchmarks.bench_columns import distinct_times
+from benchmarks.bench_json_decode import candlesticks
+from tradehub.candle_file import CandleFile
+from tradehub.columns import candles_to_columns
+from tradescan.utils import DEFAULT_DECODER
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--candles', type=int, default=525600)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--appends', type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = distinct_times(candlesticks(args.candles + args.appends), "time", timedelta(minutes=1), False)
+    history, new = rows[:args.candles], rows[args.candles:]
+    body = json.dumps(history).encode()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "swth_eth1-1.candles")
+        CandleFile(path, resolution=1).append(history)
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            columns = candles_to_columns(DEFAULT_DECODER(body))
+            window = columns["close"][len(history) // 2:]
+        json_time = (time.perf_counter() - start) / args.runs
+
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            candle_file = CandleFile(path)
+            middle = int(candle_file.records['time'][len(history) // 2])
+            mapped = candle_file.between(middle)["close"]
+        mmap_time = (time.perf_counter() - start) / args.runs
+        assert mapped.tolist() == window.tolist()
+
+        start = time.perf_counter()
+        for row in new:
+            candle_file.append([row])
+        append_time = (time.perf_counter() - start) / len(new)
+        assert len(candle_file) == len(rows)
+        size = os.path.getsize(path)
+
+    print(f"{args.candles} candles, {len(body) / 2 ** 20:.1f} MiB JSON, {size / 2 ** 20:.1f} MiB candle file")
+    print(f"{'':<18}{'ms/run':>10}")
+    for name, elapsed in (("decode JSON", json_time), ("mmap candle file", mmap_time),
+                          ("append 1 candle", append_time)):
+        print(f"{name:<18}{elapsed * 1000:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Description:
+    Reproducible client throughput benchmark. Replays a cassette through a local StubServer with configurable
+    latency and jitter and requests every recorded interaction with different client setups.
+Usage:
+    python -m benchmarks.record_cassette --node 85.214.91.220 --tradehub tradehub.json
+    python -m benchmarks.bench_clients tradehub.json [--rounds 5] [--latency 0.02] [--jitter 0.01] [--threads 16]
+"""
+
+import argparse
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tradescan.cassette import Cassette
+from tradescan.stub_server import StubServer
+from tradescan.utils import AsyncRequest, Request
+
+
+def sequential(request: Request, calls: list) -> None:
+    for path, params in calls:
+        request.get(path, params=params)
+
+
+def threaded(request: Request, calls: list, threads: int) -> None:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda call: request.get(call[0], params=call[1]), calls))
+
+
+def concurrent(request: AsyncRequest, calls: list) -> None:
+    async def run():
+        await asyncio.gather(*[request.get(path, params=params) for path, params in calls])
+    asyncio.run(run())
+    request.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('cassette', help="cassette file recorded with benchmarks.record_cassette")
+    parser.add_argument('--rounds', type=int, default=5, help="requests per recorded interaction")
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    cassette = Cassette.load(args.cassette)
+    interactions = [cassette.find('GET', path, exact=False) for path in cassette.paths()]
+    calls = [(interaction.path, dict(interaction.query)) for interaction in interactions
+             if interaction is not None and interaction.status == 200] * args.rounds
+
+    with StubServer(cassette=cassette, latency=args.latency, jitter=args.jitter, seed=args.seed) as server:
+        setups = [
+            ("sequential unpooled", lambda: sequential(Request(api_url=server.url, pooled=False), calls)),
+            ("sequential pooled", lambda: sequential(Request(api_url=server.url), calls)),
+            (f"{args.threads} threads pooled", lambda: threaded(
+                Request(api_url=server.url, pool_maxsize=args.threads), calls, args.threads)),
+            (f"async {args.threads} in flight", lambda: concurrent(
+                AsyncRequest(api_url=server.url, max_concurrency=args.threads), calls)),
+        ]
+        print(f"{len(calls)} requests over {len(interactions)} paths, latency {args.latency}s, jitter {args.jitter}s")
+        for name, run in setups:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<24}{len(calls) / elapsed:>10.1f} req/s{elapsed:>10.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Description:
+    Vectorized columnar conversion of candlesticks and trades compared to converting row by row, for float64
+    columns and for exact int64 columns scaled to 8 decimals. Every row gets its own timestamp, so the cache
+    of parse_timestamp does not hide the cost of the per row conversion.
+Usage:
+    python -m benchmarks.bench_columns [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from benchmarks.bench_json_decode import candlesticks, trades
+from tradehub.columns import CANDLE_PRICE_COLUMNS, TRADE_PRICE_COLUMNS, candles_to_columns, trades_to_columns
+from tradehub.utils import parse_timestamp
+
+
+def distinct_times(rows: list, field: str, step: timedelta, fraction: bool) -> list:
+    start = datetime(2021, 1, 9, 15, 35, tzinfo=timezone(timedelta(hours=1)))
+    for i, row in enumerate(rows):
+        row[field] = (start + i * step).isoformat(timespec='microseconds' if fraction else 'seconds')
+    return rows
+
+
+def per_row(rows: list, time_field: str, price_fields: tuple, scale=None) -> dict:
+    if scale is None:
+        number = float
+    else:
+        def number(value):
+            return int(Decimal(value).scaleb(scale))
+    columns = {"id": [int(row["id"]) for row in rows],
+               time_field: [int(parse_timestamp(row[time_field])) for row in rows]}
+    for field in price_fields:
+        columns[field] = [number(row[field]) for row in rows]
+    return columns
+
+
+def measure(convert, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        convert()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    candle_rows = distinct_times(candlesticks(args.rows), "time", timedelta(minutes=1), fraction=False)
+    trade_rows = distinct_times(trades(args.rows), "block_created_at", timedelta(seconds=2.000137), fraction=True)
+    cases = (
+        ("candles float64", lambda: per_row(candle_rows, "time", CANDLE_PRICE_COLUMNS),
+         lambda: candles_to_columns(candle_rows)),
+        ("candles int64 1e8", lambda: per_row(candle_rows, "time", CANDLE_PRICE_COLUMNS, scale=8),
+         lambda: candles_to_columns(candle_rows, scale=8)),
+        ("trades float64", lambda: per_row(trade_rows, "block_created_at", TRADE_PRICE_COLUMNS),
+         lambda: trades_to_columns(trade_rows, unit='s')),
+        ("trades int64 1e8", lambda: per_row(trade_rows, "block_created_at", TRADE_PRICE_COLUMNS, scale=8),
+         lambda: trades_to_columns(trade_rows, scale=8, unit='s')),
+    )
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'':<20}{'per row s':>12}{'columnar s':>12}{'speedup':>10}")
+    for name, rows_convert, columns_convert in cases:
+        rows_time = measure(rows_convert, args.repeat)
+        columns_time = measure(columns_convert, args.repeat)
+        print(f"{name:<20}{rows_time:>12.3f}{columns_time:>12.3f}{rows_time / columns_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Description:
+    Micro-benchmark of decode time per endpoint payload shape for the stdlib json module, orjson (if installed)
+    and the raw mode which skips decoding.
+Usage:
+    python -m benchmarks.bench_json_decode [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def trades(rows: int) -> list:
+    return [{
+        "id": str(100000 + i),
+        "block_created_at": "2021-01-10T21:59:53.563633+01:00",
+        "taker_id": "11DCD0B7B0A0021476B8C801FD627B297EBDBBE7436BFEEC5ADB734DCF3C9291",
+        "taker_address": "swth1qlue2pat9cxx2s5xqrv0ashs475n9va963h4hz",
+        "taker_fee_amount": "0.000007",
+        "taker_fee_denom": "eth1",
+        "taker_side": "buy",
+        "maker_id": "A59962E7A61F361F7DE5BF00D7A6A8225668F449D73301FB9D3787E4C13DEE60",
+        "maker_address": "swth1wmcj8gmz4tszy5v8c0d9lxnmguqcdkw22275w5",
+        "maker_fee_amount": "-0.0000035",
+        "maker_fee_denom": "eth1",
+        "maker_side": "sell",
+        "market": "eth1_usdc1",
+        "price": "1251.51",
+        "quantity": "0.007",
+        "liquidation": "",
+        "taker_username": "devel484",
+        "maker_username": "",
+        "block_height": str(6156871 + i),
+    } for i in range(rows)]
+
+
+def rich_list(rows: int) -> list:
+    return [{"address": "swth1qlue2pat9cxx2s5xqrv0ashs475n9va963h4hz", "amount": str(64752601707981 - i)}
+            for i in range(rows)]
+
+
+def total_balances(rows: int) -> list:
+    return [{"denom": f"token{i}", "available": "1234567890.12345678", "order": "0", "position": "0",
+             "total": "1234567890.12345678"} for i in range(rows)]
+
+
+def candlesticks(rows: int) -> list:
+    return [{"id": 38648 + i, "market": "swth_eth1", "time": "2021-01-09T15:35:00+01:00", "resolution": 1,
+             "open": "0.0000212", "close": "0.0000212", "high": "0.0000212", "low": "0.0000212",
+             "volume": "2100", "quote_volume": "0.04452"} for i in range(rows)]
+
+
+PAYLOADS = {
+    "get_trades (200 rows)": trades(200),
+    "get_rich_list (20000 rows)": rich_list(20000),
+    "get_total_balances (500 rows)": total_balances(500),
+    "get_candlesticks (1440 rows)": candlesticks(1440),
+}
+
+
+def measure(decoder, body: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        decoder(body)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    decoders = {"json": json.loads, "raw": bytes}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+
+    print(f"{'payload':<32}{'size':>10}" + "".join(f"{name:>12}" for name in decoders))
+    for name, payload in PAYLOADS.items():
+        body = json.dumps(payload).encode('utf-8')
+        timings = [measure(decoder, body, args.repeat) * 1000 for decoder in decoders.values()]
+        print(f"{name:<32}{len(body) // 1024:>8}kB" + "".join(f"{timing:>10.3f}ms" for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Description:
+    Incremental OrderBook updates and queries compared to parsing and sorting every get_orderbook snapshot
+    in full. Each poll changes a few levels of a deep book and asks for best bid/ask, depth and VWAP.
+Usage:
+    python -m benchmarks.bench_orderbook [--levels 2000] [--polls 500] [--changes 10]
+"""
+
+import argparse
+import random
+import time
+
+from decimal import Decimal
+
+from tradehub.amounts import from_base_units
+from tradehub.orderbook import OrderBook
+
+
+def snapshots(levels: int, polls: int, changes: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    asks = {f"{0.0000214 + i * 1e-10:.10f}": str(rng.randint(1, 50000)) for i in range(levels)}
+    bids = {f"{0.0000212 - i * 1e-10:.10f}": str(rng.randint(1, 50000)) for i in range(levels)}
+    result = []
+    for _ in range(polls):
+        for _ in range(changes):
+            side = asks if rng.random() < 0.5 else bids
+            side[rng.choice(list(side))] = str(rng.randint(1, 50000))
+        result.append({"asks": [{"price": price, "quantity": quantity} for price, quantity in asks.items()],
+                       "bids": [{"price": price, "quantity": quantity} for price, quantity in bids.items()]})
+    return result
+
+
+def full_rebuild(snapshot: dict, size: Decimal) -> tuple:
+    asks = sorted((Decimal(level["price"]), Decimal(level["quantity"])) for level in snapshot["asks"])
+    bids = sorted(((Decimal(level["price"]), Decimal(level["quantity"])) for level in snapshot["bids"]),
+                  reverse=True)
+    remaining, notional = size, Decimal(0)
+    for price, quantity in asks:
+        filled = min(remaining, quantity)
+        notional += filled * price
+        remaining -= filled
+        if not remaining:
+            break
+    depth = sum(quantity for price, quantity in asks if price <= asks[len(asks) // 2][0])
+    return bids[0], asks[0], depth, notional / size
+
+
+def incremental(book: OrderBook, snapshot: dict, size: Decimal) -> tuple:
+    book.update(snapshot)
+    asks = book.sides["asks"]
+    middle = from_base_units(asks.price(len(asks) // 2), book.price_scale)
+    return book.best_bid(), book.best_ask(), book.depth("asks", middle), book.vwap("asks", size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--levels', type=int, default=2000)
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument('--changes', type=int, default=10)
+    args = parser.parse_args()
+
+    polls = snapshots(args.levels, args.polls, args.changes)
+    size = Decimal(1000000)
+
+    start = time.perf_counter()
+    expected = [full_rebuild(snapshot, size) for snapshot in polls]
+    full_time = time.perf_counter() - start
+
+    book = OrderBook()
+    start = time.perf_counter()
+    results = [incremental(book, snapshot, size) for snapshot in polls]
+    incremental_time = time.perf_counter() - start
+    assert [result[2:] for result in results] == [result[2:] for result in expected]
+
+    print(f"{args.polls} polls of {args.levels} levels per side, {args.changes} changed levels per poll")
+    print(f"{'':<14}{'total s':>10}{'ms/poll':>10}")
+    for name, elapsed in (("full rebuild", full_time), ("incremental", incremental_time)):
+        print(f"{name:<14}{elapsed:>10.3f}{elapsed / args.polls * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
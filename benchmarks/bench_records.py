@@ -0,0 +1,61 @@
+"""
+Description:
+    Memory use, build time and field access speed of Trade records compared to the decoded JSON dicts.
+    Trades are decoded from a JSON payload like a node response, so every dict holds its own strings.
+Usage:
+    python -m benchmarks.bench_records [--trades 200000]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.bench_json_decode import trades
+from tradehub.records import Trade
+
+
+def measure(build) -> tuple:
+    """
+    Retained memory and build time of the object returned by build, timed without tracing.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trades', type=int, default=200000)
+    args = parser.parse_args()
+
+    payload = json.dumps(trades(args.trades)).encode('utf-8')
+
+    dicts, dict_size, dict_time = measure(lambda: json.loads(payload))
+    records, record_size, record_time = measure(lambda: Trade.from_list(json.loads(payload)))
+
+    start = time.perf_counter()
+    dict_notional = sum(float(trade["price"]) * float(trade["quantity"]) for trade in dicts)
+    dict_access = time.perf_counter() - start
+    start = time.perf_counter()
+    record_notional = sum(trade.price * trade.quantity for trade in records)
+    record_access = time.perf_counter() - start
+    assert abs(dict_notional - record_notional) < 1e-6 * abs(dict_notional)
+
+    print(f"{args.trades} trades")
+    print(f"{'':<10}{'memory MiB':>12}{'bytes/trade':>13}{'build s':>10}{'notional s':>12}")
+    for name, size, build, access in (("dicts", dict_size, dict_time, dict_access),
+                                      ("records", record_size, record_time, record_access)):
+        print(f"{name:<10}{size / 2 ** 20:>12.1f}{size / args.trades:>13.0f}{build:>10.3f}{access:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
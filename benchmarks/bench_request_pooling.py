@@ -0,0 +1,43 @@
+"""
+Description:
+    Compare pooled (keep-alive) and unpooled Request modes against a local stub server.
+Usage:
+    python -m benchmarks.bench_request_pooling [--requests 2000] [--threads 8]
+"""
+
+import argparse
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from tradescan.stub_server import StubServer
+from tradescan.utils import Request
+
+
+def run(request: Request, total: int, threads: int) -> float:
+    """
+    Fire 'total' GET requests spread over 'threads' threads and return the elapsed wall time.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: request.get(path='/get_block_time'), range(total)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    with StubServer(routes={'/get_block_time': "00:00:02.190211"}) as server:
+        for pooled in (False, True):
+            connections = server.connections
+            request = Request(api_url=server.url, pooled=pooled, pool_maxsize=args.threads)
+            elapsed = run(request, args.requests, args.threads)
+            print(f"{'pooled' if pooled else 'unpooled':>8}: {args.requests / elapsed:8.0f} req/s, "
+                  f"{elapsed:6.2f}s, {server.connections - connections} connections opened")
+
+
+if __name__ == '__main__':
+    main()
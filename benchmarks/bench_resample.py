@@ -0,0 +1,52 @@
+"""
+Description:
+    Local candle building: resampling 1 minute candles to 4 hour candles as dicts with exact sums and as
+    candle file records with NumPy reductions, and aggregating a trade stream to 1 minute candles.
+Usage:
+    python -m benchmarks.bench_resample [--candles 100000] [--trades 200000]
+"""
+
+import argparse
+import time
+
+from datetime import timedelta
+
+from benchmarks.bench_columns import distinct_times
+from benchmarks.bench_json_decode import candlesticks, trades
+from tradehub.candle_file import candles_to_records
+from tradehub.resample import CandleAggregator, resample_candles, resample_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--candles', type=int, default=100000)
+    parser.add_argument('--trades', type=int, default=200000)
+    args = parser.parse_args()
+
+    minutes = distinct_times(candlesticks(args.candles), "time", timedelta(minutes=1), False)
+    records = candles_to_records(minutes)
+    stream = distinct_times(trades(args.trades), "block_created_at", timedelta(seconds=3), True)
+
+    results = []
+    start = time.perf_counter()
+    candles = resample_candles(minutes, 240)
+    results.append(("resample dicts", time.perf_counter() - start, args.candles))
+
+    start = time.perf_counter()
+    resampled = resample_records(records, 240)
+    results.append(("resample records", time.perf_counter() - start, args.candles))
+    assert len(resampled) == len(candles)
+
+    aggregator = CandleAggregator(1)
+    start = time.perf_counter()
+    aggregator.add_all(stream)
+    aggregator.flush()
+    results.append(("aggregate trades", time.perf_counter() - start, args.trades))
+
+    print(f"{'':<18}{'total s':>10}{'us/row':>10}")
+    for name, elapsed, rows in results:
+        print(f"{name:<18}{elapsed:>10.3f}{elapsed / rows * 10 ** 6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Description:
+    Startup cost of an analysis job: fetching the trade history from a node compared to reopening a synced
+    TradeStore and reading the same history locally. The node is a local stub answering get_trades with a
+    fixed latency per request.
+Usage:
+    python -m benchmarks.bench_store [--trades 20000] [--latency 0.02]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_backfill import trade_route
+from tradehub.public_client import PublicClient
+from tradehub.store import TradeStore
+from tradescan.stub_server import StubServer
+
+
+def with_times(route):
+    def get_trades(query: dict) -> list:
+        return [dict(trade, block_created_at="2021-01-10T21:59:53.563633+01:00", block_height=trade["id"])
+                for trade in route(query)]
+    return get_trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trades', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    route = with_times(trade_route(args.trades))
+    with StubServer(routes={'/get_trades': route}, latency=args.latency) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        client = PublicClient(uri=server.url)
+        path = os.path.join(directory, "tradehub.sqlite")
+
+        start = time.perf_counter()
+        fetched = list(client.iter_trades())
+        fetch_time = time.perf_counter() - start
+
+        with TradeStore(path, client=client) as store:
+            start = time.perf_counter()
+            store.sync_trades()
+            sync_time = time.perf_counter() - start
+            start = time.perf_counter()
+            store.sync_trades()
+            incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with TradeStore(path) as store:
+            stored = store.trades()
+        read_time = time.perf_counter() - start
+        assert stored == fetched
+
+    print(f"{args.trades} trades, {args.latency * 1000:.0f} ms per request")
+    print(f"{'':<28}{'seconds':>10}")
+    for name, elapsed in (("fetch via iter_trades", fetch_time), ("first sync", sync_time),
+                          ("incremental sync", incremental_time), ("reopen store and read", read_time)):
+        print(f"{name:<28}{elapsed:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Description:
+    Compare indexing blocks one height per request with JSON-RPC batches against a local stub RPC answering
+    with a fixed latency per HTTP request.
+Usage:
+    python -m benchmarks.bench_tendermint_rpc [--heights 1000] [--latency 0.02] [--batch-size 100] [--workers 4]
+"""
+
+import argparse
+import time
+
+from tradehub.tendermint import TendermintRPCClient
+from tradescan.stub_server import StubServer
+
+
+def json_rpc(body):
+    def answer(call):
+        height = call["params"].get("height", "1")
+        return {"jsonrpc": "2.0", "id": call["id"],
+                "result": {"block": {"header": {"height": height}, "data": {"txs": []}}}}
+    return [answer(call) for call in body] if isinstance(body, list) else answer(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--heights', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as server:
+        server.add_post_route('/', json_rpc)
+        heights = range(1, args.heights + 1)
+
+        client = TendermintRPCClient(server.url)
+        start = time.perf_counter()
+        for height in heights:
+            client.block(height)
+        elapsed = time.perf_counter() - start
+        print(f"{'one height per request':<28}{args.heights / elapsed:>10.1f} blocks/s{elapsed:>10.2f}s")
+
+        for workers in (1, args.workers):
+            client = TendermintRPCClient(server.url, batch_size=args.batch_size, workers=workers)
+            start = time.perf_counter()
+            client.blocks(heights)
+            elapsed = time.perf_counter() - start
+            print(f"{f'batches, {workers} workers':<28}{args.heights / elapsed:>10.1f} blocks/s{elapsed:>10.2f}s"
+                  f"  {client.requests} requests")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Description:
+    Record the responses of every tradehub and tradescan PublicClient endpoint into cassette files, which
+    can be replayed offline with tradescan.stub_server.StubServer.
+Usage:
+    python -m benchmarks.record_cassette --node 85.214.91.220 --tradehub tradehub.json --tradescan tradescan.json
+"""
+
+import argparse
+
+from tradehub.public_client import PublicClient as TradehubPublicClient
+from tradescan.cassette import Cassette, RecordingSession
+from tradescan.public_client import PublicClient as TradescanPublicClient
+
+WALLET = "swth1vwges9p847l9csj8ehrlgzajhmt4fcq4sd7gzl"
+USERNAME = "devel484"
+MARKET = "swth_eth1"
+FUTURES_MARKET = "btc1_usdc1"
+VALCONS = "swthvalcons1pqnlj0na6k8u9y27j3elrx584mt3380dal0j9s"
+
+
+def tradehub_calls(client: TradehubPublicClient) -> list:
+    """
+    One example call per PublicClient method, ids and hashes are taken from earlier responses.
+    """
+    calls = [
+        ("get_account", lambda: client.get_account(WALLET)),
+        ("get_address", lambda: client.get_address(USERNAME)),
+        ("get_all_validators", client.get_all_validators),
+        ("get_balance", lambda: client.get_balance(WALLET)),
+        ("get_block_time", client.get_block_time),
+        ("get_blocks", client.get_blocks),
+        ("get_candlesticks", lambda: client.get_candlesticks(MARKET, 5, 1610203000, 1610203090)),
+        ("get_delegation_rewards", lambda: client.get_delegation_rewards(WALLET)),
+        ("get_external_transfers", lambda: client.get_external_transfers(WALLET)),
+        ("get_insurance_fund_balance", client.get_insurance_fund_balance),
+        ("get_leverage", lambda: client.get_leverage(WALLET, FUTURES_MARKET)),
+        ("get_liquidations", lambda: client.get_liquidations(None, None, None, 200)),
+        ("get_market", lambda: client.get_market(MARKET)),
+        ("get_market_stats", client.get_market_stats),
+        ("get_markets", client.get_markets),
+        ("get_oracle_results", client.get_oracle_results),
+        ("get_oracle_result", lambda: client.get_oracle_result("DXBT")),
+        ("get_orderbook", lambda: client.get_orderbook(MARKET)),
+        ("get_orders", client.get_orders),
+        ("get_order", lambda: client.get_order(client.get_orders(limit=1)[0]["order_id"])),
+        ("get_position", lambda: client.get_position(WALLET, FUTURES_MARKET)),
+        ("get_positions", lambda: client.get_positions(WALLET)),
+        ("get_positions_sorted_by_pnl", lambda: client.get_positions_sorted_by_pnl(FUTURES_MARKET)),
+        ("get_positions_sorted_by_risk", lambda: client.get_positions_sorted_by_risk(FUTURES_MARKET)),
+        ("get_positions_sorted_by_size", lambda: client.get_positions_sorted_by_size(FUTURES_MARKET)),
+        ("get_prices", lambda: client.get_prices(MARKET)),
+        ("get_profile", lambda: client.get_profile(WALLET)),
+        ("get_rich_list", lambda: client.get_rich_list("swth")),
+        ("get_status", client.get_status),
+        ("get_transactions", client.get_transactions),
+        ("get_transaction", lambda: client.get_transaction(client.get_transactions(limit=1)[0]["hash"])),
+        ("get_transaction_types", client.get_transaction_types),
+        ("get_token", lambda: client.get_token("swth")),
+        ("get_tokens", client.get_tokens),
+        ("get_top_r_profits", lambda: client.get_top_r_profits(FUTURES_MARKET, 10)),
+        ("get_total_balances", client.get_total_balances),
+        ("get_trades", client.get_trades),
+        ("get_username_check", lambda: client.get_username_check(USERNAME)),
+    ]
+    return calls
+
+
+def tradescan_calls(client: TradescanPublicClient) -> list:
+    calls = [
+        ("get_address_rewards", lambda: client.get_address_rewards(WALLET)),
+        ("get_address_staking", lambda: client.get_address_staking(WALLET)),
+        ("get_address_trades", lambda: client.get_address_trades(address=WALLET)),
+        ("get_all_validators", client.get_all_validators),
+        ("get_balance", lambda: client.get_balance(WALLET)),
+        ("get_blocks", client.get_blocks),
+        ("get_block_time", client.get_block_time),
+        ("get_commitment_curve", client.get_commitment_curve),
+        ("get_distribution_parameters", client.get_distribution_parameters),
+        ("get_external_transfers", lambda: client.get_external_transfers(WALLET)),
+        ("get_inflation_start_time", client.get_inflation_start_time),
+        ("get_latest_blocks", client.get_latest_blocks),
+        ("get_liquidity_pools", client.get_liquidity_pools),
+        ("get_liquidations", client.get_liquidations),
+        ("get_markets", client.get_markets),
+        ("get_orders", client.get_orders),
+        ("get_positions", lambda: client.get_positions(WALLET)),
+        ("get_profile", lambda: client.get_profile(WALLET)),
+        ("get_reward_curve", client.get_reward_curve),
+        ("get_rich_list", lambda: client.get_rich_list("swth")),
+        ("get_staking_pool", client.get_staking_pool),
+        ("get_token", lambda: client.get_token("swth")),
+        ("get_tokens", client.get_tokens),
+        ("get_total_balances", client.get_total_balances),
+        ("get_tradehub_monitor", client.get_tradehub_monitor),
+        ("get_transaction_fees", client.get_transaction_fees),
+        ("get_transaction_types", client.get_transaction_types),
+        ("get_transactions", client.get_transactions),
+        ("get_validator_signing_info", client.get_validator_signing_info),
+        ("get_validators", client.get_validators),
+    ]
+    return calls
+
+
+def record(calls: list, cassette: Cassette) -> None:
+    for name, call in calls:
+        try:
+            call()
+            print(f"recorded {name}")
+        except Exception as error:
+            print(f"failed   {name}: {error}")
+    print(f"{len(cassette)} interactions for {len(cassette.paths())} paths")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--node', help="ip of a tradehub node")
+    parser.add_argument('--node-port', type=int, default=5001)
+    parser.add_argument('--tradehub', default='tradehub.json', help="cassette file for tradehub responses")
+    parser.add_argument('--tradescan', help="cassette file for tradescan responses")
+    parser.add_argument('--tradescan-url', default='https://tradescan.switcheo.org')
+    args = parser.parse_args()
+
+    if args.node:
+        cassette = Cassette()
+        client = TradehubPublicClient(args.node, args.node_port)
+        client.request.http = RecordingSession(cassette, client.request.http)
+        record(tradehub_calls(client), cassette)
+        cassette.save(args.tradehub)
+
+    if args.tradescan:
+        cassette = Cassette()
+        client = TradescanPublicClient(api_url=args.tradescan_url)
+        client.request.http = RecordingSession(cassette, client.request.http)
+        # the constructor requests are made before recording starts
+        client.get_validator_public_nodes()
+        client.get_transaction_types()
+        record(tradescan_calls(client), cassette)
+        cassette.save(args.tradescan)
+
+
+if __name__ == '__main__':
+    main()
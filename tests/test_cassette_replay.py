@@ -0,0 +1,99 @@
+import os
+import tempfile
+import requests
+
+from unittest import TestCase
+
+from tradehub.public_client import PublicClient
+from tradescan.cassette import Cassette, Interaction, RecordingSession, normalize_query
+from tradescan.stub_server import StubServer
+from tradescan.utils import Request
+
+
+class TestCassetteReplay(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._file = os.path.join(self._directory.name, 'tradehub.json')
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_record_and_replay(self):
+        """
+        Check if responses recorded from a node are replayed identically after save and load.
+        :return:
+        """
+        tokens = [{"denom": "swth", "decimals": 8}]
+        cassette = Cassette()
+        with StubServer(routes={'/get_tokens': tokens, '/get_block_time': "00:00:02.190211"}) as server:
+            client = PublicClient(uri=server.url)
+            client.request.http = RecordingSession(cassette, client.request.http)
+            self.assertEqual(tokens, client.get_tokens())
+            self.assertEqual("00:00:02.190211", client.get_block_time())
+        self.assertEqual(['/get_block_time', '/get_tokens'], cassette.paths())
+        cassette.save(self._file)
+
+        with StubServer(cassette=Cassette.load(self._file)) as server:
+            client = PublicClient(uri=server.url)
+            self.assertEqual(tokens, client.get_tokens())
+            self.assertEqual("00:00:02.190211", client.get_block_time())
+
+    def test_query_matching(self):
+        """
+        Check if interactions are matched by query independent of parameter order and only fall back to the path
+        when asked to.
+        :return:
+        """
+        cassette = Cassette([
+            Interaction('GET', '/get_trades', normalize_query('market=swth_eth1&limit=1'), 200,
+                        'application/json', b'[{"id": "1"}]'),
+            Interaction('GET', '/get_trades', normalize_query('market=eth1_usdc1'), 200,
+                        'application/json', b'[{"id": "2"}]'),
+        ])
+        self.assertEqual(b'[{"id": "1"}]', cassette.find('GET', '/get_trades', normalize_query('limit=1&market=swth_eth1')).body)
+        self.assertIsNone(cassette.find('GET', '/get_trades', normalize_query('market=cel1_usdc1')))
+        self.assertEqual(b'[{"id": "1"}]', cassette.find('GET', '/get_trades', normalize_query('market=cel1_usdc1'),
+                                                         exact=False).body)
+        self.assertIsNone(cassette.find('GET', '/get_orders'))
+
+        with StubServer(cassette=cassette) as server:
+            request = Request(api_url=server.url)
+            self.assertEqual([{"id": "2"}], request.get('/get_trades', params={"market": "eth1_usdc1"}))
+            self.assertEqual([{"id": "1"}], request.get('/get_trades', params={"limit": 1, "market": "swth_eth1"}))
+            with self.assertRaises(requests.exceptions.HTTPError):
+                request.get('/get_orders')
+            # another page of a recorded endpoint is not answered with a recorded page
+            with self.assertRaises(requests.exceptions.HTTPError):
+                request.get('/get_trades', params={"market": "swth_eth1", "before_id": 1})
+
+        with StubServer(cassette=cassette, loose_matching=True) as server:
+            request = Request(api_url=server.url)
+            self.assertEqual([{"id": "1"}], request.get('/get_trades', params={"market": "cel1_usdc1"}))
+
+    def test_binary_body_roundtrip(self):
+        """
+        Check if non utf-8 bodies survive saving and loading.
+        :return:
+        """
+        body = bytes(range(256))
+        cassette = Cassette([Interaction('GET', '/blob', (), 200, 'application/octet-stream', body)])
+        cassette.save(self._file)
+        interaction = Cassette.load(self._file).find('GET', '/blob')
+        self.assertEqual(body, interaction.body)
+        self.assertEqual('application/octet-stream', interaction.content_type)
+
+    def test_reproducible_jitter(self):
+        """
+        Check if the same seed produces the same sequence of delays.
+        :return:
+        """
+        first = StubServer(latency=0.01, jitter=0.05, seed=7)
+        second = StubServer(latency=0.01, jitter=0.05, seed=7)
+        try:
+            delays = [first.delay() for _ in range(20)]
+            self.assertEqual(delays, [second.delay() for _ in range(20)])
+            self.assertTrue(all(0.01 <= delay <= 0.06 for delay in delays))
+        finally:
+            first.stop()
+            second.stop()
@@ -0,0 +1,128 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from tradehub.public_client import PublicClient
+from tradescan.ratelimit import AIMDController, RateLimiter, TokenBucket
+from tradescan.stub_server import StubServer
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiting(TestCase):
+
+    def test_token_bucket(self):
+        """
+        Check if the bucket allows a burst and then paces callers at its rate.
+        :return:
+        """
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+        self.assertEqual(0, bucket.acquire())
+        self.assertEqual(0, bucket.acquire())
+        self.assertAlmostEqual(0.1, bucket.acquire())
+        self.assertAlmostEqual(0.1, bucket.acquire())
+        clock.now += 10
+        self.assertEqual(0, bucket.acquire())
+
+    def test_rate_limiter_per_node_and_endpoint(self):
+        """
+        Check if node and endpoint buckets are kept separately per node.
+        :return:
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(node_rate=100, endpoint_rates={'/get_trades': (1, 1)}, clock=clock, sleep=clock.sleep)
+        self.assertEqual(0, limiter.acquire("http://a", '/get_trades'))
+        self.assertEqual(0, limiter.acquire("http://b", '/get_trades'))
+        self.assertEqual(0, limiter.acquire("http://a", '/get_tokens'))
+        self.assertAlmostEqual(1.0, limiter.acquire("http://a", '/get_trades'))
+        self.assertAlmostEqual(1.0, limiter.waited)
+
+    def test_aimd_increase_and_decrease(self):
+        """
+        Check if the limit grows while healthy and backs off once per latency target on overload.
+        :return:
+        """
+        clock = FakeClock()
+        controller = AIMDController(initial_limit=4, max_limit=6, latency_target=1.0, clock=clock)
+        for _ in range(4):
+            controller.acquire()
+        for _ in range(4):
+            controller.release(0.1)
+        self.assertAlmostEqual(4.9, controller.limit, places=1)
+        for _ in range(100):
+            controller.acquire()
+            controller.release(0.1)
+        self.assertEqual(6, controller.limit)
+
+        controller.acquire()
+        controller.acquire()
+        controller.release(0.1, overloaded=True)
+        controller.release(2.0)
+        self.assertEqual(3, controller.limit)
+        self.assertEqual(1, controller.decreases)
+        clock.now += 1
+        controller.acquire()
+        controller.release(0.1, overloaded=True)
+        self.assertEqual(1.5, controller.limit)
+        self.assertEqual(0, controller.in_flight)
+
+    def test_client_in_flight_limit(self):
+        """
+        Check if the controller bounds requests in flight and the limiter paces them.
+        :return:
+        """
+        with StubServer(routes={'/get_block_time': "00:00:02.190211"}, latency=0.05) as server:
+            controller = AIMDController(initial_limit=2, max_limit=2)
+            client = PublicClient(uri=server.url, concurrency=controller)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                start = time.perf_counter()
+                list(executor.map(lambda _: client.get_block_time(), range(8)))
+            self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+            self.assertEqual(0, controller.in_flight)
+
+            client = PublicClient(uri=server.url, rate_limiter=RateLimiter(node_rate=20, node_burst=1))
+            start = time.perf_counter()
+            for _ in range(5):
+                client.get_block_time()
+            self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+
+    def test_slot_released_on_any_error(self):
+        """
+        Check if the in flight slot is given back when the request fails with errors not caused by the node.
+        :return:
+        """
+        def interrupted(*args, **kwargs):
+            raise KeyboardInterrupt()
+
+        def failing_hook(event):
+            raise RuntimeError("hook failed")
+
+        with StubServer(routes={'/get_block_time': "00:00:02.190211"}) as server:
+            controller = AIMDController(initial_limit=1, max_limit=1)
+            client = PublicClient(uri=server.url, concurrency=controller)
+            get = client.request.http.get
+            client.request.http.get = interrupted
+            with self.assertRaises(KeyboardInterrupt):
+                client.get_block_time()
+            self.assertEqual(0, controller.in_flight)
+            client.request.http.get = get
+            client.request.hooks = [failing_hook]
+            with self.assertRaises(RuntimeError):
+                client.get_block_time()
+            self.assertEqual(0, controller.in_flight)
+            client.request.hooks = []
+            self.assertEqual("00:00:02.190211", client.get_block_time())
+            self.assertEqual(0, controller.decreases)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from tradescan.coalesce import SingleFlight
+from tradescan.utils import AsyncRequest, Request, request_key
+
+
+class SlowResponse(object):
+
+    def __init__(self, body):
+        self.content = json.dumps(body).encode('utf-8')
+
+    def raise_for_status(self):
+        pass
+
+
+class SlowSession(object):
+    """
+    Session stand-in answering every GET after a delay and counting calls.
+    """
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return SlowResponse({"url": url, "params": params})
+
+
+class TestRequestCoalescing(TestCase):
+
+    def test_request_key_normalization(self):
+        """
+        Check if None values are dropped and parameter order does not matter.
+        :return:
+        """
+        self.assertEqual(request_key('/get_prices', {"market": "swth_eth1", "limit": None}),
+                         request_key('/get_prices', {"market": "swth_eth1"}))
+        self.assertEqual(request_key('/get_trades', {"a": 1, "b": 2}), request_key('/get_trades', {"b": 2, "a": 1}))
+        self.assertNotEqual(request_key('/get_prices', {"market": "swth_eth1"}), request_key('/get_prices'))
+
+    def test_threads_share_one_round_trip(self):
+        """
+        Check if 30 concurrent identical calls send one request and receive the same result.
+        :return:
+        """
+        session = SlowSession()
+        request = Request(api_url="http://127.0.0.1:5001", session=session, coalesce=True)
+        with ThreadPoolExecutor(max_workers=30) as executor:
+            results = list(executor.map(
+                lambda _: request.get('/get_orderbook', params={"market": "swth_eth1", "limit": None}), range(30)))
+        self.assertEqual(1, session.calls)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(29, request.single_flight.coalesced)
+
+        request.get('/get_orderbook', params={"market": "swth_eth1"})
+        self.assertEqual(2, session.calls)
+
+    def test_errors_reach_every_caller(self):
+        """
+        Check if an exception of the shared call is raised in all waiting callers.
+        :return:
+        """
+        single_flight = SingleFlight()
+        barrier = threading.Event()
+
+        def fail():
+            barrier.wait()
+            raise ConnectionError("node down")
+
+        def call(_):
+            try:
+                single_flight.do("key", fail)
+            except ConnectionError as error:
+                return str(error)
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(call, i) for i in range(5)]
+            while single_flight.coalesced < 4:
+                time.sleep(0.01)
+            barrier.set()
+        self.assertEqual(["node down"] * 5, [future.result() for future in futures])
+        self.assertEqual(0, single_flight.in_flight())
+
+    def test_async_share_one_round_trip(self):
+        """
+        Check if concurrent identical coroutines share one request.
+        :return:
+        """
+        session = SlowSession()
+        request = AsyncRequest(api_url="http://127.0.0.1:5001", session=session, coalesce=True)
+
+        async def run():
+            return await asyncio.gather(*[request.get('/get_prices', params={"market": "swth_eth1"})
+                                          for _ in range(30)],
+                                        request.get('/get_prices', params={"market": "eth1_usdc1"}))
+
+        results = asyncio.run(run())
+        request.close()
+        self.assertEqual(2, session.calls)
+        self.assertTrue(all(result is results[0] for result in results[:30]))
+        self.assertEqual({"market": "eth1_usdc1"}, results[30]["params"])
@@ -0,0 +1,65 @@
+import json
+from unittest import TestCase
+
+from tradehub.public_client import PublicClient
+from tradescan.cache import ResponseCache
+from tradescan.stub_server import StubServer
+from tradescan.utils import DEFAULT_DECODER, Request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TOKENS = [{"denom": "swth", "decimals": 8}]
+
+
+class TestRequestDecoding(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={'/get_tokens': TOKENS}).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_default_decoder(self):
+        """
+        Check if orjson is used when it is installed.
+        :return:
+        """
+        self.assertIs(orjson.loads if orjson is not None else json.loads, DEFAULT_DECODER)
+        self.assertEqual(TOKENS, PublicClient(uri=self._server.url).get_tokens())
+
+    def test_custom_decoder(self):
+        """
+        Check if a custom decoder receives the response body bytes.
+        :return:
+        """
+        bodies = []
+
+        def decoder(body: bytes):
+            bodies.append(body)
+            return json.loads(body)
+
+        self.assertEqual(TOKENS, PublicClient(uri=self._server.url, decoder=decoder).get_tokens())
+        self.assertEqual([json.dumps(TOKENS).encode('utf-8')], bodies)
+
+    def test_raw_mode(self):
+        """
+        Check if raw mode returns bytes and can be overridden per call.
+        :return:
+        """
+        client = PublicClient(uri=self._server.url, raw=True)
+        self.assertEqual(json.dumps(TOKENS).encode('utf-8'), client.get_tokens())
+        self.assertEqual(TOKENS, client.request.get('/get_tokens', raw=False))
+
+    def test_raw_and_decoded_cached_separately(self):
+        """
+        Check if cached raw responses are never returned to decoding callers.
+        :return:
+        """
+        request = Request(api_url=self._server.url, cache=ResponseCache())
+        self.assertIsInstance(request.get('/get_tokens', raw=True), bytes)
+        self.assertEqual(TOKENS, request.get('/get_tokens'))
+        self.assertIsInstance(request.get('/get_tokens', raw=True), bytes)
+        self.assertEqual(2, self._server.requests)
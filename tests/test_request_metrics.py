@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+import requests
+
+from tradehub.node_pool import NodePool
+from tradehub.public_client import PublicClient
+from tradescan.metrics import Histogram, MetricsRegistry
+from tradescan.stub_server import StubServer
+
+
+class TestRequestMetrics(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={'/get_tokens': [{"denom": "swth"}]}).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_histogram(self):
+        """
+        Check if observations land in the right cumulative buckets.
+        :return:
+        """
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        self.assertEqual({"0.1": 2, "1.0": 3, "+Inf": 4}, histogram.cumulative())
+        self.assertAlmostEqual(2.65, histogram.sum)
+
+    def test_snapshot(self):
+        """
+        Check if latency, size, decode time, status codes and errors are recorded per path and node.
+        :return:
+        """
+        metrics = MetricsRegistry()
+        client = PublicClient(uri=self._server.url, hooks=[metrics])
+        client.get_tokens()
+        client.get_tokens()
+        with self.assertRaises(requests.exceptions.HTTPError):
+            client.get_markets()
+
+        snapshot = metrics.snapshot()
+        tokens = snapshot['/get_tokens'][self._server.url]
+        self.assertEqual(2, tokens["requests"])
+        self.assertEqual({200: 2}, tokens["status"])
+        self.assertEqual(2, tokens["latency"]["count"])
+        self.assertEqual(2 * len(b'[{"denom": "swth"}]'), tokens["bytes"]["sum"])
+        self.assertEqual(2, tokens["decode_time"]["count"])
+        markets = snapshot['/get_markets'][self._server.url]
+        self.assertEqual({404: 1}, markets["status"])
+        self.assertEqual(1, markets["errors"])
+
+    def test_retries_on_node_pool(self):
+        """
+        Check if attempts on another node after a failure are counted as retry.
+        :return:
+        """
+        down = StubServer()
+        down_url = down.url
+        down.stop()
+        metrics = MetricsRegistry()
+        client = PublicClient(node_pool=NodePool([down_url, self._server.url]), hooks=[metrics])
+        client.get_tokens()
+        snapshot = metrics.snapshot()['/get_tokens']
+        self.assertEqual({None: 1}, snapshot[down_url]["status"])
+        self.assertEqual(1, snapshot[down_url]["errors"])
+        self.assertEqual(1, snapshot[self._server.url]["retries"])
+
+    def test_prometheus_export(self):
+        """
+        Check if the Prometheus text export contains typed counters and histograms.
+        :return:
+        """
+        metrics = MetricsRegistry(namespace='test')
+        PublicClient(uri=self._server.url, hooks=[metrics]).get_tokens()
+        text = metrics.to_prometheus()
+        labels = f'path="/get_tokens",node="{self._server.url}"'
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn("# TYPE test_request_latency_seconds histogram", text)
+        self.assertIn(f'test_requests_total{{{labels},status="200"}} 1', text)
+        self.assertIn(f'test_request_latency_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn(f'test_response_bytes_count{{{labels}}} 1', text)
+        self.assertTrue(text.endswith("\n"))
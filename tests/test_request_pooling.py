@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from tradescan.stub_server import StubServer
+from tradescan.utils import Request, get_session
+
+
+class TestRequestPooling(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={'/get_block_time': "00:00:02.190211"}).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_session_shared_between_instances(self):
+        """
+        Check if requests with the same pool configuration share one session.
+        :return:
+        """
+        first = Request(api_url=self._server.url)
+        second = Request(api_url="http://127.0.0.2:5001", timeout=5)
+        self.assertIs(first.session, second.session)
+        self.assertIs(first.session, get_session())
+        self.assertIsNot(first.session, Request(api_url=self._server.url, pool_maxsize=50).session)
+
+    def test_pooled_reuses_connection(self):
+        """
+        Check if sequential pooled calls reuse one keep-alive connection.
+        :return:
+        """
+        request = Request(api_url=self._server.url, pool_maxsize=2)
+        for _ in range(10):
+            self.assertEqual("00:00:02.190211", request.get(path='/get_block_time'))
+        self.assertEqual(1, self._server.connections)
+        self.assertEqual(10, self._server.requests)
+
+    def test_unpooled_opens_connection_per_call(self):
+        """
+        Check if unpooled calls open a new connection every time.
+        :return:
+        """
+        request = Request(api_url=self._server.url, pooled=False)
+        self.assertIsNone(request.session)
+        for _ in range(3):
+            request.get(path='/get_block_time')
+        self.assertEqual(3, self._server.connections)
+
+    def test_pooled_thread_safe(self):
+        """
+        Check if concurrent calls on a shared session all succeed and stay within the pool size.
+        :return:
+        """
+        request = Request(api_url=self._server.url, pool_maxsize=4)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: request.get(path='/get_block_time'), range(100)))
+        self.assertEqual(["00:00:02.190211"] * 100, results)
+        self.assertLessEqual(self._server.connections, 4)
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from tradehub.public_client import PublicClient
+from tradescan.cache import MISSING, ResponseCache
+from tradescan.stub_server import StubServer
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self) -> None:
+        self._clock = FakeClock()
+        self._cache = ResponseCache(ttls={'/get_tokens': 10}, max_bytes=100, clock=self._clock)
+
+    def test_ttl_expiry(self):
+        """
+        Check if entries are returned until their TTL is over.
+        :return:
+        """
+        self._cache.set("key", ["swth"], size=10, ttl=10)
+        self._clock.now = 9.9
+        self.assertEqual(["swth"], self._cache.get("key"))
+        self._clock.now = 10
+        self.assertIs(MISSING, self._cache.get("key"))
+        self.assertEqual({"hits": 1, "misses": 1, "evictions": 0, "entries": 0, "bytes": 0}, self._cache.stats())
+
+    def test_lru_eviction(self):
+        """
+        Check if the least recently used entries are evicted once max_bytes is exceeded.
+        :return:
+        """
+        self._cache.set("a", 1, size=40, ttl=10)
+        self._cache.set("b", 2, size=40, ttl=10)
+        self._cache.get("a")
+        self._cache.set("c", 3, size=40, ttl=10)
+        self.assertIs(MISSING, self._cache.get("b"))
+        self.assertEqual(1, self._cache.get("a"))
+        self.assertEqual(3, self._cache.get("c"))
+        self.assertEqual(80, self._cache.size)
+        self.assertEqual(1, self._cache.evictions)
+
+        self._cache.set("huge", 4, size=101, ttl=10)
+        self.assertIs(MISSING, self._cache.get("huge"))
+
+    def test_client_hits_do_not_reach_node(self):
+        """
+        Check if only configured paths are cached and hits never reach the node.
+        :return:
+        """
+        routes = {'/get_tokens': [{"denom": "swth"}], '/get_orderbook': {"asks": [], "bids": []}}
+        with StubServer(routes=routes) as server:
+            cache = ResponseCache(ttls={'/get_tokens': 60})
+            client = PublicClient(uri=server.url, cache=cache)
+            for _ in range(5):
+                self.assertEqual([{"denom": "swth"}], client.get_tokens())
+                client.get_orderbook("swth_eth1")
+            self.assertEqual(6, server.requests)
+            self.assertEqual(4, cache.hits)
+            self.assertEqual(1, cache.misses)
@@ -0,0 +1,149 @@
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
+from unittest import TestCase, mock, skipUnless
+
+from tradehub import columns
+from tradehub.amounts import TokenAmounts, from_base_units, from_base_units_batch, to_base_units, \
+    to_base_units_batch
+from tradehub.public_client import PublicClient
+from tradehub.utils import to_tradehub_asset_amount
+from tradescan.stub_server import StubServer
+
+TOKENS = [
+    {"name": "Switcheo", "symbol": "swth", "denom": "swth", "decimals": 8},
+    {"name": "Ethereum", "symbol": "eth", "denom": "eth1", "decimals": 18},
+    {"name": "USD Coin", "symbol": "usdc", "denom": "usdc1", "decimals": 6},
+]
+
+COINS = [
+    {"denom": "eth1", "amount": "64752601707981"},
+    {"denom": "swth", "amount": "4113439708"},
+    {"denom": "usdc1", "amount": "45376"},
+]
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTradeHubAmounts(TestCase):
+
+    def setUp(self) -> None:
+        self._tokens = list(TOKENS)
+        self._server = StubServer(routes={'/get_tokens': lambda query: self._tokens}).start()
+        self._clock = FakeClock()
+        self._amounts = TokenAmounts(PublicClient(uri=self._server.url), ttl=300, min_reload=10, clock=self._clock)
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_exact_conversion(self):
+        """
+        Check if amounts are converted exactly in both directions.
+        :return:
+        """
+        self.assertEqual(64752601707981, to_base_units("0.000064752601707981", 18))
+        self.assertEqual(Decimal("0.000064752601707981"), from_base_units("64752601707981", 18))
+        self.assertEqual(10000000, to_base_units(0.1, 8))
+        self.assertEqual(3 * 10 ** 26, to_base_units(300000000, 18))
+        self.assertEqual(123456789, to_base_units("1.234567899", 8))
+        self.assertEqual(123456790, to_base_units("1.234567895", 8, rounding=ROUND_HALF_UP))
+        with self.assertRaises(ValueError):
+            to_base_units("NaN", 8)
+
+    def test_to_tradehub_asset_amount(self):
+        """
+        Check if the float based helper returns the exact scaled amount.
+        :return:
+        """
+        self.assertEqual("100000000", to_tradehub_asset_amount(1))
+        self.assertEqual("12345612345678", to_tradehub_asset_amount(123456.12345678))
+        self.assertEqual("29", to_tradehub_asset_amount(0.00000029))
+        with self.assertRaises(ValueError):
+            to_tradehub_asset_amount(1000000)
+
+    @skipUnless(columns.np is not None, "numpy is not installed")
+    def test_batch_conversion(self):
+        """
+        Check if batches with mixed decimals match the single conversions.
+        :return:
+        """
+        amounts = ["0.000064752601707981", "41.13439708", "0.045376"]
+        decimals = [18, 8, 6]
+        raw = to_base_units_batch(amounts, decimals)
+        self.assertEqual([64752601707981, 4113439708, 45376], raw.tolist())
+        self.assertEqual([4113439708, 4113439708], to_base_units_batch(["41.13439708"] * 2, 8).tolist())
+        self.assertEqual([float(amount) for amount in amounts],
+                         from_base_units_batch([str(value) for value in raw.tolist()], decimals).tolist())
+        self.assertEqual([Decimal(amount) for amount in amounts], from_base_units_batch(raw.tolist(), decimals,
+                                                                                        exact=True))
+        # amounts beyond int64 fall back to exact per row conversion
+        self.assertEqual([1e9], from_base_units_batch(["1000000000000000000000000000"], 18).tolist())
+
+    @skipUnless(columns.np is not None, "numpy is not installed")
+    def test_batch_beyond_int64(self):
+        """
+        Check if 18 decimal amounts above 9.22 are converted to exact ints instead of overflowing.
+        :return:
+        """
+        self.assertEqual([9200000000000000000, 1000000000000000000], to_base_units_batch(["9.2", "1"], 18).tolist())
+        raw = to_base_units_batch(["100.5", "1"], 18)
+        self.assertEqual([100500000000000000000, 1000000000000000000], raw.tolist())
+        self.assertEqual([100500000000000000000, 100000000], to_base_units_batch(["100.5", "1"], [18, 8]).tolist())
+        self.assertEqual([Decimal("100.5"), Decimal("1")], from_base_units_batch(raw.tolist(), 18, exact=True))
+        fees = self._amounts.trade_fees([{"taker_fee_amount": "12.5", "taker_fee_denom": "eth1",
+                                          "maker_fee_amount": "0.5", "maker_fee_denom": "swth"}])
+        self.assertEqual([12500000000000000000], list(fees["taker_fee_amount"]))
+        with mock.patch.object(columns, 'np', None):
+            self.assertEqual([100500000000000000000, 100000000], to_base_units_batch(["100.5", "1"], [18, 8]))
+
+    def test_batch_without_numpy(self):
+        """
+        Check if batches are converted into stdlib arrays without numpy.
+        :return:
+        """
+        with mock.patch.object(columns, 'np', None):
+            self.assertEqual(array('q', [64752601707981, 4113439708]),
+                             to_base_units_batch(["0.000064752601707981", "41.13439708"], [18, 8]))
+            self.assertEqual(array('d', [41.13439708]), from_base_units_batch(["4113439708"], 8))
+
+    def test_token_amounts(self):
+        """
+        Check if token decimals are loaded once and used for coins, balances and trade fees.
+        :return:
+        """
+        self.assertEqual({"eth1": Decimal("0.000064752601707981"), "swth": Decimal("41.13439708"),
+                          "usdc1": Decimal("0.045376")}, self._amounts.coins(COINS))
+        self.assertEqual({"swth": {"available": 4113439708, "order": 0, "position": 0}},
+                         self._amounts.balances({"swth": {"available": "41.13439708", "order": "0",
+                                                          "position": "0", "denom": "swth"}}))
+        fees = self._amounts.trade_fees([
+            {"taker_fee_amount": "0.000007", "taker_fee_denom": "eth1",
+             "maker_fee_amount": "-0.0000035", "maker_fee_denom": "eth1"},
+            {"taker_fee_amount": "0.5", "taker_fee_denom": "swth", "maker_fee_amount": "", "maker_fee_denom": ""},
+        ])
+        self.assertEqual([7000000000000, 50000000], list(fees["taker_fee_amount"]))
+        self.assertEqual([-3500000000000, 0], list(fees["maker_fee_amount"]))
+        self.assertEqual(1, self._server.requests)
+
+    def test_token_reload(self):
+        """
+        Check if unknown denoms reload the token list at most every min_reload seconds and the list expires.
+        :return:
+        """
+        self.assertEqual(8, self._amounts.decimals("swth"))
+        self._tokens.append({"name": "Wrapped Bitcoin", "symbol": "wbtc", "denom": "wbtc1", "decimals": 8})
+        with self.assertRaises(ValueError):
+            self._amounts.decimals("wbtc1")
+        self.assertEqual(1, self._server.requests)
+        self._clock.now = 10
+        self.assertEqual(8, self._amounts.decimals("wbtc1"))
+        self.assertEqual(2, self._server.requests)
+        self._clock.now = 310
+        self.assertEqual(18, self._amounts.decimals("eth1"))
+        self.assertEqual(3, self._server.requests)
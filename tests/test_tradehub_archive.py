@@ -0,0 +1,108 @@
+import os
+import tempfile
+
+from datetime import datetime, timezone
+from unittest import TestCase, mock, skipUnless
+
+from tradehub import archive
+from tradehub.archive import CandleArchive
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+DAY = 1610150400  # 2021-01-09T00:00:00Z
+
+
+def candle(epoch: int, market: str = "swth_eth1") -> dict:
+    return {"id": epoch // 60, "market": market, "time": datetime.fromtimestamp(epoch, timezone.utc).isoformat(),
+            "resolution": 60, "open": "0.0000212", "close": "0.0000213", "high": "0.0000214", "low": "0.0000211",
+            "volume": "2100", "quote_volume": "0.04452"}
+
+
+def candle_route(end: int):
+    def route(query: dict) -> list:
+        start, stop = int(query["from"]), min(int(query["to"]), end)
+        first = -(-start // 3600) * 3600
+        return [candle(epoch, query.get("market", "swth_eth1")) for epoch in range(first, stop + 1, 3600)]
+    return route
+
+
+class TestTradeHubArchiveWithoutPyarrow(TestCase):
+
+    def test_missing_pyarrow(self):
+        """
+        Check if the archive explains how to install the missing dependency.
+        :return:
+        """
+        with mock.patch.object(archive, 'pa', None), tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ImportError):
+                CandleArchive(directory)
+
+
+@skipUnless(archive.pa is not None, "pyarrow is not installed")
+class TestTradeHubArchive(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._end = DAY + 2 * 86400
+        self._server = StubServer(routes={'/candlesticks': lambda query: candle_route(self._end)(query)}).start()
+        self._archive = CandleArchive(self._directory.name, client=PublicClient(uri=self._server.url))
+
+    def tearDown(self) -> None:
+        self._server.stop()
+        self._directory.cleanup()
+
+    def test_partitions_and_types(self):
+        """
+        Check if candles are written per market, resolution and day with typed columns.
+        :return:
+        """
+        self.assertEqual(48, self._archive.write("swth_eth1", 60, [candle(DAY + hour * 3600) for hour in range(48)]))
+        self.assertEqual(["2021-01-09", "2021-01-10"], self._archive.days("swth_eth1", 60))
+        self.assertTrue(os.path.isdir(os.path.join(self._directory.name, "market=swth_eth1", "resolution=60",
+                                                   "date=2021-01-09")))
+        table = self._archive.read("swth_eth1", 60)
+        self.assertEqual(48, table.num_rows)
+        self.assertEqual('timestamp[ms, tz=UTC]', str(table.schema.field('time').type))
+        self.assertEqual('double', str(table.schema.field('close').type))
+        self.assertEqual(0.0000213, table['close'][0].as_py())
+        self.assertEqual(DAY + 47 * 3600, self._archive.max_time("swth_eth1", 60))
+
+    def test_incremental_append(self):
+        """
+        Check if appends only request candles after the newest archived one and skip forming candles.
+        :return:
+        """
+        self.assertEqual(24, self._archive.append("swth_eth1", 60, from_epoch=DAY, to_epoch=DAY + 86400))
+        requests = self._server.requests
+        self.assertEqual(0, self._archive.append("swth_eth1", 60, to_epoch=DAY + 86400 + 1800))
+        self.assertEqual(DAY + 23 * 3600, self._archive.max_time("swth_eth1", 60))
+        self.assertEqual(24, self._archive.append("swth_eth1", 60, to_epoch=DAY + 2 * 86400))
+        self.assertGreater(self._server.requests, requests)
+        self.assertEqual(48, self._archive.read("swth_eth1", 60).num_rows)
+        with self.assertRaises(ValueError):
+            self._archive.append("eth1_usdc1", 60)
+
+    def test_range_read(self):
+        """
+        Check if range reads return only the requested markets, window and columns.
+        :return:
+        """
+        for market in ("swth_eth1", "eth1_usdc1", "swth_usdc1"):
+            self._archive.write(market, 60, [candle(DAY + hour * 3600, market) for hour in range(48)])
+        table = self._archive.read(["swth_eth1", "eth1_usdc1"], 60, from_epoch=DAY + 20 * 3600,
+                                   to_epoch="2021-01-10T04:00:00Z", columns=["close"])
+        self.assertEqual(['time', 'close', 'market'], table.column_names)
+        self.assertEqual(16, table.num_rows)
+        self.assertEqual({"swth_eth1", "eth1_usdc1"}, set(table['market'].to_pylist()))
+        self.assertEqual(0, self._archive.read("unknown", 60).num_rows)
+
+    def test_compact(self):
+        """
+        Check if compacting merges the parts of a day and drops duplicate candles.
+        :return:
+        """
+        self._archive.write("swth_eth1", 60, [candle(DAY + hour * 3600) for hour in range(12)])
+        self._archive.write("swth_eth1", 60, [candle(DAY + hour * 3600) for hour in range(6, 24)])
+        self.assertEqual(30, self._archive.read("swth_eth1", 60).num_rows)
+        self.assertEqual(1, self._archive.compact("swth_eth1", 60))
+        self.assertEqual(24, self._archive.read("swth_eth1", 60).num_rows)
@@ -0,0 +1,111 @@
+import asyncio
+import inspect
+import time
+from unittest import TestCase
+
+from tradehub.async_public_client import AsyncPublicClient
+from tradehub.hedging import HedgePolicy
+from tradehub.node_pool import NodePool
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+
+class TestTradeHubAsyncPublicClient(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={
+            '/get_tokens': [{"denom": "swth", "decimals": 8}],
+            '/get_orderbook': {"asks": [], "bids": []},
+        }).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_method_surface(self):
+        """
+        Check if every public get method of PublicClient is available and returns an awaitable.
+        :return:
+        """
+        client = AsyncPublicClient(uri=self._server.url)
+        for name, _ in inspect.getmembers(PublicClient, inspect.isfunction):
+            if name.startswith('get_'):
+                self.assertTrue(hasattr(client, name), msg=f"Missing method {name}")
+        awaitable = client.get_tokens()
+        self.assertTrue(inspect.isawaitable(awaitable))
+        asyncio.run(awaitable)
+        client.request.close()
+
+    def test_gather_many_requests(self):
+        """
+        Check if many concurrent requests complete and return decoded responses.
+        :return:
+        """
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url, max_concurrency=16) as client:
+                return await asyncio.gather(*[client.get_orderbook("swth_eth1") for _ in range(200)],
+                                            client.get_tokens())
+
+        results = asyncio.run(run())
+        self.assertEqual(201, len(results))
+        self.assertEqual({"asks": [], "bids": []}, results[0])
+        self.assertEqual([{"denom": "swth", "decimals": 8}], results[-1])
+        self.assertLessEqual(self._server.connections, 16)
+
+    def test_parameter_validation(self):
+        """
+        Check if parameter validation is shared with the PublicClient.
+        :return:
+        """
+        client = AsyncPublicClient(uri=self._server.url)
+        with self.assertRaises(ValueError):
+            client.get_candlesticks("swth_eth1", 2, 0, 1)
+        client.request.close()
+        with self.assertRaises(ValueError):
+            AsyncPublicClient(uri=self._server.url, hedge=HedgePolicy())
+
+    def test_request_options(self):
+        """
+        Check if hooks and node pools are passed on to the async request layer.
+        :return:
+        """
+        events = []
+        second = StubServer(routes={'/get_tokens': [{"denom": "eth1", "decimals": 18}]}).start()
+        self.addCleanup(second.stop)
+
+        async def run():
+            async with AsyncPublicClient(node_pool=NodePool([self._server.url, second.url]),
+                                         hooks=[events.append]) as client:
+                return [await client.get_tokens() for _ in range(4)]
+
+        results = asyncio.run(run())
+        self.assertIn([{"denom": "swth", "decimals": 8}], results)
+        self.assertIn([{"denom": "eth1", "decimals": 18}], results)
+        self.assertEqual(4, len(events))
+        self.assertEqual({self._server.url, second.url}, {event.node for event in events})
+
+    def test_close_does_not_block_loop(self):
+        """
+        Check if closing the client waits for pending requests without blocking the event loop.
+        :return:
+        """
+        slow = StubServer(routes={'/get_tokens': lambda query: time.sleep(0.3) or []}).start()
+        self.addCleanup(slow.stop)
+
+        async def ticker(ticks):
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            ticks = []
+            client = AsyncPublicClient(uri=slow.url)
+            pending = asyncio.ensure_future(client.get_tokens())
+            await asyncio.sleep(0.05)
+            task = asyncio.ensure_future(ticker(ticks))
+            await client.close()
+            task.cancel()
+            return ticks, await pending
+
+        ticks, tokens = asyncio.run(run())
+        self.assertEqual([], tokens)
+        self.assertGreater(len(ticks), 5)
@@ -0,0 +1,121 @@
+import socket
+
+from unittest import TestCase
+
+from tradehub.backfill import TradeBackfill
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+MISSING = set(range(300, 310)) | {777}
+TRADES = [{"id": str(n), "market": "swth_eth1" if n % 3 else "eth1_usdc1"} for n in range(1, 2001) if n not in MISSING]
+
+
+def get_trades(query: dict) -> list:
+    """Filter like the node does, newest first with exclusive ids and at most 200 rows."""
+    before_id = int(query.get("before_id", 10 ** 9))
+    after_id = int(query.get("after_id", 0))
+    limit = min(int(query.get("limit", 200)), 200)
+    return [trade for trade in reversed(TRADES) if after_id < int(trade["id"]) < before_id
+            and query.get("market", trade["market"]) == trade["market"]][:limit]
+
+
+def get_trades_with_overlap(query: dict) -> list:
+    """Node ignoring after_id, answers overlap with the neighbouring range."""
+    return get_trades({key: value for key, value in query.items() if key != "after_id"})
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TestTradeHubBackfill(TestCase):
+
+    def setUp(self) -> None:
+        self._servers = [StubServer(routes={'/get_trades': get_trades}).start() for _ in range(2)]
+        self._clients = [PublicClient(uri=server.url) for server in self._servers]
+
+    def tearDown(self) -> None:
+        for server in self._servers:
+            server.stop()
+
+    def test_ordered_and_complete(self):
+        """
+        Check if all trades are returned once in ascending id order and the missing ids are reported as gaps.
+        :return:
+        """
+        backfill = TradeBackfill(self._clients, workers=4, range_size=150)
+        trades = backfill.run()
+        expected = [int(trade["id"]) for trade in TRADES]
+        self.assertEqual(expected, [int(trade["id"]) for trade in trades])
+        self.assertEqual([(300, 310), (777, 778)], backfill.stats.gaps)
+        self.assertEqual(len(TRADES), backfill.stats.rows)
+        self.assertEqual(0, backfill.stats.duplicates)
+        self.assertGreater(backfill.stats.rows_per_second, 0)
+        # ranges are spread over both nodes
+        self.assertTrue(all(server.requests > 1 for server in self._servers))
+
+    def test_id_range(self):
+        """
+        Check if after_id and before_id are exclusive.
+        :return:
+        """
+        trades = TradeBackfill(self._clients[0], workers=2, range_size=64).run(after_id=1000, before_id=1501)
+        self.assertEqual(list(range(1001, 1501)), [int(trade["id"]) for trade in trades])
+
+    def test_market_filter(self):
+        """
+        Check if a market filter does not report the ids of other markets as gaps.
+        :return:
+        """
+        backfill = TradeBackfill(self._clients, workers=4, range_size=500, market="eth1_usdc1")
+        trades = backfill.run()
+        self.assertEqual([int(trade["id"]) for trade in TRADES if trade["market"] == "eth1_usdc1"],
+                         [int(trade["id"]) for trade in trades])
+        self.assertEqual([], backfill.stats.gaps)
+
+    def test_deduplicate(self):
+        """
+        Check if rows returned for several ranges are only handed out once.
+        :return:
+        """
+        with StubServer(routes={'/get_trades': get_trades_with_overlap}) as server:
+            backfill = TradeBackfill(PublicClient(uri=server.url), workers=3, range_size=100)
+            trades = backfill.run(after_id=0, before_id=1001)
+        self.assertEqual([int(trade["id"]) for trade in TRADES if int(trade["id"]) < 1001],
+                         [int(trade["id"]) for trade in trades])
+
+    def test_failover(self):
+        """
+        Check if ranges failing on an unreachable node are fetched from the next client.
+        :return:
+        """
+        broken = PublicClient(uri=f"http://127.0.0.1:{unused_port()}")
+        backfill = TradeBackfill([broken, self._clients[0]], workers=2, range_size=400)
+        trades = backfill.run(before_id=2001)
+        self.assertEqual(len(TRADES), len(trades))
+        self.assertEqual([], backfill.stats.failed_ranges)
+
+    def test_failed_range(self):
+        """
+        Check if ranges failing on every client are recorded as failed and as gap.
+        :return:
+        """
+        broken = PublicClient(uri=f"http://127.0.0.1:{unused_port()}")
+        backfill = TradeBackfill([self._clients[0], broken], workers=2, range_size=500, retries=0)
+        trades = backfill.run(before_id=2001)
+        self.assertEqual([(501, 1001), (1501, 2001)], backfill.stats.failed_ranges)
+        self.assertIn((1501, 2001), backfill.stats.gaps)
+        # 777 is missing in a failed range, only 300 to 309 are missing in the fetched ones
+        self.assertEqual(990, len(trades))
+
+    def test_raw_client(self):
+        """
+        Check if clients returning raw response bytes are backfilled like decoding ones.
+        :return:
+        """
+        backfill = TradeBackfill(PublicClient(uri=self._servers[0].url, raw=True), workers=2, range_size=300)
+        trades = backfill.run()
+        self.assertEqual([int(trade["id"]) for trade in TRADES], [int(trade["id"]) for trade in trades])
+        self.assertEqual([], backfill.stats.failed_ranges)
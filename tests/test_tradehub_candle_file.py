@@ -0,0 +1,114 @@
+import os
+import tempfile
+
+from datetime import datetime, timezone
+from unittest import TestCase, mock, skipUnless
+
+from tradehub import candle_file
+from tradehub.candle_file import CandleFile, CandleStore
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+DAY = 1610150400  # 2021-01-09T00:00:00Z
+
+
+def candle(epoch: int, close: str = "0.0000213") -> dict:
+    return {"id": epoch // 60, "market": "swth_eth1", "time": datetime.fromtimestamp(epoch, timezone.utc).isoformat(),
+            "resolution": 1, "open": "0.0000212", "close": close, "high": "0.0000214", "low": "0.0000211",
+            "volume": "2100", "quote_volume": "0.04452"}
+
+
+class TestTradeHubCandleFileWithoutNumpy(TestCase):
+
+    def test_missing_numpy(self):
+        """
+        Check if candle files explain how to install the missing dependency.
+        :return:
+        """
+        with mock.patch.object(candle_file, 'np', None), tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ImportError):
+                CandleStore(directory)
+
+
+@skipUnless(candle_file.np is not None, "numpy is not installed")
+class TestTradeHubCandleFile(TestCase):
+
+    def setUp(self) -> None:
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "swth_eth1-1.candles")
+
+    def tearDown(self) -> None:
+        self._directory.cleanup()
+
+    def test_fixed_width_records(self):
+        """
+        Check if candles are stored as fixed-width records and read back as read-only views.
+        :return:
+        """
+        with CandleFile(self._path, resolution=1) as candles:
+            self.assertEqual(60, candles.append([candle(DAY + minute * 60) for minute in reversed(range(60))]))
+        self.assertEqual(16 + 60 * 56, os.path.getsize(self._path))
+        with CandleFile(self._path) as candles:
+            self.assertEqual(1, candles.resolution)
+            self.assertEqual(60, len(candles))
+            records = candles.records
+            self.assertEqual(list(range(DAY, DAY + 3600, 60)), records['time'].tolist())
+            self.assertEqual(0.0000213, records['close'][0])
+            self.assertFalse(records.flags.writeable)
+        with self.assertRaises(ValueError):
+            CandleFile(self._path, resolution=5)
+        with self.assertRaises(ValueError):
+            CandleFile(os.path.join(self._directory.name, "missing.candles"))
+
+    def test_time_lookups(self):
+        """
+        Check if candles are found by time and ranges are views into the mapping.
+        :return:
+        """
+        candles = CandleFile(self._path, resolution=1)
+        candles.append([candle(DAY + minute * 60) for minute in range(0, 120, 2)])
+        self.assertEqual(5, candles.index(DAY + 9 * 60))
+        self.assertEqual(DAY + 10 * 60, int(candles.at("2021-01-09T00:10:00Z")['time']))
+        self.assertIsNone(candles.at(DAY + 9 * 60))
+        window = candles.between(DAY + 10 * 60, DAY + 20 * 60)
+        self.assertEqual([DAY + minute * 60 for minute in range(10, 20, 2)], window['time'].tolist())
+        self.assertTrue(candle_file.np.shares_memory(candles.records, window))
+        self.assertEqual(0, len(candles.between(DAY + 3600 * 5)))
+
+    def test_append(self):
+        """
+        Check if appends add newer candles, replace the last one and skip older ones.
+        :return:
+        """
+        candles = CandleFile(self._path, resolution=1)
+        candles.append([candle(DAY + minute * 60) for minute in range(10)])
+        first = candles.between()
+        self.assertEqual(3, candles.append([candle(DAY + minute * 60, close="0.0000215") for minute in range(5, 12)]))
+        self.assertEqual(12, len(candles))
+        self.assertEqual(10, len(first))
+        self.assertEqual([0.0000213] * 9 + [0.0000215] * 3, candles.records['close'].tolist())
+        # interrupted appends leave a partial record which is dropped by the next one
+        with open(self._path, 'ab') as file:
+            file.write(b'\1' * 20)
+        self.assertEqual(12, len(candles))
+        self.assertEqual(1, candles.append([candle(DAY + 12 * 60)]))
+        self.assertEqual(16 + 13 * 56, os.path.getsize(self._path))
+        self.assertEqual(0, candles.append([]))
+
+    def test_sync(self):
+        """
+        Check if syncing requests candles from the last stored one on.
+        :return:
+        """
+        def route(query: dict) -> list:
+            start, end = int(query["from"]), int(query["to"])
+            return [candle(epoch) for epoch in range(-(-start // 60) * 60, min(end, DAY + 3600) + 1, 60)]
+
+        with StubServer(routes={'/candlesticks': route}) as server, \
+                CandleStore(self._directory.name, client=PublicClient(uri=server.url)) as store:
+            self.assertEqual(31, store.sync("swth_eth1", 1, from_epoch=DAY, to_epoch=DAY + 1800))
+            self.assertEqual(31, store.sync("swth_eth1", 1, to_epoch=DAY + 3600))
+            self.assertEqual(61, len(store.open("swth_eth1", 1)))
+            self.assertTrue(os.path.exists(store.path("swth_eth1", 1)))
+            with self.assertRaises(ValueError):
+                store.sync("eth1_usdc1", 1)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from unittest import TestCase
+
+from tradehub.async_public_client import AsyncPublicClient
+from tradehub.candlesticks import merge_candles, split_window
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+JANUARY = 1609459200
+FEBRUARY = 1612137600
+
+
+def candlesticks(query: dict) -> list:
+    """Candles starting within [from, to], ids count the candle periods since the epoch."""
+    resolution = int(query["resolution"]) * 60
+    first = -(-int(query["from"]) // resolution)
+    last = int(query["to"]) // resolution
+    return [{"id": n, "market": query["market"], "resolution": int(query["resolution"]),
+             "time": time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(n * resolution)),
+             "open": "1", "close": "1", "high": "1", "low": "1", "volume": "0", "quote_volume": "0"}
+            for n in range(first, last + 1)]
+
+
+class TestTradeHubCandlesticksRange(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={'/candlesticks': candlesticks}).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_split_window(self):
+        """
+        Check if windows cover the range, share boundaries and are aligned to the window length.
+        :return:
+        """
+        windows = split_window(1, JANUARY + 30, FEBRUARY, candles_per_window=1000)
+        self.assertEqual(JANUARY + 30, windows[0][0])
+        self.assertEqual(FEBRUARY, windows[-1][1])
+        for (_, stop), (start, _) in zip(windows, windows[1:]):
+            self.assertEqual(stop, start)
+            self.assertEqual(0, start % 60000)
+        self.assertTrue(all(stop - start <= 60000 for start, stop in windows))
+        self.assertEqual([(JANUARY, JANUARY + 60)], split_window(1440, JANUARY, JANUARY + 60))
+        with self.assertRaises(ValueError):
+            split_window(15, JANUARY, FEBRUARY)
+        with self.assertRaises(ValueError):
+            split_window(1, FEBRUARY, JANUARY)
+
+    def test_range_equals_single_request(self):
+        """
+        Check if the stitched series equals one request over the whole range, ordered and without duplicates.
+        :return:
+        """
+        client = PublicClient(uri=self._server.url)
+        expected = client.get_candlesticks("swth_eth1", 1, JANUARY, JANUARY + 86400)
+        self.assertEqual(1, self._server.requests)
+        candles = client.get_candlesticks_range("swth_eth1", 1, JANUARY, JANUARY + 86400, candles_per_window=100)
+        self.assertEqual(expected, candles)
+        self.assertEqual(1 + 15, self._server.requests)
+        # raw clients return the decoded range as well
+        raw_client = PublicClient(uri=self._server.url, raw=True)
+        self.assertEqual(expected, raw_client.get_candlesticks_range("swth_eth1", 1, JANUARY, JANUARY + 86400,
+                                                                     candles_per_window=100))
+
+    def test_merge_candles(self):
+        """
+        Check if overlapping windows are deduplicated by id and ordered by time.
+        :return:
+        """
+        first = candlesticks({"market": "swth_eth1", "resolution": 5, "from": JANUARY, "to": JANUARY + 3000})
+        second = candlesticks({"market": "swth_eth1", "resolution": 5, "from": JANUARY + 1500, "to": JANUARY + 6000})
+        merged = merge_candles([second, first])
+        self.assertEqual(list(range(first[0]["id"], second[-1]["id"] + 1)), [candle["id"] for candle in merged])
+
+    def test_async_range(self):
+        """
+        Check if the async client returns the same series.
+        :return:
+        """
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url) as client:
+                return await client.get_candlesticks_range("swth_eth1", 30, JANUARY, FEBRUARY, candles_per_window=200)
+
+        candles = asyncio.run(run())
+        self.assertEqual(candlesticks({"market": "swth_eth1", "resolution": 30, "from": JANUARY, "to": FEBRUARY}),
+                         candles)
@@ -0,0 +1,130 @@
+from array import array
+from decimal import Decimal
+from unittest import TestCase, mock, skipUnless
+
+from tradehub import columns
+from tradehub.columns import candles_to_columns, parse_decimals, parse_times, trades_to_columns
+from tradehub.records import Candle, Trade
+from tradehub.utils import parse_timestamp
+
+CANDLES = [
+    {"id": 38648, "market": "swth_eth1", "time": "2021-01-09T15:35:00+01:00", "resolution": 5,
+     "open": "0.0000212", "close": "0.0000213", "high": "0.0000214", "low": "0.0000211",
+     "volume": "2100", "quote_volume": "0.04452"},
+    {"id": 38649, "market": "swth_eth1", "time": "2021-01-09T15:40:00+01:00", "resolution": 5,
+     "open": "0.0000213", "close": "0.0000215", "high": "0.0000215", "low": "0.0000213",
+     "volume": "0", "quote_volume": "0"},
+]
+
+TRADES = [
+    {"id": "103965", "block_created_at": "2021-01-10T21:59:53.563633+01:00", "block_height": "6156871",
+     "market": "eth1_usdc1", "price": "1251.51", "quantity": "0.007", "taker_side": "buy"},
+    {"id": "103966", "block_created_at": "2021-01-10T20:59:55.5Z", "block_height": "6156872",
+     "market": "eth1_usdc1", "price": "1251.4", "quantity": "12", "taker_side": "sell"},
+]
+
+TIMESTAMPS = ["2021-01-10T21:59:53.563633+01:00", "2021-01-09T15:35:00Z", "1999-12-31T23:59:59.5-05:30",
+              "2024-02-29T00:00:00", "2021-01-10T21:59:53.123456789Z"]
+
+
+@skipUnless(columns.np is not None, "numpy is not installed")
+class TestTradeHubColumns(TestCase):
+
+    def test_candles_to_columns(self):
+        """
+        Check if candles are converted to int64 time and float64 price columns.
+        :return:
+        """
+        result = candles_to_columns(CANDLES)
+        self.assertEqual(['id', 'time', 'open', 'high', 'low', 'close', 'volume', 'quote_volume'], list(result))
+        self.assertEqual('int64', result["time"].dtype.name)
+        self.assertEqual([1610202900, 1610203200], result["time"].tolist())
+        self.assertEqual('float64', result["close"].dtype.name)
+        self.assertEqual([0.0000213, 0.0000215], result["close"].tolist())
+        self.assertEqual([2100.0, 0.0], result["volume"].tolist())
+        self.assertEqual([38648, 38649], result["id"].tolist())
+
+    def test_trades_to_scaled_columns(self):
+        """
+        Check if trades are converted to exact scaled int64 columns and microsecond times.
+        :return:
+        """
+        result = trades_to_columns(TRADES, scale=8)
+        self.assertEqual('int64', result["price"].dtype.name)
+        self.assertEqual([125151000000, 125140000000], result["price"].tolist())
+        self.assertEqual([700000, 1200000000], result["quantity"].tolist())
+        self.assertEqual([1610312393563633, 1610312395500000], result["block_created_at"].tolist())
+        self.assertEqual([6156871, 6156872], result["block_height"].tolist())
+        self.assertEqual([1, -1], result["side"].tolist())
+
+    def test_parse_times(self):
+        """
+        Check if offsets, fractions and units match the per row parser.
+        :return:
+        """
+        for unit, factor in columns.TIME_UNITS.items():
+            expected = [int(Decimal(repr(parse_timestamp(value))) * factor) for value in TIMESTAMPS[:4]]
+            self.assertEqual(expected, parse_times(TIMESTAMPS[:4], unit=unit).tolist())
+        self.assertEqual(1610315993123456789, parse_times(TIMESTAMPS, unit='ns').tolist()[-1])
+        self.assertEqual([1610202900], parse_times([1610202900.0]).tolist())
+
+    def test_parse_times_offsets(self):
+        """
+        Check if offsets without colon and other layouts accepted by parse_timestamp give the same epochs.
+        :return:
+        """
+        values = ["2021-01-10T21:59:53.563633+0100", "1999-12-31T23:59:59-0530", "2021-01-10 20:59:53.5Z",
+                  "2021-01-10T21:59:53+01:00", " 2021-01-10T21:59:53.25+01:00", "2021-01-10T21:59:53.123456789-0000"]
+        for unit, factor in columns.TIME_UNITS.items():
+            expected = [int(Decimal(repr(parse_timestamp(value))) * factor) for value in values[:-1]]
+            self.assertEqual(expected, parse_times(values[:-1], unit=unit).tolist())
+        self.assertEqual(1610315993123456789, parse_times(values, unit='ns').tolist()[-1])
+        with self.assertRaises(ValueError):
+            parse_times(["2021-01-10T21:59:53.5+01:00", "2021-01-10T21:59:53+1"])
+
+    def test_parse_decimals(self):
+        """
+        Check if decimals are exact, truncated beyond scale and other notations fall back to per row parsing.
+        :return:
+        """
+        values = ["1251.51", "-0.00012345678", "0", ".5", "", "-7.5", "123.123456789"]
+        for scale in (0, 2, 8):
+            self.assertEqual([int(Decimal(value or 0).scaleb(scale)) for value in values],
+                             parse_decimals(values, scale=scale).tolist())
+        self.assertEqual([float(value or 0) for value in values], parse_decimals(values).tolist())
+        self.assertEqual([1000, 200000000], parse_decimals(["1e-5", "2"], scale=8).tolist())
+        with self.assertRaises(OverflowError):
+            parse_decimals(["123456789012345678"], scale=2)
+        for malformed in ("-", ".", "-."):
+            for scale in (None, 8):
+                with self.assertRaises(ValueError):
+                    parse_decimals(["1.5", malformed], scale=scale)
+
+    def test_records(self):
+        """
+        Check if records with parsed values are converted as well.
+        :return:
+        """
+        result = candles_to_columns(Candle.from_list(CANDLES), scale=7)
+        self.assertEqual([1610202900, 1610203200], result["time"].tolist())
+        self.assertEqual([213, 215], result["close"].tolist())
+        result = trades_to_columns(Trade.from_list(TRADES))
+        self.assertEqual([1251.51, 1251.4], result["price"].tolist())
+        self.assertEqual(1610312393563633, result["block_created_at"].tolist()[0])
+
+
+class TestTradeHubColumnsFallback(TestCase):
+
+    def test_without_numpy(self):
+        """
+        Check if the same columns are built as stdlib arrays without numpy.
+        :return:
+        """
+        with mock.patch.object(columns, 'np', None):
+            result = trades_to_columns(TRADES, scale=8)
+            candles = candles_to_columns(CANDLES)
+        self.assertEqual(array('q', [125151000000, 125140000000]), result["price"])
+        self.assertEqual(array('q', [1610312393563633, 1610312395500000]), result["block_created_at"])
+        self.assertEqual(array('b', [1, -1]), result["side"])
+        self.assertEqual(array('d', [0.0000213, 0.0000215]), candles["close"])
+        self.assertEqual(array('q', [1610202900, 1610203200]), candles["time"])
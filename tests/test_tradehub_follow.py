@@ -0,0 +1,255 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from unittest import TestCase
+
+import requests
+
+from tradehub.async_public_client import AsyncPublicClient
+from tradehub.follow import AdaptiveInterval, FileCheckpoint
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+
+class TestTradeHubFollow(TestCase):
+
+    def setUp(self) -> None:
+        self._trades = [{"id": str(n), "market": "swth_eth1"} for n in range(1, 301)]
+        self._lock = threading.Lock()
+        self._server = StubServer(routes={
+            '/get_trades': self._get_trades,
+            '/get_orders': self._get_trades,
+            '/get_block_time': "00:00:00.020000",
+        }).start()
+        self._client = PublicClient(uri=self._server.url)
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+        self._directory.cleanup()
+
+    def _get_trades(self, query: dict) -> list:
+        before_id = int(query.get("before_id", 10 ** 9))
+        after_id = int(query.get("after_id", 0))
+        limit = min(int(query.get("limit", 200)), 200)
+        with self._lock:
+            return [trade for trade in reversed(self._trades) if after_id < int(trade["id"]) < before_id][:limit]
+
+    def _add_trades(self, count: int) -> None:
+        with self._lock:
+            last = int(self._trades[-1]["id"])
+            self._trades.extend({"id": str(n), "market": "swth_eth1"} for n in range(last + 1, last + count + 1))
+
+    def test_follow_from_id(self):
+        """
+        Check if existing and later created trades are yielded once in ascending id order.
+        :return:
+        """
+        follower = self._client.follow_trades(after_id=100, max_interval=0.05)
+        ids = []
+        for trade in follower:
+            ids.append(int(trade["id"]))
+            if len(ids) == 200:
+                threading.Timer(0.05, self._add_trades, args=(50,)).start()
+            if len(ids) == 250:
+                follower.stop()
+        self.assertEqual(list(range(101, 351)), ids)
+        self.assertEqual(0.02, follower.interval.block_time)
+
+    def test_follow_from_tail(self):
+        """
+        Check if only trades created after the start are yielded without after_id and checkpoint.
+        :return:
+        """
+        follower = self._client.follow_trades(max_interval=0.05)
+        threading.Timer(0.1, self._add_trades, args=(3,)).start()
+        ids = []
+        for trade in follower:
+            ids.append(int(trade["id"]))
+            if len(ids) == 3:
+                follower.stop()
+        self.assertEqual([301, 302, 303], ids)
+
+    def test_checkpoint_resume(self):
+        """
+        Check if a new follower resumes after the last completely consumed poll.
+        :return:
+        """
+        path = os.path.join(self._directory.name, 'trades.checkpoint')
+        follower = self._client.follow_orders(after_id=0, checkpoint=path, max_interval=0.05)
+        iterator = iter(follower)
+        ids = [int(next(iterator)["id"]) for _ in range(300)]
+        follower.stop()
+        self.assertEqual([], list(iterator))
+        self.assertEqual(list(range(1, 301)), ids)
+        self.assertEqual(300, FileCheckpoint(path).load())
+
+        self._add_trades(5)
+        follower = self._client.follow_orders(checkpoint=path, max_interval=0.05)
+        ids = []
+        for order in follower:
+            ids.append(int(order["id"]))
+            if len(ids) == 5:
+                follower.stop()
+        self.assertEqual(list(range(301, 306)), ids)
+        self.assertEqual(305, FileCheckpoint(path).load())
+
+    def test_backlog_chunks(self):
+        """
+        Check if a backlog is handed out oldest first in chunks while the rest is still fetched.
+        :return:
+        """
+        self._add_trades(2700)
+        path = os.path.join(self._directory.name, 'trades.checkpoint')
+        follower = self._client.follow_trades(after_id=0, checkpoint=path, max_interval=0.05)
+        follower.chunk_size = 200
+        ids, requests_at_first_row = [], None
+        for trade in follower:
+            if requests_at_first_row is None:
+                requests_at_first_row = self._server.requests
+            ids.append(int(trade["id"]))
+            if len(ids) == 450:
+                # the first two chunks are committed
+                self.assertEqual(400, FileCheckpoint(path).load())
+            if len(ids) == 3000:
+                follower.stop()
+        self.assertEqual(list(range(1, 3001)), ids)
+        # block time, newest page and the first chunk
+        self.assertLessEqual(requests_at_first_row, 3)
+        self.assertEqual(3000, FileCheckpoint(path).load())
+
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url) as client:
+                async_follower = client.follow_trades(after_id=0, max_interval=0.05)
+                async_follower.chunk_size = 500
+                async_ids = []
+                async for row in async_follower:
+                    async_ids.append(int(row["id"]))
+                    if len(async_ids) == 3000:
+                        async_follower.stop()
+                return async_ids
+
+        self.assertEqual(list(range(1, 3001)), asyncio.run(run()))
+
+    def test_adaptive_interval(self):
+        """
+        Check if the interval follows the arrival rate within block time and max_interval.
+        :return:
+        """
+        interval = AdaptiveInterval(block_time=2.0, max_interval=30.0, alpha=0.5)
+        self.assertEqual(2.0, interval.interval())
+        # busy market, several rows per block
+        self.assertEqual(2.0, interval.update(rows=20, elapsed=2.0))
+        # one row every ten seconds
+        for _ in range(20):
+            interval.update(rows=1, elapsed=10.0)
+        self.assertAlmostEqual(10.0, interval.interval(), places=2)
+        # quiet market backs off to max_interval
+        for _ in range(20):
+            interval.update(rows=0, elapsed=interval.interval())
+        self.assertEqual(30.0, interval.interval())
+        self.assertEqual(0.5, AdaptiveInterval(block_time=2.0, min_interval=0.5).update(rows=10, elapsed=1.0))
+
+    def test_async_follow(self):
+        """
+        Check if the async client follows trades with async for.
+        :return:
+        """
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url) as client:
+                follower = client.follow_trades(after_id=290, max_interval=0.05)
+                ids = []
+                async for trade in follower:
+                    ids.append(int(trade["id"]))
+                    if len(ids) == 10:
+                        self._add_trades(2)
+                    if len(ids) == 12:
+                        follower.stop()
+                return ids
+
+        self.assertEqual(list(range(291, 303)), asyncio.run(run()))
+
+    def test_resume_after_error(self):
+        """
+        Check if a failed poll is retried with a backoff instead of ending the iteration.
+        :return:
+        """
+        get_trades = self._client.get_trades
+        failures = []
+
+        def flaky_get_trades(**kwargs):
+            if len(failures) < 1 and kwargs.get("after_id") == 300:
+                failures.append(kwargs)
+                raise requests.exceptions.ConnectionError("node went away")
+            return get_trades(**kwargs)
+
+        self._client.get_trades = flaky_get_trades
+        follower = self._client.follow_trades(after_id=300, max_interval=0.05)
+        threading.Timer(0.02, self._add_trades, args=(3,)).start()
+        ids = []
+        for trade in follower:
+            ids.append(int(trade["id"]))
+            if len(ids) == 3:
+                follower.stop()
+        self.assertEqual([301, 302, 303], ids)
+        self.assertEqual(1, follower.stats()["errors"])
+        self.assertIsInstance(follower.last_error, requests.exceptions.ConnectionError)
+
+    def test_resume_after_malformed_rows(self):
+        """
+        Check if malformed or partial responses are retried like node errors.
+        :return:
+        """
+        get_trades = self._client.get_trades
+        responses = [[{"market": "swth_eth1"}], None]
+
+        def malformed_get_trades(**kwargs):
+            if responses and kwargs.get("after_id") == 300:
+                return responses.pop(0)
+            return get_trades(**kwargs)
+
+        self._client.get_trades = malformed_get_trades
+        follower = self._client.follow_trades(after_id=300, max_interval=0.05)
+        self._add_trades(2)
+        ids = []
+        for trade in follower:
+            ids.append(int(trade["id"]))
+            if len(ids) == 2:
+                follower.stop()
+        self.assertEqual([301, 302], ids)
+        self.assertEqual(2, follower.errors)
+        self.assertIsInstance(follower.last_error, TypeError)
+
+    def test_async_stop_wakes_up(self):
+        """
+        Check if stop ends a waiting async iteration immediately and async polls survive node errors.
+        :return:
+        """
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url) as client:
+                get_trades = client.get_trades
+                failures = []
+
+                async def flaky_get_trades(**kwargs):
+                    if not failures:
+                        failures.append(kwargs)
+                        raise requests.exceptions.ConnectionError("node went away")
+                    return await get_trades(**kwargs)
+
+                client.get_trades = flaky_get_trades
+                follower = client.follow_trades(after_id=298, min_interval=0.01, max_interval=0.05)
+                ids = []
+                async for trade in follower:
+                    ids.append(int(trade["id"]))
+                    if len(ids) == 2:
+                        # a long interval, stop has to wake up the iterator
+                        follower.interval.min_interval = follower.interval.max_interval = 30
+                        follower.stop()
+                return ids, follower.errors
+
+        start = time.monotonic()
+        self.assertEqual(([299, 300], 1), asyncio.run(run()))
+        self.assertLess(time.monotonic() - start, 5)
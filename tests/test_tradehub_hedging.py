@@ -0,0 +1,84 @@
+import time
+from unittest import TestCase
+
+from tradehub.hedging import HedgePolicy, LatencyTracker
+from tradehub.node_pool import NodePool
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+
+class TestTradeHubHedging(TestCase):
+
+    def setUp(self) -> None:
+        routes = {'/get_orderbook': {"asks": [], "bids": []}, '/get_block_time': "00:00:02.190211"}
+        self._slow = StubServer(routes=routes, latency=0.5).start()
+        self._fast = StubServer(routes=routes).start()
+        self._pool = NodePool([self._slow.url, self._fast.url])
+        # make the slow node look like the fastest one, so it is picked as primary
+        self._pool.record_success(self._pool.nodes[0], 0.001)
+        self._pool.record_success(self._pool.nodes[1], 0.01)
+
+    def tearDown(self) -> None:
+        self._slow.stop()
+        self._fast.stop()
+
+    def test_latency_tracker_percentiles(self):
+        """
+        Check if nearest rank percentiles are returned from the sliding window.
+        :return:
+        """
+        tracker = LatencyTracker(window=100)
+        self.assertIsNone(tracker.percentile(50))
+        for value in range(1, 201):
+            tracker.add(value / 1000)
+        self.assertEqual(100, len(tracker))
+        self.assertEqual(0.15, tracker.percentile(50))
+        self.assertEqual(0.199, tracker.percentile(99))
+        self.assertEqual(0.2, tracker.percentile(100))
+
+    def test_backup_wins_against_slow_primary(self):
+        """
+        Check if a backup request is sent after the hedge delay and its answer is used.
+        :return:
+        """
+        hedge = HedgePolicy(initial_delay=0.05)
+        client = PublicClient(node_pool=self._pool, hedge=hedge)
+        start = time.perf_counter()
+        self.assertEqual({"asks": [], "bids": []}, client.get_orderbook("swth_eth1"))
+        self.assertLess(time.perf_counter() - start, 0.4)
+        stats = hedge.stats()
+        self.assertEqual(1, stats["requests"])
+        self.assertEqual(1, stats["hedged"])
+        self.assertEqual(1, stats["backup_wins"])
+        self.assertEqual(stats["p50"], stats["p99"])
+
+    def test_fast_primary_is_not_hedged(self):
+        """
+        Check if no backup request is sent when the primary answers within the hedge delay.
+        :return:
+        """
+        hedge = HedgePolicy(initial_delay=2)
+        client = PublicClient(node_pool=self._pool, hedge=hedge)
+        client.get_orderbook("swth_eth1")
+        self.assertEqual(0, hedge.hedged)
+        self.assertEqual(1, self._slow.requests)
+        self.assertEqual(0, self._fast.requests)
+
+    def test_only_configured_paths_are_hedged(self):
+        """
+        Check if paths outside the policy are sent to one node only.
+        :return:
+        """
+        hedge = HedgePolicy(initial_delay=0.05)
+        client = PublicClient(node_pool=self._pool, hedge=hedge)
+        client.get_block_time()
+        self.assertEqual(0, hedge.requests)
+        self.assertEqual(0, self._fast.requests)
+
+    def test_hedge_needs_node_pool(self):
+        """
+        Check if hedging without a node pool is rejected.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            PublicClient(uri=self._fast.url, hedge=HedgePolicy())
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from unittest import TestCase
+
+from tradehub.async_public_client import AsyncPublicClient
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+# trade n was created n seconds after this timestamp
+GENESIS = 1610000000
+TRADES = [{"id": str(n), "block_created_at": time.strftime('%Y-%m-%dT%H:%M:%S.000000+00:00', time.gmtime(GENESIS + n)),
+           "market": "swth_eth1"} for n in range(1, 1001)]
+
+
+def get_trades(query: dict) -> list:
+    """Filter like the node does, newest first with exclusive ids and at most 200 rows."""
+    before_id = int(query.get("before_id", 10 ** 9))
+    after_id = int(query.get("after_id", 0))
+    limit = min(int(query.get("limit", 200)), 200)
+    return [trade for trade in reversed(TRADES) if after_id < int(trade["id"]) < before_id][:limit]
+
+
+class TestTradeHubIterTrades(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={'/get_trades': get_trades}).start()
+        self._client = PublicClient(uri=self._server.url)
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_iterate_all(self):
+        """
+        Check if every trade is returned once and newest first over several pages.
+        :return:
+        """
+        ids = [int(trade["id"]) for trade in self._client.iter_trades()]
+        self.assertEqual(list(range(1000, 0, -1)), ids)
+        # five full pages and an empty one
+        self.assertEqual(6, self._server.requests)
+
+    def test_id_range(self):
+        """
+        Check if before_id and after_id are exclusive and no page after the range is requested.
+        :return:
+        """
+        ids = [int(trade["id"]) for trade in self._client.iter_trades(before_id=700, after_id=250, page_size=100)]
+        self.assertEqual(list(range(699, 250, -1)), ids)
+        self.assertEqual(5, self._server.requests)
+        self.assertEqual([], list(self._client.iter_trades(before_id=11, after_id=10)))
+
+    def test_time_range(self):
+        """
+        Check if start_time is inclusive, end_time exclusive and iteration stops below start_time.
+        :return:
+        """
+        trades = list(self._client.iter_trades(start_time=GENESIS + 300, end_time="2021-01-07T06:28:20Z",
+                                               prefetch=False))
+        # 2021-01-07T06:28:20Z is GENESIS + 900
+        self.assertEqual(list(range(899, 299, -1)), [int(trade["id"]) for trade in trades])
+        self.assertEqual(4, self._server.requests)
+
+    def test_early_stop(self):
+        """
+        Check if a consumer stopping early does not trigger more than one prefetched page.
+        :return:
+        """
+        iterator = self._client.iter_trades(page_size=50)
+        first = [next(iterator) for _ in range(10)]
+        iterator.close()
+        self.assertEqual("1000", first[0]["id"])
+        self.assertLessEqual(self._server.requests, 2)
+
+    def test_raw_client(self):
+        """
+        Check if raw clients still iterate over decoded trades.
+        :return:
+        """
+        client = PublicClient(uri=self._server.url, raw=True)
+        self.assertEqual(1000, sum(1 for _ in client.iter_trades()))
+
+    def test_async_iterate(self):
+        """
+        Check if the async client iterates over the same trades.
+        :return:
+        """
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url) as client:
+                return [int(trade["id"]) async for trade in client.iter_trades(after_id=500)]
+
+        self.assertEqual(list(range(1000, 500, -1)), asyncio.run(run()))
+
+    def test_invalid_page_size(self):
+        """
+        Check if page sizes the node would cap are rejected.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            self._client.iter_trades(page_size=500).__next__()
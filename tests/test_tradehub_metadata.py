@@ -0,0 +1,198 @@
+import threading
+import time
+
+from decimal import Decimal
+from unittest import TestCase
+
+from tradehub.amounts import TokenAmounts
+from tradehub.metadata import MetadataIndex
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+TOKENS = [
+    {"name": "Switcheo", "symbol": "swth", "denom": "swth", "decimals": 8},
+    {"name": "Ethereum", "symbol": "eth", "denom": "eth1", "decimals": 18},
+    {"name": "USD Coin", "symbol": "usdc", "denom": "usdc1", "decimals": 6},
+]
+
+MARKETS = [
+    {"name": "swth_eth1", "market_type": "spot", "base": "swth", "quote": "eth1", "base_precision": 8,
+     "quote_precision": 18, "lot_size": "1", "tick_size": "0.0000001"},
+    {"name": "eth1_usdc1", "market_type": "spot", "base": "eth1", "quote": "usdc1", "base_precision": 18,
+     "quote_precision": 6, "lot_size": "0.001", "tick_size": "0.01"},
+    {"name": "eth_z29", "market_type": "futures", "base": "eth1", "quote": "usdc1", "base_precision": 18,
+     "quote_precision": 6, "lot_size": "0.01", "tick_size": "0.1"},
+]
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTradeHubMetadata(TestCase):
+
+    def setUp(self) -> None:
+        self._tokens = list(TOKENS)
+        self._server = StubServer(routes={
+            '/get_tokens': lambda query: self._tokens,
+            '/get_markets': MARKETS,
+        }).start()
+        self._clock = FakeClock()
+        self._index = MetadataIndex(PublicClient(uri=self._server.url), clock=self._clock)
+
+    def tearDown(self) -> None:
+        self._index.stop()
+        self._server.stop()
+
+    def test_lookups(self):
+        """
+        Check if tokens, markets and pairs are found by key with one request per list.
+        :return:
+        """
+        self.assertEqual(18, self._index.decimals("eth1"))
+        self.assertEqual(TOKENS[2], self._index.token("usdc1"))
+        self.assertEqual(MARKETS[0], self._index.market("swth_eth1"))
+        self.assertEqual(["eth1_usdc1", "eth_z29"], [market["name"] for market in self._index.pair("eth1", "usdc1")])
+        self.assertEqual([], self._index.pair("usdc1", "eth1"))
+        self.assertEqual(Decimal("0.001"), self._index.lot_size("eth1_usdc1"))
+        self.assertEqual(Decimal("0.0000001"), self._index.tick_size("swth_eth1"))
+        self.assertTrue(self._index.has_market("eth_z29"))
+        self.assertFalse(self._index.has_token("SWTH"))
+        with self.assertRaises(ValueError):
+            self._index.market("btc_z29")
+        self.assertEqual(2, self._server.requests)
+
+    def test_reload(self):
+        """
+        Check if unknown keys reload a list at most every min_reload seconds and lists expire.
+        :return:
+        """
+        self.assertEqual(8, self._index.decimals("swth"))
+        self._tokens.append({"name": "Wrapped Bitcoin", "symbol": "wbtc", "denom": "wbtc1", "decimals": 8})
+        with self.assertRaises(ValueError):
+            self._index.token("wbtc1")
+        self.assertEqual(1, self._server.requests)
+        self._clock.now = 10
+        self.assertEqual(8, self._index.decimals("wbtc1"))
+        self.assertEqual(2, self._server.requests)
+        self._clock.now = 310
+        self.assertEqual(6, self._index.decimals("usdc1"))
+        self.assertEqual(3, self._server.requests)
+
+    def test_shared(self):
+        """
+        Check if clients of the same node share one index, also through TokenAmounts.
+        :return:
+        """
+        self.addCleanup(MetadataIndex._shared.pop, self._server.url, None)
+        first = MetadataIndex.shared(PublicClient(uri=self._server.url))
+        second = MetadataIndex.shared(PublicClient(uri=self._server.url))
+        self.assertIs(first, second)
+        amounts = TokenAmounts(index=second)
+        self.assertEqual(Decimal("41.13439708"), amounts.from_base_units("4113439708", "swth"))
+        self.assertEqual(18, first.decimals("eth1"))
+        self.assertEqual(1, self._server.requests)
+        with self.assertRaises(ValueError):
+            TokenAmounts()
+
+    def test_background_refresh(self):
+        """
+        Check if the background thread keeps the lists fresh without lookups waiting for the node.
+        :return:
+        """
+        self._index.min_reload = 3600
+        self._index.start(interval=0.02)
+        deadline = time.monotonic() + 5
+        while self._server.requests < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        requests = self._server.requests
+        self.assertEqual(8, self._index.decimals("swth"))
+        self._tokens.append({"name": "Wrapped Bitcoin", "symbol": "wbtc", "denom": "wbtc1", "decimals": 8})
+        while not self._index.has_token("wbtc1") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(8, self._index.decimals("wbtc1"))
+        self._index.stop()
+        self.assertGreater(self._server.requests, requests)
+
+    def test_failed_reload(self):
+        """
+        Check if a failed reload of an expired list serves the previous list, is logged and retried later.
+        :return:
+        """
+        calls = []
+        get_tokens = self._index.client.get_tokens
+
+        def failing():
+            calls.append(self._clock.now)
+            raise ConnectionError("node down")
+
+        self.assertEqual(8, self._index.decimals("swth"))
+        self._index.client.get_tokens = failing
+        self._clock.now = 310
+        with self.assertLogs('tradehub.metadata', 'WARNING'):
+            self.assertEqual(8, self._index.decimals("swth"))
+        self._clock.now = 315
+        self.assertEqual(18, self._index.decimals("eth1"))
+        self.assertEqual([310], calls)
+        self._clock.now = 321
+        with self.assertLogs('tradehub.metadata', 'WARNING'):
+            self.assertEqual(6, self._index.decimals("usdc1"))
+        self.assertEqual([310, 321], calls)
+        self._index.client.get_tokens = get_tokens
+        self._clock.now = 332
+        self.assertEqual(8, self._index.decimals("swth"))
+        self.assertEqual(2, self._server.requests)
+        # without a previous list there is nothing to serve
+        client = PublicClient(uri=self._server.url)
+        client.get_tokens = failing
+        with self.assertRaises(ConnectionError):
+            MetadataIndex(client, clock=self._clock).decimals("swth")
+
+    def test_lookup_during_reload(self):
+        """
+        Check if lookups are served from the previous list while a reload waits for the node.
+        :return:
+        """
+        self.assertEqual(8, self._index.decimals("swth"))
+        started, release = threading.Event(), threading.Event()
+        get_tokens = self._index.client.get_tokens
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return get_tokens()
+
+        self._index.client.get_tokens = slow
+        self._clock.now = 310
+        reload = threading.Thread(target=self._index.decimals, args=("swth",))
+        reload.start()
+        self.assertTrue(started.wait(5))
+        self.assertEqual(18, self._index.decimals("eth1"))
+        self.assertEqual(MARKETS[0], self._index.market("swth_eth1"))
+        release.set()
+        reload.join(5)
+        self.assertEqual(310, self._index._loaded_at['tokens'])
+
+    def test_background_refresh_failure(self):
+        """
+        Check if failed background reloads are logged and raw clients are decoded.
+        :return:
+        """
+        self.assertEqual(8, MetadataIndex(PublicClient(uri=self._server.url, raw=True)).decimals("swth"))
+
+        def failing():
+            raise ConnectionError("node down")
+
+        self._index.client.get_tokens = failing
+        with self.assertLogs('tradehub.metadata', 'WARNING') as logs:
+            self._index.start(interval=0.01)
+            deadline = time.monotonic() + 5
+            while not logs.output and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self._index.stop()
+        self.assertIn("node down", logs.output[0])
@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+from tradehub.node_pool import NodePool
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+
+def status(height: int) -> dict:
+    return {"jsonrpc": "2.0", "id": -1, "result": {"sync_info": {"latest_block_height": str(height)}}}
+
+
+class TestTradeHubNodePool(TestCase):
+
+    def setUp(self) -> None:
+        self._fast = StubServer(routes={'/get_status': status(100), '/get_block_time': "fast"}).start()
+        self._slow = StubServer(routes={'/get_status': status(100), '/get_block_time': "slow"}).start()
+
+    def tearDown(self) -> None:
+        self._fast.stop()
+        self._slow.stop()
+
+    def test_routes_to_lowest_latency(self):
+        """
+        Check if requests go to the node with the lowest latency EWMA.
+        :return:
+        """
+        pool = NodePool([self._slow.url, self._fast.url])
+        pool.record_success(pool.nodes[0], 0.5)
+        pool.record_success(pool.nodes[1], 0.01)
+        self.assertIs(pool.nodes[1], pool.select())
+        pool.record_success(pool.nodes[1], 5.0)
+        self.assertIs(pool.nodes[0], pool.select())
+
+    def test_unmeasured_nodes_first(self):
+        """
+        Check if every node gets measured before the fastest one takes over.
+        :return:
+        """
+        client = PublicClient(node_pool=NodePool([self._slow.url, self._fast.url]))
+        client.get_block_time()
+        client.get_block_time()
+        self.assertEqual(1, self._slow.requests)
+        self.assertEqual(1, self._fast.requests)
+
+    def test_failover_and_ejection(self):
+        """
+        Check if failed requests are retried on another node and failing nodes get ejected.
+        :return:
+        """
+        down = StubServer()
+        down_url = down.url
+        down.stop()
+        pool = NodePool([down_url, self._fast.url], max_consecutive_failures=1)
+        client = PublicClient(node_pool=pool)
+        self.assertEqual("fast", client.get_block_time())
+        self.assertEqual([pool.nodes[1]], pool.healthy_nodes())
+        self.assertEqual(1, pool.nodes[0].failures)
+        for _ in range(5):
+            self.assertEqual("fast", client.get_block_time())
+        self.assertEqual(1, pool.nodes[0].failures)
+
+    def test_block_height_lag_ejection(self):
+        """
+        Check if nodes lagging in block height are ejected.
+        :return:
+        """
+        self._slow.add_route('/get_status', status(50))
+        pool = NodePool([self._slow.url, self._fast.url], max_block_lag=10)
+        pool.refresh_block_heights()
+        self.assertEqual([100, 50], sorted([node.block_height for node in pool.nodes], reverse=True))
+        self.assertEqual([pool.nodes[1]], pool.healthy_nodes())
+
+    def test_client_arguments(self):
+        """
+        Check if a node pool can not be combined with an ip or uri.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            PublicClient(uri=self._fast.url, node_pool=NodePool([self._fast.url]))
+        with self.assertRaises(ValueError):
+            NodePool([])
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from unittest import TestCase
+
+from tradehub.orderbook import OrderBook
+from tradehub.public_client import PublicClient
+from tradescan.stub_server import StubServer
+
+SNAPSHOT = {
+    "asks": [
+        {"price": "0.0000214", "quantity": "49863"},
+        {"price": "0.0000215", "quantity": "49446"},
+        {"price": "0.0000217", "quantity": "1000"},
+    ],
+    "bids": [
+        {"price": "0.0000212", "quantity": "50248"},
+        {"price": "0.0000211", "quantity": "50295"},
+    ]
+}
+
+
+class TestTradeHubOrderBook(TestCase):
+
+    def setUp(self) -> None:
+        self._book = OrderBook.from_snapshot(SNAPSHOT)
+
+    def test_best_levels(self):
+        """
+        Check if levels are sorted best first and best bid, ask, spread and mid are exact.
+        :return:
+        """
+        self.assertEqual((Decimal("0.0000212"), Decimal("50248")), self._book.best_bid())
+        self.assertEqual((Decimal("0.0000214"), Decimal("49863")), self._book.best_ask())
+        self.assertEqual(Decimal("0.0000002"), self._book.spread())
+        self.assertEqual(Decimal("0.0000213"), self._book.mid())
+        self.assertEqual([Decimal("0.0000214"), Decimal("0.0000215")],
+                         [price for price, _ in self._book.levels("asks", limit=2)])
+        self.assertEqual(5, len(self._book))
+        self.assertIsNone(OrderBook().best_bid())
+
+    def test_diff_updates(self):
+        """
+        Check if a new snapshot is applied as level changes.
+        :return:
+        """
+        snapshot = {
+            "asks": [
+                {"price": "0.0000213", "quantity": "10"},
+                {"price": "0.0000214", "quantity": "49863"},
+                {"price": "0.0000215", "quantity": "40000"},
+            ],
+            "bids": [
+                {"price": "0.0000212", "quantity": "50248"},
+                {"price": "0.0000211", "quantity": "50295"},
+            ]
+        }
+        changes = self._book.update(snapshot)
+        self.assertEqual(sorted([
+            {"side": "asks", "price": Decimal("0.0000213"), "quantity": Decimal("10"), "previous": Decimal("0")},
+            {"side": "asks", "price": Decimal("0.0000215"), "quantity": Decimal("40000"),
+             "previous": Decimal("49446")},
+            {"side": "asks", "price": Decimal("0.0000217"), "quantity": Decimal("0"), "previous": Decimal("1000")},
+        ], key=lambda change: change["price"]), sorted(changes, key=lambda change: change["price"]))
+        self.assertEqual((Decimal("0.0000213"), Decimal("10")), self._book.best_ask())
+        self.assertEqual([], self._book.update(snapshot))
+        self.assertEqual(snapshot, self._book.to_dict())
+
+    def test_depth_vwap_imbalance(self):
+        """
+        Check if depth, vwap and imbalance match a walk over the levels.
+        :return:
+        """
+        self.assertEqual(Decimal("99309"), self._book.depth("asks", "0.0000216"))
+        self.assertEqual(Decimal("0"), self._book.depth("asks", "0.0000213"))
+        self.assertEqual(Decimal("100543"), self._book.depth("bids", "0.0000211"))
+        self.assertEqual(Decimal("0.0000214"), self._book.vwap("asks", "1000"))
+        expected = (Decimal("0.0000214") * 49863 + Decimal("0.0000215") * 137) / 50000
+        self.assertEqual(expected, self._book.vwap("asks", "50000"))
+        self.assertIsNone(self._book.vwap("bids", "1000000"))
+        self.assertAlmostEqual((50248 - 49863) / (50248 + 49863), self._book.imbalance(levels=1))
+        self.assertAlmostEqual((100543 - 100309) / (100543 + 100309), self._book.imbalance())
+        with self.assertRaises(ValueError):
+            self._book.depth("buy", "1")
+
+    def test_client_snapshots(self):
+        """
+        Check if get_orderbook responses feed the book.
+        :return:
+        """
+        with StubServer(routes={'/get_orderbook': SNAPSHOT}) as server:
+            book = OrderBook.from_snapshot(PublicClient(uri=server.url).get_orderbook("swth_eth1"))
+        self.assertEqual(SNAPSHOT, book.to_dict())
@@ -0,0 +1,164 @@
+import asyncio
+import sys
+
+from decimal import Decimal
+from unittest import TestCase
+
+from tradehub.async_public_client import AsyncPublicClient
+from tradehub.public_client import PublicClient
+from tradehub.records import Candle, Order, Trade
+from tradescan.stub_server import StubServer
+
+TRADE = {
+    "id": "103965",
+    "block_created_at": "2021-01-10T21:59:53.563633+01:00",
+    "taker_id": "11DCD0B7B0A0021476B8C801FD627B297EBDBBE7436BFEEC5ADB734DCF3C9291",
+    "taker_address": "swth1qlue2pat9cxx2s5xqrv0ashs475n9va963h4hz",
+    "taker_fee_amount": "0.000007",
+    "taker_fee_denom": "eth1",
+    "taker_side": "buy",
+    "maker_id": "A59962E7A61F361F7DE5BF00D7A6A8225668F449D73301FB9D3787E4C13DEE60",
+    "maker_address": "swth1wmcj8gmz4tszy5v8c0d9lxnmguqcdkw22275w5",
+    "maker_fee_amount": "-0.0000035",
+    "maker_fee_denom": "eth1",
+    "maker_side": "sell",
+    "market": "eth1_usdc1",
+    "price": "1251.51",
+    "quantity": "0.007",
+    "liquidation": "",
+    "taker_username": "devel484",
+    "maker_username": "",
+    "block_height": "6156871"
+}
+
+ORDER = {
+    "order_id": "4F54D2AE0D793F833806109B4278335BF3D392D4096B682B9A27AF9F8A8BCA58",
+    "block_height": 6117321,
+    "triggered_block_height": 0,
+    "address": "swth1wmcj8gmz4tszy5v8c0d9lxnmguqcdkw22275w5",
+    "market": "eth1_usdc1",
+    "side": "buy",
+    "price": "1255.68",
+    "quantity": "0.01",
+    "available": "0.01",
+    "filled": "0",
+    "order_status": "open",
+    "order_type": "limit",
+    "initiator": "amm",
+    "time_in_force": "gtc",
+    "stop_price": "0",
+    "trigger_type": "",
+    "allocated_margin_denom": "usdc1",
+    "allocated_margin_amount": "0",
+    "is_liquidation": False,
+    "is_post_only": False,
+    "is_reduce_only": False,
+    "type": "",
+    "block_created_at": "2021-01-09T22:13:34.711571+01:00",
+    "username": "",
+    "id": "990817"
+}
+
+CANDLE = {
+    "id": 38648,
+    "market": "swth_eth1",
+    "time": "2021-01-09T15:35:00+01:00",
+    "resolution": 5,
+    "open": "0.0000212",
+    "close": "0.0000212",
+    "high": "0.0000212",
+    "low": "0.0000212",
+    "volume": "2100",
+    "quote_volume": "0.04452"
+}
+
+
+class TestTradeHubRecords(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={
+            '/get_trades': [TRADE],
+            '/get_orders': [ORDER],
+            '/candlesticks': [CANDLE],
+        }).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_parse_trade(self):
+        """
+        Check if trade fields are parsed once into numbers and epoch seconds.
+        :return:
+        """
+        trade = Trade.from_dict(TRADE)
+        self.assertEqual(103965, trade.id)
+        self.assertEqual(6156871, trade.block_height)
+        self.assertEqual(1251.51, trade.price)
+        self.assertEqual(-0.0000035, trade.maker_fee_amount)
+        self.assertEqual(1610312393.563633, trade.block_created_at)
+        self.assertEqual("", trade.liquidation)
+        self.assertFalse(hasattr(trade, '__dict__'))
+        # item access keeps dict based helpers working
+        self.assertEqual(trade.price, trade["price"])
+        self.assertIsNone(trade.get("unknown"))
+        with self.assertRaises(KeyError):
+            trade["unknown"]
+        self.assertEqual(set(Trade.__slots__), set(trade.to_dict()))
+
+    def test_parse_order_and_candle(self):
+        """
+        Check if order and candle fields are parsed and exact decimals are supported.
+        :return:
+        """
+        order = Order.from_dict(ORDER, number=Decimal)
+        self.assertEqual(990817, order.id)
+        self.assertEqual(Decimal("1255.68"), order.price)
+        self.assertEqual(0, order.triggered_block_height)
+        self.assertFalse(order.is_post_only)
+        candle = Candle.from_dict(CANDLE)
+        self.assertEqual(0.0000212, candle.close)
+        self.assertEqual(5, candle.resolution)
+        self.assertEqual(1610202900.0, candle.time)
+        self.assertEqual(Candle.from_list([CANDLE]), [candle])
+
+    def test_equality_and_interning(self):
+        """
+        Check if records compare by value, are not hashable and only low cardinality strings are interned.
+        :return:
+        """
+        trade = Trade.from_dict(TRADE)
+        self.assertEqual(Trade.from_dict(dict(TRADE)), trade)
+        self.assertNotEqual(Trade.from_dict(dict(TRADE, price="1")), trade)
+        with self.assertRaises(TypeError):
+            hash(trade)
+        market = "".join(["eth1_", "usdc1"])
+        self.assertIs(sys.intern(market), Trade.from_dict(dict(TRADE, market=market)).market)
+        address = "".join(["swth1", "qlue2pat9cxx2s5xqrv0ashs475n9va963h4hz"])
+        self.assertIs(address, Trade.from_dict(dict(TRADE, taker_address=address)).taker_address)
+
+    def test_client_records(self):
+        """
+        Check if a client with records enabled returns records from trades, orders and candles.
+        :return:
+        """
+        client = PublicClient(uri=self._server.url, records=True)
+        self.assertIsInstance(client.get_trades()[0], Trade)
+        self.assertIsInstance(client.get_orders()[0], Order)
+        self.assertIsInstance(client.get_candlesticks("swth_eth1", 5, 1610203000, 1610203090)[0], Candle)
+        self.assertEqual([103965], [trade.id for trade in client.iter_trades()])
+        self.assertIsInstance(PublicClient(uri=self._server.url).get_trades()[0], dict)
+        with self.assertRaises(ValueError):
+            PublicClient(uri=self._server.url, records=True, raw=True)
+
+    def test_async_client_records(self):
+        """
+        Check if the async client converts responses once they are awaited.
+        :return:
+        """
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url, records=True) as client:
+                return await asyncio.gather(client.get_trades(), client.get_orders())
+
+        trades, orders = asyncio.run(run())
+        self.assertIsInstance(trades[0], Trade)
+        self.assertIsInstance(orders[0], Order)
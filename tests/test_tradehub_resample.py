@@ -0,0 +1,166 @@
+import asyncio
+import random
+import time
+
+from decimal import Decimal
+from unittest import TestCase, skipUnless
+
+from tradehub import resample
+from tradehub.async_public_client import AsyncPublicClient
+from tradehub.candle_file import candles_to_records
+from tradehub.public_client import PublicClient
+from tradehub.resample import CandleAggregator, resample_candles, resample_records
+from tradescan.stub_server import StubServer
+
+JANUARY = 1609459200
+
+
+def iso(epoch: int) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(epoch))
+
+
+def trades(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [{"id": str(n), "market": "swth_eth1", "block_created_at": iso(JANUARY + n * 7),
+             "price": f"0.0000{rng.randint(200, 230)}", "quantity": str(rng.randint(1, 5000))}
+            for n in range(1, count + 1)]
+
+
+def candlesticks(query: dict) -> list:
+    resolution = int(query["resolution"]) * 60
+    first = -(-int(query["from"]) // resolution)
+    last = int(query["to"]) // resolution
+    return [{"id": n, "market": query["market"], "resolution": int(query["resolution"]), "time": iso(n * resolution),
+             "open": str(n % 7 + 1), "close": str(n % 5 + 1), "high": "9", "low": str(n % 3 + 0.5),
+             "volume": "1.1", "quote_volume": "2"} for n in range(first, last + 1)]
+
+
+class TestTradeHubResample(TestCase):
+
+    def test_resample_candles(self):
+        """
+        Check if candles are merged into aligned periods with exact OHLC and summed volumes.
+        :return:
+        """
+        minutes = candlesticks({"market": "swth_eth1", "resolution": 1, "from": JANUARY + 600, "to": JANUARY + 3599})
+        candles = resample_candles(reversed(minutes), 15)
+        self.assertEqual([iso(JANUARY + quarter * 900) for quarter in range(4)], [c["time"] for c in candles])
+        first = candles[0]
+        self.assertEqual(((JANUARY + 600) // 60 % 7 + 1, (JANUARY + 899) // 60 % 5 + 1),
+                         (int(first["open"]), int(first["close"])))
+        self.assertEqual(("9", "0.5", "5.5", "10"), (first["high"], first["low"], first["volume"],
+                                                     first["quote_volume"]))
+        self.assertEqual(Decimal("16.5"), Decimal(candles[1]["volume"]))
+        self.assertEqual((JANUARY + 900) // 900, candles[1]["id"])
+        with self.assertRaises(ValueError):
+            resample_candles(minutes, 0)
+        with self.assertRaises(ValueError):
+            resample_candles(candlesticks({"market": "swth_eth1", "resolution": 30, "from": JANUARY,
+                                           "to": JANUARY + 3600}), 45)
+
+    def test_plain_amounts(self):
+        """
+        Check if resampled amounts are plain decimal strings for tiny Decimal and float values.
+        :return:
+        """
+        minutes = [{"id": n, "market": "swth_eth1", "resolution": 1, "time": iso(JANUARY + n * 60),
+                    "open": "0.00000021", "close": "0.0000212", "high": "0.0000212", "low": "0.00000021",
+                    "volume": "2100.10", "quote_volume": "0.00000001"} for n in range(2)]
+        candle = resample_candles(minutes, 5)[0]
+        self.assertEqual(("0.00000021", "0.0000212", "0.00000021", "4200.2", "0.00000002"),
+                         (candle["open"], candle["close"], candle["low"], candle["volume"], candle["quote_volume"]))
+        candle = resample_candles(minutes, 5, number=float)[0]
+        self.assertEqual(("0.00000021", "0.0000212", "4200.2"), (candle["open"], candle["high"], candle["volume"]))
+
+    @skipUnless(resample.np is not None, "numpy is not installed")
+    def test_resample_records(self):
+        """
+        Check if candle file records are resampled like candles.
+        :return:
+        """
+        minutes = candlesticks({"market": "swth_eth1", "resolution": 1, "from": JANUARY, "to": JANUARY + 86400})
+        records = resample_records(candles_to_records(minutes), 240, offset=3600)
+        expected = resample_candles(minutes, 240, offset=3600)
+        self.assertEqual(len(expected), len(records))
+        for candle, record in zip(expected, records):
+            self.assertEqual(int(resample.parse_timestamp(candle["time"])), record['time'])
+            for field in ('open', 'high', 'low', 'close', 'volume', 'quote_volume'):
+                self.assertAlmostEqual(float(candle[field]), record[field])
+        self.assertEqual(0, len(resample_records(candles_to_records(minutes)[:0], 240)))
+
+    def test_aggregator(self):
+        """
+        Check if candles built from trades match candles resampled from finer candles built from the same trades.
+        :return:
+        """
+        closed = []
+        stream = trades(2000)
+        minute_aggregator = CandleAggregator(1)
+        minutes = minute_aggregator.add_all(stream) + minute_aggregator.flush()
+        aggregator = CandleAggregator(15, on_close=closed.append)
+        self.assertEqual(closed, aggregator.add_all(stream))
+        # flushed candles are passed to on_close as well
+        flushed = aggregator.flush()
+        self.assertEqual(closed[-1:], flushed)
+        self.assertEqual(resample_candles(minutes, 15), closed)
+        self.assertEqual(sum(Decimal(trade["quantity"]) for trade in stream),
+                         sum(Decimal(candle["volume"]) for candle in closed))
+        self.assertIsNone(aggregator.current("swth_eth1"))
+        with self.assertRaises(ValueError):
+            aggregator.add_all([stream[-1], stream[0]])
+
+    def test_aggregator_flush(self):
+        """
+        Check if flushing closes only candles whose period has ended and markets are kept apart.
+        :return:
+        """
+        aggregator = CandleAggregator(5)
+        aggregator.add({"id": "1", "market": "swth_eth1", "block_created_at": iso(JANUARY + 10), "price": "2",
+                        "quantity": "3"})
+        aggregator.add({"id": "2", "market": "eth1_usdc1", "block_created_at": iso(JANUARY + 290), "price": "1200",
+                        "quantity": "0.5"})
+        aggregator.add({"id": "3", "market": "swth_eth1", "block_created_at": iso(JANUARY + 20), "price": "1.5",
+                        "quantity": "1"})
+        self.assertEqual({"id": JANUARY // 300, "market": "swth_eth1", "time": iso(JANUARY), "resolution": 5,
+                          "open": "2", "close": "1.5", "high": "2", "low": "1.5", "volume": "4",
+                          "quote_volume": "7.5"}, aggregator.current("swth_eth1"))
+        self.assertEqual([], aggregator.flush(JANUARY + 299))
+        self.assertEqual(["swth_eth1", "eth1_usdc1"], [candle["market"] for candle in aggregator.flush(JANUARY + 300)])
+        self.assertEqual([], aggregator.flush())
+
+
+class TestTradeHubResampledRange(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer(routes={'/candlesticks': candlesticks}).start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_resampled_range(self):
+        """
+        Check if granularities which are not served are resampled from the largest served divisor.
+        :return:
+        """
+        client = PublicClient(uri=self._server.url)
+        candles = client.get_candlesticks_range("swth_eth1", 240, JANUARY + 60, JANUARY + 86400)
+        # the period starting at the end of the range is incomplete and left out
+        self.assertEqual([iso(JANUARY + hours * 3600) for hours in range(4, 21, 4)], [c["time"] for c in candles])
+        self.assertEqual(resample_candles(client.get_candlesticks("swth_eth1", 60, JANUARY + 14400,
+                                                                  JANUARY + 86399), 240), candles)
+        # a period has to end within the range
+        self.assertEqual(candles[:-1], client.get_candlesticks_range("swth_eth1", 240, JANUARY + 60,
+                                                                     JANUARY + 86399))
+        self.assertEqual([], client.get_candlesticks_range("swth_eth1", 15, JANUARY + 60, JANUARY + 120))
+        self.assertEqual([], client.get_candlesticks_range("swth_eth1", 15, JANUARY, JANUARY + 899))
+        records = PublicClient(uri=self._server.url, records=True).get_candlesticks_range(
+            "swth_eth1", 15, JANUARY, JANUARY + 3600)
+        self.assertEqual([JANUARY + quarter * 900 for quarter in range(4)], [candle.time for candle in records])
+        # three complete 5 minute candles
+        self.assertAlmostEqual(3.3, records[-1].volume)
+
+        async def run():
+            async with AsyncPublicClient(uri=self._server.url) as async_client:
+                return await async_client.get_candlesticks_range("swth_eth1", 240, JANUARY + 60, JANUARY + 86400)
+
+        self.assertEqual(candles, asyncio.run(run()))
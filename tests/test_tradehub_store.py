@@ -0,0 +1,120 @@
+import os
+import tempfile
+
+from datetime import datetime, timezone
+from unittest import TestCase
+
+from tradehub.public_client import PublicClient
+from tradehub.store import TradeStore
+from tradescan.stub_server import StubServer
+
+GENESIS = 1609999200
+
+
+def iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def trade(trade_id: int) -> dict:
+    return {"id": str(trade_id), "block_created_at": iso(GENESIS + trade_id), "block_height": str(1000 + trade_id),
+            "market": "swth_eth1" if trade_id % 2 else "eth1_usdc1", "price": "0.0000212", "quantity": "100",
+            "taker_address": "swth1taker" if trade_id % 3 else "swth1other", "maker_address": "swth1maker",
+            "taker_side": "buy"}
+
+
+def order(order_id: int) -> dict:
+    return {"id": str(order_id), "order_id": f"ORDER{order_id}", "block_created_at": iso(GENESIS + order_id),
+            "block_height": 2000 + order_id, "market": "swth_eth1", "address": "swth1maker",
+            "order_status": "filled" if order_id % 2 else "open", "price": "0.0000212", "quantity": "100"}
+
+
+def paged_route(rows: list):
+    def route(query: dict) -> list:
+        before_id = int(query.get("before_id", 10 ** 9))
+        after_id = int(query.get("after_id", 0))
+        limit = int(query.get("limit", 200))
+        market = query.get("market")
+        result = [row for row in sorted(rows, key=lambda row: -int(row["id"]))
+                  if after_id < int(row["id"]) < before_id and market in (None, row["market"])]
+        return result[:limit]
+    return route
+
+
+class TestTradeHubStore(TestCase):
+
+    def setUp(self) -> None:
+        self._trades = [trade(n) for n in range(1, 501)]
+        self._orders = [order(n) for n in range(1, 51)]
+        self._server = StubServer(routes={
+            '/get_trades': paged_route(self._trades),
+            '/get_orders': paged_route(self._orders),
+        }).start()
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "tradehub.sqlite")
+        self._client = PublicClient(uri=self._server.url)
+
+    def tearDown(self) -> None:
+        self._server.stop()
+        self._directory.cleanup()
+
+    def test_incremental_sync(self):
+        """
+        Check if the first sync stores the history and later syncs only request new trades.
+        :return:
+        """
+        with TradeStore(self._path, client=self._client, page_size=100) as store:
+            self.assertEqual(500, store.sync_trades())
+            self.assertEqual(500, store.last_id('get_trades'))
+            requests = self._server.requests
+            self._trades.extend(trade(n) for n in range(501, 521))
+            self.assertEqual(20, store.sync_trades())
+            self.assertEqual(requests + 1, self._server.requests)
+            self.assertEqual(0, store.sync_trades())
+            self.assertEqual(520, store.count())
+            # filtered syncs keep their own position
+            self.assertEqual(260, store.sync_trades(market="swth_eth1"))
+            self.assertEqual(519, store.last_id('get_trades', market="swth_eth1"))
+
+    def test_queries_without_network(self):
+        """
+        Check if a reopened store answers queries by market, address, time and height without a client.
+        :return:
+        """
+        with TradeStore(self._path, client=self._client) as store:
+            store.sync_trades()
+        self._server.stop()
+        with TradeStore(self._path) as store:
+            self.assertEqual(trade(500), store.trades(limit=1)[0])
+            self.assertEqual(250, len(store.trades(market="swth_eth1")))
+            self.assertEqual([3, 6, 9], [int(row["id"]) for row in store.trades(address="swth1other", order_by='asc',
+                                                                                 limit=3)])
+            self.assertEqual(500, len(store.trades(address="swth1maker")))
+            self.assertEqual([100, 101], [int(row["id"]) for row in store.trades(
+                start_time=iso(GENESIS + 100), end_time=GENESIS + 102, order_by='asc')])
+            self.assertEqual([11, 10], [int(row["id"]) for row in store.trades(from_height=1010, to_height=1011)])
+            with self.assertRaises(ValueError):
+                store.sync_trades()
+            with self.assertRaises(ValueError):
+                store.trades(order_by='newest')
+
+    def test_orders(self):
+        """
+        Check if orders are synced, queried by status and refreshed from an older id.
+        :return:
+        """
+        with TradeStore(self._path, client=self._client) as store:
+            self.assertEqual(50, store.sync_orders())
+            self.assertEqual(25, len(store.orders(order_status="open")))
+            self.assertEqual(order(7), store.order("ORDER7"))
+            self._orders[-8]["order_status"] = "filled"
+            self.assertEqual(0, store.sync_orders())
+            self.assertEqual(10, store.sync_orders(after_id=40))
+            self.assertEqual("filled", store.order("ORDER43")["order_status"])
+
+    def test_records_client(self):
+        """
+        Check if clients returning records are rejected, the store keeps the rows as returned by the API.
+        :return:
+        """
+        with self.assertRaises(ValueError):
+            TradeStore(self._path, client=PublicClient(uri=self._server.url, records=True))
@@ -0,0 +1,104 @@
+from unittest import TestCase
+
+from tradehub.tendermint import TendermintRPCClient, TendermintRPCError
+from tradescan.stub_server import StubServer
+
+LATEST_HEIGHT = 1000
+
+
+def result(method: str, params: dict) -> dict:
+    height = int(params.get("height", LATEST_HEIGHT))
+    if height > LATEST_HEIGHT:
+        raise ValueError(f"height {height} must be less than or equal to the current blockchain height {LATEST_HEIGHT}")
+    if method == 'block':
+        return {"block": {"header": {"height": str(height)}, "data": {"txs": []}}}
+    if method == 'block_results':
+        return {"height": str(height), "txs_results": None}
+    if method == 'validators':
+        return {"block_height": str(height), "validators": [{"address": "A", "voting_power": "10"}],
+                "count": "1", "total": "1"}
+    if method == 'blockchain':
+        # like tendermint only the newest 20 blocks of the range are returned
+        maximum = min(int(params["maxHeight"]), LATEST_HEIGHT)
+        minimum = max(int(params["minHeight"]), maximum - 19)
+        return {"last_height": str(LATEST_HEIGHT),
+                "block_metas": [{"header": {"height": str(n)}} for n in range(maximum, minimum - 1, -1)]}
+    if method == 'status':
+        return {"sync_info": {"latest_block_height": str(LATEST_HEIGHT)}}
+    raise ValueError(f"Method not found {method}")
+
+
+def answer(call: dict) -> dict:
+    try:
+        return {"jsonrpc": "2.0", "id": call["id"], "result": result(call["method"], call.get("params") or {})}
+    except ValueError as error:
+        return {"jsonrpc": "2.0", "id": call["id"],
+                "error": {"code": -32603, "message": "Internal error", "data": str(error)}}
+
+
+def json_rpc(body):
+    if isinstance(body, list):
+        # batch answers are not ordered like the calls
+        return [answer(call) for call in reversed(body)]
+    return answer(body)
+
+
+class TestTradeHubTendermintRPC(TestCase):
+
+    def setUp(self) -> None:
+        self._server = StubServer().start()
+        self._server.add_post_route('/', json_rpc)
+        self._client = TendermintRPCClient(self._server.url, batch_size=100)
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_single_calls(self):
+        """
+        Check if single calls return the result and raise errors.
+        :return:
+        """
+        self.assertEqual(str(LATEST_HEIGHT), self._client.status()["sync_info"]["latest_block_height"])
+        self.assertEqual("5", self._client.block(5)["block"]["header"]["height"])
+        self.assertEqual("5", self._client.validators(5)["block_height"])
+        with self.assertRaises(TendermintRPCError):
+            self._client.block(LATEST_HEIGHT + 1)
+
+    def test_batch_round_trips(self):
+        """
+        Check if hundreds of heights are fetched in few round-trips and returned in call order.
+        :return:
+        """
+        heights = list(range(1, 351))
+        blocks = self._client.blocks(heights)
+        self.assertEqual([str(height) for height in heights], [block["block"]["header"]["height"] for block in blocks])
+        self.assertEqual(4, self._server.requests)
+        results = self._client.blocks_results(heights[:100])
+        self.assertEqual("100", results[-1]["height"])
+        validator_sets = self._client.validator_sets([7, 3])
+        self.assertEqual(["7", "3"], [validators["block_height"] for validators in validator_sets])
+        self.assertEqual(6, self._server.requests)
+
+    def test_batch_errors(self):
+        """
+        Check if failed calls raise or are returned in place of their result.
+        :return:
+        """
+        with self.assertRaises(TendermintRPCError):
+            self._client.blocks([LATEST_HEIGHT, LATEST_HEIGHT + 1])
+        blocks = self._client.blocks([LATEST_HEIGHT, LATEST_HEIGHT + 1], raise_errors=False)
+        self.assertEqual(str(LATEST_HEIGHT), blocks[0]["block"]["header"]["height"])
+        self.assertIsInstance(blocks[1], TendermintRPCError)
+        self.assertEqual(-32603, blocks[1].code)
+
+    def test_blockchain_range(self):
+        """
+        Check if header ranges are split into 20 block calls and returned in ascending order.
+        :return:
+        """
+        self.assertEqual(20, len(self._client.blockchain(1, 500)["block_metas"]))
+        metas = self._client.blockchain_range(101, 555)
+        self.assertEqual(list(range(101, 556)), [int(meta["header"]["height"]) for meta in metas])
+        # one call for blockchain and one batch of 23 calls
+        self.assertEqual(2, self._server.requests)
+        self.assertEqual([], self._client.blockchain_range(5, 4))
@@ -0,0 +1,128 @@
+import asyncio
+
+from unittest import TestCase
+
+from tradehub.tendermint import NEW_BLOCK_QUERY, TX_QUERY, TendermintRPCError, TendermintWebsocketClient
+from tradescan.stub_server import WebsocketStubServer
+from tradescan.websocket import OPCODE_CONTINUATION, OPCODE_TEXT, encode_frame, read_frame
+
+
+def new_block(height: int) -> dict:
+    return {"type": "tendermint/event/NewBlock", "value": {"block": {"header": {"height": str(height)}}}}
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestTradeHubTendermintWebsocket(TestCase):
+
+    def setUp(self) -> None:
+        self._server = WebsocketStubServer().start()
+
+    def tearDown(self) -> None:
+        self._server.stop()
+
+    def test_new_blocks(self):
+        """
+        Check if NewBlock events reach the callback and the async iterator in order.
+        :return:
+        """
+        heights = []
+
+        async def run():
+            client = TendermintWebsocketClient(self._server.url)
+            client.subscribe_new_blocks(lambda event: heights.append(event["data"]["value"]["block"]["header"]["height"]))
+            events = []
+            async with client:
+                await client.wait_connected(timeout=5)
+                await wait_for(lambda: self._server.subscribers(NEW_BLOCK_QUERY) == 1)
+                for height in range(1, 4):
+                    self._server.publish(NEW_BLOCK_QUERY, new_block(height))
+                self._server.publish(NEW_BLOCK_QUERY, new_block(4))
+                async for event in client:
+                    events.append(event)
+                    if len(events) == 1:
+                        self._server.publish(NEW_BLOCK_QUERY, new_block(5))
+                    if len(events) == 2:
+                        break
+            return client, events
+
+        client, events = asyncio.run(run())
+        self.assertEqual(["1", "2", "3", "4", "5"], heights)
+        # the iterator only sees events after it started
+        self.assertEqual([NEW_BLOCK_QUERY] * 2, [event["query"] for event in events])
+        self.assertEqual(5, client.last_height)
+
+    def test_reconnect_and_resubscribe(self):
+        """
+        Check if a dropped connection is reopened, every subscription is renewed and missed heights are reported.
+        :return:
+        """
+        async def run():
+            client = TendermintWebsocketClient(self._server.url, reconnect_delay=0.01)
+            client.subscribe_new_blocks()
+            client.subscribe_txs("message.action='create_order'")
+            tx_query = f"{TX_QUERY} AND message.action='create_order'"
+            events = []
+            async with client:
+                iterator = client.__aiter__()
+                await client.wait_connected(timeout=5)
+                await wait_for(lambda: self._server.subscribers(tx_query) == 1)
+                self._server.publish(NEW_BLOCK_QUERY, new_block(10))
+                events.append(await iterator.__anext__())
+
+                self._server.disconnect_all()
+                await wait_for(lambda: client.reconnects == 1 and self._server.subscribers(tx_query) == 1
+                               and self._server.subscribers(NEW_BLOCK_QUERY) == 1)
+                self._server.publish(NEW_BLOCK_QUERY, new_block(13))
+                self._server.publish(tx_query, {"type": "tendermint/event/Tx", "value": {}}, {"tx.hash": ["AB"]})
+                events.append(await iterator.__anext__())
+                events.append(await iterator.__anext__())
+                await iterator.aclose()
+            return client, events
+
+        client, events = asyncio.run(run())
+        self.assertEqual(4, self._server.subscribe_calls)
+        self.assertEqual([11, 12], client.missed_heights)
+        self.assertEqual({"AB"}, set(events[-1]["events"]["tx.hash"]))
+        self.assertEqual(2, client.stats()["connects"])
+
+    def test_subscription_error(self):
+        """
+        Check if error responses are passed to on_error and raised by the iterator.
+        :return:
+        """
+        errors = []
+
+        async def run():
+            async with TendermintWebsocketClient(self._server.url, on_error=errors.append) as client:
+                client.subscribe("message.action='create_order'")
+                async for _ in client:
+                    pass
+
+        with self.assertRaises(TendermintRPCError):
+            asyncio.run(run())
+        self.assertEqual(1, len(errors))
+
+    def test_frames(self):
+        """
+        Check if masked frames of every length encoding and fragmented messages are read back.
+        :return:
+        """
+        async def run():
+            reader = asyncio.StreamReader()
+            for size in (0, 125, 126, 65535, 70000):
+                reader.feed_data(encode_frame(OPCODE_TEXT, b'x' * size, mask=True))
+            reader.feed_data(encode_frame(OPCODE_TEXT, b'abc', mask=False, fin=False))
+            reader.feed_data(encode_frame(OPCODE_CONTINUATION, b'def', mask=False))
+            return [await read_frame(reader) for _ in range(7)]
+
+        frames = asyncio.run(run())
+        self.assertEqual([0, 125, 126, 65535, 70000], [len(payload) for _, _, payload in frames[:5]])
+        self.assertTrue(all(payload == b'x' * len(payload) for _, _, payload in frames[:5]))
+        self.assertEqual([(False, OPCODE_TEXT, b'abc'), (True, OPCODE_CONTINUATION, b'def')], frames[5:])
@@ -0,0 +1,265 @@
+"""
+Description:
+    Exact fixed-point conversion between human readable token amounts like "41.13439708" and the raw integer
+    amounts of the chain like "4113439708", which are scaled by the 'decimals' of the token.
+    Single amounts are converted with integers and decimal.Decimal, whole balance and trade lists with the
+    vectorized parsers of tradehub.columns if NumPy is installed. TokenAmounts looks up the decimals of every
+    denom in the get_tokens metadata of a tradehub.metadata.MetadataIndex.
+Usage:
+    from tradehub.amounts import TokenAmounts, from_base_units, to_base_units
+
+    to_base_units("41.13439708", 8)         # 4113439708
+    from_base_units("4113439708", 8)        # Decimal('41.13439708')
+
+    amounts = TokenAmounts(public_client)
+    amounts.coins(public_client.get_account("swth1vwges9p847l9csj8ehrlgzajhmt4fcq4sd7gzl")["result"]["value"]["coins"])
+"""
+
+import time
+
+from array import array
+from decimal import Decimal, ROUND_DOWN
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from tradehub import columns
+from tradehub.columns import parse_decimals
+from tradehub.metadata import MetadataIndex
+
+Amount = Union[str, int, float, Decimal]
+
+BALANCE_FIELDS = ('available', 'order', 'position')
+TRADE_FEE_FIELDS = (('taker_fee_amount', 'taker_fee_denom'), ('maker_fee_amount', 'maker_fee_denom'))
+
+
+def _decimal(amount: Amount) -> Decimal:
+    if isinstance(amount, Decimal):
+        return amount
+    if isinstance(amount, float):
+        # the shortest repr, 0.1 is "0.1" and not the binary expansion of the float
+        return Decimal(repr(amount))
+    return Decimal(amount)
+
+
+def to_base_units(amount: Amount, decimals: int, rounding: str = ROUND_DOWN) -> int:
+    """
+    Convert a human readable amount to the raw integer amount of the chain.
+
+    Example::
+
+        to_base_units("0.000064752601707981", 18)   # 64752601707981
+
+    :param amount: amount as str, int, float or Decimal, floats are taken by their shortest repr.
+    :param decimals: decimals of the token.
+    :param rounding: decimal rounding mode for digits beyond 'decimals', default truncation.
+    :return: int
+    """
+    if isinstance(amount, int):
+        return amount * 10 ** decimals
+    value = _decimal(amount)
+    if not value.is_finite():
+        raise ValueError(f"Amount {amount} is not finite!")
+    return int(value.scaleb(decimals).to_integral_value(rounding=rounding))
+
+
+def from_base_units(amount: Union[str, int], decimals: int) -> Decimal:
+    """
+    Convert a raw integer amount of the chain to an exact human readable amount.
+
+    :param amount: raw amount as str or int, eg. "64752601707981".
+    :param decimals: decimals of the token.
+    :return: Decimal
+    """
+    return Decimal(int(amount)).scaleb(-decimals)
+
+
+def _groups(decimals: Union[int, Sequence[int]], size: int) -> Dict[int, List[int]]:
+    """
+    Row indices by decimals, a single int covers all rows.
+    """
+    if isinstance(decimals, int):
+        return {decimals: list(range(size))}
+    if len(decimals) != size:
+        raise ValueError("Amounts and decimals need to be of the same length!")
+    groups: Dict[int, List[int]] = {}
+    for index, row_decimals in enumerate(decimals):
+        groups.setdefault(int(row_decimals), []).append(index)
+    return groups
+
+
+def _exact_column(amounts: Sequence[Amount], scale: int):
+    """
+    Scaled amounts as int64 column, or as object column of exact Python ints if they do not fit int64.
+    """
+    try:
+        return parse_decimals(amounts, scale=scale)
+    except OverflowError:
+        return columns.np.array([to_base_units(amount, scale) for amount in amounts], dtype=object)
+
+
+def to_base_units_batch(amounts: Sequence[Amount], decimals: Union[int, Sequence[int]]):
+    """
+    Convert a list of human readable amounts to raw integer amounts, digits beyond the decimals are truncated.
+    Raw amounts beyond int64, like 18 decimal amounts above 9.22, are returned as exact Python ints.
+
+    :param amounts: amounts as str, numbers are accepted as well.
+    :param decimals: decimals of all amounts or one value per amount.
+    :return: int64 numpy array, object numpy array of int if an amount does not fit int64, array.array without
+        NumPy or a list of int without NumPy if an amount does not fit int64
+    """
+    if columns.np is None:
+        if isinstance(decimals, int):
+            raw = [to_base_units(amount, decimals) for amount in amounts]
+        else:
+            raw = [to_base_units(amount, int(row_decimals)) for amount, row_decimals in zip(amounts, decimals)]
+        try:
+            return array('q', raw)
+        except OverflowError:
+            return raw
+    np = columns.np
+    groups = _groups(decimals, len(amounts))
+    if len(groups) == 1:
+        (scale, _), = groups.items()
+        return _exact_column(amounts, scale)
+    parts = {scale: _exact_column([amounts[index] for index in indices], scale) for scale, indices in groups.items()}
+    exact = any(part.dtype == object for part in parts.values())
+    result = np.zeros(len(amounts), dtype=object if exact else np.int64)
+    for scale, indices in groups.items():
+        result[indices] = parts[scale] if not exact else [int(value) for value in parts[scale]]
+    return result
+
+
+def from_base_units_batch(amounts: Sequence[Union[str, int]], decimals: Union[int, Sequence[int]],
+                          exact: bool = False):
+    """
+    Convert a list of raw integer amounts to human readable amounts.
+
+    :param amounts: raw amounts as str or int.
+    :param decimals: decimals of all amounts or one value per amount.
+    :param exact: return a list of Decimal instead of a float64 column.
+    :return: list of Decimal, float64 numpy array or array.array without NumPy
+    """
+    if exact:
+        if isinstance(decimals, int):
+            return [from_base_units(amount, decimals) for amount in amounts]
+        return [from_base_units(amount, int(row_decimals)) for amount, row_decimals in zip(amounts, decimals)]
+    if columns.np is None:
+        return array('d', (float(amount) for amount in from_base_units_batch(amounts, decimals, exact=True)))
+    np = columns.np
+    scales = np.full(len(amounts), decimals) if isinstance(decimals, int) else np.asarray(decimals, dtype=np.int64)
+    if len(scales) != len(amounts):
+        raise ValueError("Amounts and decimals need to be of the same length!")
+    try:
+        raw = parse_decimals(amounts, scale=0)
+    except OverflowError:
+        raw = None
+    # integers below 2 ** 53 and powers of ten up to 10 ** 22 are exact floats, so the division rounds correctly
+    if raw is None or not (np.abs(raw) < 2 ** 53).all() or (scales > 22).any():
+        return np.array([float(amount) for amount in from_base_units_batch(amounts, decimals, exact=True)])
+    return raw / np.power(10.0, scales)
+
+
+class TokenAmounts(object):
+    """
+    Amount conversions by denom, the decimals come from get_tokens.
+
+    The decimals are looked up in a MetadataIndex, which loads the token list on first use and again once it
+    is older than 'ttl'. An unknown denom triggers one early reload, so tokens listed after the last load are
+    found, at most every 'min_reload' seconds. Thread safe.
+    """
+
+    def __init__(self, client=None, ttl: float = 300.0, min_reload: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic, index: Optional[MetadataIndex] = None):
+        """
+        :param client: PublicClient, eg. one with a ResponseCache.
+        :param ttl: seconds until the token list is loaded again.
+        :param min_reload: minimum seconds between reloads caused by unknown denoms.
+        :param clock: monotonic time source, only replaced in tests.
+        :param index: existing index to use instead of one for 'client', eg. MetadataIndex.shared(client).
+        """
+        if index is None and client is None:
+            raise ValueError("TokenAmounts needs a client or a metadata index!")
+        self.index = index if index is not None else MetadataIndex(client, ttl=ttl, min_reload=min_reload,
+                                                                   clock=clock)
+
+    def decimals(self, denom: str) -> int:
+        """
+        Decimals of a token.
+
+        :param denom: denom used by tradehub, eg. 'swth'.
+        :raises ValueError: if the denom is not listed by get_tokens.
+        :return: int
+        """
+        return self.index.decimals(denom)
+
+    def to_base_units(self, amount: Amount, denom: str, rounding: str = ROUND_DOWN) -> int:
+        return to_base_units(amount, self.decimals(denom), rounding=rounding)
+
+    def from_base_units(self, amount: Union[str, int], denom: str) -> Decimal:
+        return from_base_units(amount, self.decimals(denom))
+
+    def to_base_units_batch(self, amounts: Sequence[Amount], denoms: Union[str, Sequence[str]]):
+        """
+        Raw integer amounts of human readable amounts, see to_base_units_batch.
+
+        :param amounts: amounts as str.
+        :param denoms: denom of all amounts or one per amount.
+        :return: int64 numpy array or array.array without NumPy
+        """
+        return to_base_units_batch(amounts, self._decimals_of(denoms))
+
+    def from_base_units_batch(self, amounts: Sequence[Union[str, int]], denoms: Union[str, Sequence[str]],
+                              exact: bool = False):
+        """
+        Human readable amounts of raw integer amounts, see from_base_units_batch.
+
+        :param amounts: raw amounts as str or int.
+        :param denoms: denom of all amounts or one per amount.
+        :param exact: return a list of Decimal instead of a float64 column.
+        :return: list of Decimal, float64 numpy array or array.array without NumPy
+        """
+        return from_base_units_batch(amounts, self._decimals_of(denoms), exact=exact)
+
+    def _decimals_of(self, denoms: Union[str, Sequence[str]]) -> Union[int, List[int]]:
+        if isinstance(denoms, str):
+            return self.decimals(denoms)
+        decimals = {denom: self.decimals(denom) for denom in set(denoms)}
+        return [decimals[denom] for denom in denoms]
+
+    def coins(self, coins: Iterable[dict]) -> Dict[str, Decimal]:
+        """
+        Human readable amounts of raw coins like the 'coins' of get_account.
+
+        :param coins: list of dicts with 'denom' and raw 'amount'.
+        :return: dict denom -> Decimal
+        """
+        return {coin["denom"]: self.from_base_units(coin["amount"], coin["denom"]) for coin in coins}
+
+    def balances(self, balances: Dict[str, dict]) -> Dict[str, Dict[str, int]]:
+        """
+        Raw integer amounts of a get_balance response.
+
+        :param balances: dict denom -> dict with human readable 'available', 'order' and 'position'.
+        :return: dict denom -> dict field -> int
+        """
+        result = {}
+        for denom, balance in balances.items():
+            decimals = self.decimals(denom)
+            result[denom] = {field: to_base_units(balance[field], decimals)
+                             for field in BALANCE_FIELDS if field in balance}
+        return result
+
+    def trade_fees(self, trades: Sequence[dict]) -> Dict[str, object]:
+        """
+        Taker and maker fees of a get_trades response as raw integer amounts of their fee denoms.
+
+        :param trades: trades as dict.
+        :return: dict with 'taker_fee_amount' and 'maker_fee_amount' columns, see to_base_units_batch
+        """
+        result = {}
+        for field, denom_field in TRADE_FEE_FIELDS:
+            denoms = [trade[denom_field] for trade in trades]
+            # trades without fee have an empty denom
+            decimals = {denom: self.decimals(denom) if denom else 0 for denom in set(denoms)}
+            amounts = [trade[field] if denom else '0' for trade, denom in zip(trades, denoms)]
+            result[field] = to_base_units_batch(amounts, [decimals[denom] for denom in denoms])
+        return result
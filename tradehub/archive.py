@@ -0,0 +1,251 @@
+"""
+Description:
+    Parquet archive of candlesticks, partitioned by market, resolution and UTC day in hive style directories:
+
+        <root>/market=swth_eth1/resolution=1/date=2021-01-09/part-<first time>-<last time>-<suffix>.parquet
+
+    Candles are stored with typed columns, int64 ids, UTC timestamps and float64 prices and volumes, converted
+    in one vectorized pass by tradehub.columns. Appends only request candles newer than the newest archived
+    one and range reads only open the partitions of the requested markets and days.
+    Needs the optional pyarrow package.
+Usage:
+    from tradehub.archive import CandleArchive
+
+    archive = CandleArchive("candles", client=public_client)
+    archive.append("swth_eth1", 1, from_epoch=1609459200)
+    table = archive.read(["swth_eth1", "eth1_usdc1"], 1, from_epoch=1609459200, to_epoch=1612137600)
+"""
+
+import itertools
+import os
+import time
+import uuid
+
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+from tradehub.candlesticks import merge_candles
+from tradehub.columns import CANDLE_PRICE_COLUMNS, candles_to_columns
+from tradehub.utils import parse_timestamp
+
+SECONDS_PER_DAY = 86400
+
+
+def _day(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch - epoch % SECONDS_PER_DAY, timezone.utc).strftime('%Y-%m-%d')
+
+
+def candle_schema():
+    """
+    Arrow schema of archived candles, partition columns are encoded in the path. Parquet has no seconds unit,
+    so times are stored in milliseconds.
+    """
+    return pa.schema([('id', pa.int64()), ('time', pa.timestamp('ms', tz='UTC'))]
+                     + [(field, pa.float64()) for field in CANDLE_PRICE_COLUMNS])
+
+
+def candles_to_table(candles: Sequence):
+    """
+    Convert candles as returned by get_candlesticks to an Arrow table with the archive schema.
+
+    :param candles: candles as dict or Candle records.
+    :return: pyarrow.Table
+    """
+    columns = candles_to_columns(candles, unit='ms')
+    schema = candle_schema()
+    arrays = [pa.array(columns["id"], type=pa.int64()),
+              pa.array(columns["time"], type=pa.int64()).cast(schema.field('time').type)]
+    arrays += [pa.array(columns[field], type=pa.float64()) for field in CANDLE_PRICE_COLUMNS]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _epochs(times):
+    """
+    Epoch seconds of an archived 'time' column.
+    """
+    return pc.divide(pc.cast(times, pa.int64()), 1000)
+
+
+class CandleArchive(object):
+    """
+    Candles of several markets and resolutions in a directory of Parquet files.
+
+    Every write adds new part files, which are written to a temporary name first and renamed, so readers never
+    see partial files. 'compact' merges the parts of a day and drops duplicate candles.
+    """
+
+    def __init__(self, root: str, client=None, compression: str = 'zstd'):
+        """
+        :param root: directory of the archive, created if missing.
+        :param client: PublicClient used by append, reads work without.
+        :param compression: Parquet compression codec.
+        """
+        if pa is None:
+            raise ImportError("The candle archive needs pyarrow, install it with 'pip install pyarrow'.")
+        self.root = root
+        self.client = client
+        self.compression = compression
+        os.makedirs(root, exist_ok=True)
+
+    def _directory(self, market: str, resolution: int, day: Optional[str] = None) -> str:
+        path = os.path.join(self.root, f"market={market}", f"resolution={resolution}")
+        return os.path.join(path, f"date={day}") if day is not None else path
+
+    def markets(self) -> List[str]:
+        """
+        Markets with archived candles.
+        """
+        return sorted(name[len("market="):] for name in os.listdir(self.root) if name.startswith("market="))
+
+    def days(self, market: str, resolution: int) -> List[str]:
+        """
+        Archived days of a market and resolution as 'YYYY-MM-DD', oldest first.
+        """
+        directory = self._directory(market, resolution)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[len("date="):] for name in os.listdir(directory) if name.startswith("date="))
+
+    def _parts(self, market: str, resolution: int, day: str) -> List[str]:
+        directory = self._directory(market, resolution, day)
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+
+    def write(self, market: str, resolution: int, candles: Sequence) -> int:
+        """
+        Add candles to the archive, one part file per day.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param resolution: candle period in minutes.
+        :param candles: candles as returned by get_candlesticks.
+        :return: number of written candles
+        """
+        candles = merge_candles([candles])
+        for day, group in itertools.groupby(candles, key=lambda candle: _day(int(parse_timestamp(candle["time"])))):
+            table = candles_to_table(list(group))
+            times = _epochs(table['time'])
+            directory = self._directory(market, resolution, day)
+            os.makedirs(directory, exist_ok=True)
+            name = f"part-{pc.min(times).as_py()}-{pc.max(times).as_py()}-{uuid.uuid4().hex[:8]}.parquet"
+            self._write_table(table, os.path.join(directory, name))
+        return len(candles)
+
+    def _write_table(self, table, path: str) -> None:
+        temporary = path + '.tmp'
+        pq.write_table(table, temporary, compression=self.compression)
+        os.replace(temporary, path)
+
+    def max_time(self, market: str, resolution: int) -> Optional[int]:
+        """
+        Epoch seconds of the newest archived candle, only the newest day is read.
+
+        :return: int or None for an empty archive
+        """
+        for day in reversed(self.days(market, resolution)):
+            parts = self._parts(market, resolution, day)
+            if parts:
+                times = [pc.max(_epochs(pq.read_table(part, columns=['time'])['time'])).as_py()
+                         for part in parts]
+                times = [value for value in times if value is not None]
+                if times:
+                    return max(times)
+        return None
+
+    def append(self, market: str, resolution: int, from_epoch: Optional[int] = None,
+               to_epoch: Optional[int] = None) -> int:
+        """
+        Fetch and archive the candles after the newest archived one. Candles which are not closed by 'to_epoch'
+        are left out, so a forming candle is never archived.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param resolution: candle period in minutes, possible values are: 1, 5, 30, 60, 360 or 1440.
+        :param from_epoch: start of an empty archive in epoch seconds, ignored once candles are archived.
+        :param to_epoch: end of the range in epoch seconds, default now.
+        :return: number of archived candles
+        """
+        if self.client is None:
+            raise ValueError("Appending needs a client!")
+        period = resolution * 60
+        newest = self.max_time(market, resolution)
+        if newest is not None:
+            from_epoch = newest + period
+        elif from_epoch is None:
+            raise ValueError("The archive has no candles yet, from_epoch is required!")
+        to_epoch = int(time.time()) if to_epoch is None else int(to_epoch)
+        if from_epoch > to_epoch:
+            return 0
+        candles = self.client.get_candlesticks_range(market, resolution, int(from_epoch), to_epoch)
+        closed = [candle for candle, start in ((candle, parse_timestamp(candle["time"])) for candle in candles)
+                  if from_epoch <= start and start + period <= to_epoch]
+        return self.write(market, resolution, closed) if closed else 0
+
+    def read(self, markets: Union[str, Sequence[str]], resolution: int, from_epoch=None, to_epoch=None,
+             columns: Optional[Sequence[str]] = None):
+        """
+        Read the candles of some markets in a time range, only the partitions of those markets and days are
+        opened and only the requested columns are read.
+
+        :param markets: market or list of markets.
+        :param resolution: candle period in minutes.
+        :param from_epoch: candles at or after this time, epoch seconds, datetime or ISO 8601 str.
+        :param to_epoch: candles before this time, epoch seconds, datetime or ISO 8601 str.
+        :param columns: columns to read, default all, 'time' is always included.
+        :return: pyarrow.Table with the candle columns and 'market', ordered by market and time
+        """
+        markets = [markets] if isinstance(markets, str) else list(markets)
+        start = int(parse_timestamp(from_epoch)) if from_epoch is not None else None
+        end = int(parse_timestamp(to_epoch)) if to_epoch is not None else None
+        columns = None if columns is None else ['time'] + [column for column in columns if column != 'time']
+        tables = []
+        for market in markets:
+            days = [day for day in self.days(market, resolution)
+                    if (start is None or day >= _day(start)) and (end is None or day <= _day(end - 1))]
+            parts = [part for day in days for part in self._parts(market, resolution, day)]
+            if not parts:
+                continue
+            table = pa.concat_tables([pq.read_table(part, columns=columns) for part in parts])
+            times = _epochs(table['time'])
+            mask = None
+            if start is not None:
+                mask = pc.greater_equal(times, start)
+            if end is not None:
+                mask = pc.less(times, end) if mask is None else pc.and_(mask, pc.less(times, end))
+            if mask is not None:
+                table = table.filter(mask)
+            table = table.sort_by('time')
+            tables.append(table.append_column('market', pa.array([market] * table.num_rows, type=pa.string())))
+        if not tables:
+            schema = candle_schema()
+            fields = [schema.field(name) for name in (columns or schema.names)]
+            return pa.schema(fields + [pa.field('market', pa.string())]).empty_table()
+        return pa.concat_tables(tables)
+
+    def compact(self, market: str, resolution: int, day: Optional[str] = None) -> int:
+        """
+        Merge the part files of a day, or of every day, into one and drop candles archived twice.
+
+        :return: number of merged days
+        """
+        merged = 0
+        for archive_day in ([day] if day is not None else self.days(market, resolution)):
+            parts = self._parts(market, resolution, archive_day)
+            if len(parts) < 2:
+                continue
+            table = pa.concat_tables([pq.read_table(part) for part in parts]).sort_by('time')
+            times = _epochs(table['time']).to_pylist()
+            # keep the first candle of every time
+            keep = [index for index, value in enumerate(times) if not index or times[index - 1] != value]
+            table = table.take(pa.array(keep, type=pa.int64()))
+            first, last = times[0], times[-1]
+            self._write_table(table, os.path.join(self._directory(market, resolution, archive_day),
+                                                  f"part-{first}-{last}-{uuid.uuid4().hex[:8]}.parquet"))
+            for part in parts:
+                os.remove(part)
+            merged += 1
+        return merged
@@ -0,0 +1,163 @@
+import asyncio
+
+from typing import Any, AsyncIterator, Callable, List, Optional, Union
+
+from tradehub.candlesticks import (DEFAULT_CANDLES_PER_WINDOW, GRANULARITIES, merge_candles, resample_fetched,
+                                   resampled_range, split_window)
+from tradehub.follow import FileCheckpoint, Follower
+from tradehub.hedging import HedgePolicy
+from tradehub.node_pool import AsyncNodePoolRequest, NodePool
+from tradehub.pagination import MAX_PAGE_SIZE, PageCursor, aiter_pages
+from tradehub.public_client import PublicClient
+from tradescan.cache import ResponseCache
+from tradescan.metrics import RequestEvent
+from tradescan.ratelimit import AIMDController, RateLimiter
+from tradescan.utils import AsyncRequest, DEFAULT_MAX_CONCURRENCY
+
+
+class AsyncPublicClient(PublicClient):
+    """
+    Asyncio variant of the PublicClient. Every method has the same signature and builds the same request
+    parameters as in PublicClient but returns an awaitable, so one event loop can keep many requests in flight.
+
+    Example::
+
+        async with AsyncPublicClient(uri="https://tradehub-api-server.network/") as public_client:
+            markets = await public_client.get_markets()
+            orderbooks = await asyncio.gather(*[public_client.get_orderbook(m["name"]) for m in markets])
+    """
+
+    def __init__(self, node_ip: Union[None, str] = None, node_port: Union[None, int] = 5001, uri: Union[None, str] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, cache: Optional[ResponseCache] = None,
+                 coalesce: bool = False, node_pool: Optional[NodePool] = None, hedge: Optional[HedgePolicy] = None,
+                 decoder: Optional[Callable[[bytes], Any]] = None, raw: bool = False,
+                 rate_limiter: Optional[RateLimiter] = None, concurrency: Optional[AIMDController] = None,
+                 hooks: Optional[List[Callable[[RequestEvent], None]]] = None, records: bool = False):
+        """
+        Create an async public client using IP:Port or URI format.
+
+        :param node_ip: ip address off a tradehub node.
+        :param node_port: prt off a tradehub node, default 5001.
+        :param uri: URI address off tradehub node.
+        :param max_concurrency: maximum number of requests in flight against the node, default 100.
+        :param cache: optional response cache, only paths with a configured TTL are cached.
+        :param coalesce: share one round-trip between concurrent identical requests, default False.
+        :param node_pool: route requests over a pool of nodes instead of a single IP or URI.
+        :param hedge: send backup requests for slow get_orderbook, get_prices and get_order calls, needs a node pool.
+        :param decoder: callable decoding response bytes, default orjson.loads if installed else json.loads.
+        :param raw: return the undecoded response body as bytes instead of decoded JSON, default False.
+        :param rate_limiter: token bucket limits per node and endpoint.
+        :param concurrency: AIMD controller for the number of requests in flight.
+        :param hooks: callables receiving a RequestEvent for every request attempt, eg. a MetricsRegistry.
+        :param records: return Trade, Order and Candle records from get_trades, get_orders and get_candlesticks.
+        """
+        PublicClient.__init__(self, node_ip=node_ip, node_port=node_port, uri=uri, node_pool=node_pool, hedge=hedge,
+                              raw=raw, records=records)
+        if node_pool is not None:
+            self.request: AsyncRequest = AsyncNodePoolRequest(pool=node_pool, max_concurrency=max_concurrency,
+                                                              cache=cache, coalesce=coalesce, hedge=hedge,
+                                                              decoder=decoder, raw=raw, rate_limiter=rate_limiter,
+                                                              concurrency=concurrency, hooks=hooks)
+        else:
+            self.request: AsyncRequest = AsyncRequest(api_url=self.api_url, timeout=30,
+                                                      max_concurrency=max_concurrency, cache=cache, coalesce=coalesce,
+                                                      decoder=decoder, raw=raw, rate_limiter=rate_limiter,
+                                                      concurrency=concurrency, hooks=hooks)
+
+    def _then(self, response, callback: Callable[[Any], Any]):
+        async def then():
+            return callback(await response)
+        return then()
+
+    async def get_candlesticks_range(self, market: str, granularity: int, from_epoch: int, to_epoch: int,
+                                     candles_per_window: int = DEFAULT_CANDLES_PER_WINDOW,
+                                     workers: Optional[int] = None) -> List[dict]:
+        """
+        Get candlesticks over a long time range, see PublicClient.get_candlesticks_range. The windows are
+        gathered on the event loop, 'workers' is accepted for compatibility, max_concurrency applies instead.
+        """
+        if granularity not in GRANULARITIES:
+            source, start, end = resampled_range(granularity, from_epoch, to_epoch)
+            if start > end:
+                return []
+            candles = await self.get_candlesticks_range(market, source, start, end, candles_per_window)
+            return resample_fetched(candles, granularity)
+        windows = split_window(granularity, from_epoch, to_epoch, candles_per_window)
+        results = await asyncio.gather(*[self.get_candlesticks(market, granularity, start, stop)
+                                         for start, stop in windows])
+        return merge_candles(self._decoded(candles) for candles in results)
+
+    async def iter_trades(self, market: Optional[str] = None, swth_address: Optional[str] = None,
+                          before_id: Optional[int] = None, after_id: Optional[int] = None, start_time=None,
+                          end_time=None, page_size: int = MAX_PAGE_SIZE, prefetch: bool = True) -> AsyncIterator[dict]:
+        """
+        Async iterator over all trades in an id or time range, newest first, see PublicClient.iter_trades.
+
+        Example::
+
+            async for trade in public_client.iter_trades(market="swth_eth1", after_id=100000):
+                print(trade["id"])
+        """
+        cursor = PageCursor(before_id=before_id, after_id=after_id, start_time=start_time, end_time=end_time,
+                            page_size=page_size)
+
+        async def fetch(cursor_id):
+            return self._decoded(await self.get_trades(market=market, before_id=cursor_id, after_id=after_id,
+                                                       limit=page_size, swth_address=swth_address))
+
+        async for page in aiter_pages(fetch, cursor, prefetch=prefetch):
+            for trade in page:
+                yield trade
+
+    def follow_trades(self, market: Optional[str] = None, swth_address: Optional[str] = None,
+                      after_id: Optional[int] = None, checkpoint: Union[None, str, FileCheckpoint] = None,
+                      min_interval: Optional[float] = None, max_interval: float = 30.0,
+                      page_size: int = MAX_PAGE_SIZE) -> Follower:
+        """
+        Follow new trades as they appear, see PublicClient.follow_trades. Iterate with 'async for'.
+
+        Example::
+
+            async for trade in public_client.follow_trades(market="swth_eth1"):
+                print(trade["id"])
+        """
+        async def fetch(before_id, after_id, limit):
+            return self._decoded(await self.get_trades(market=market, before_id=before_id, after_id=after_id,
+                                                       limit=limit, swth_address=swth_address))
+
+        async def block_time():
+            return self._decoded(await self.get_block_time())
+
+        return Follower(fetch, block_time=block_time, after_id=after_id, checkpoint=checkpoint,
+                        min_interval=min_interval, max_interval=max_interval, page_size=page_size)
+
+    def follow_orders(self, swth_address: Optional[str] = None, market: Optional[str] = None,
+                      order_type: Optional[str] = None, initiator: Optional[str] = None,
+                      after_id: Optional[int] = None, checkpoint: Union[None, str, FileCheckpoint] = None,
+                      min_interval: Optional[float] = None, max_interval: float = 30.0,
+                      page_size: int = MAX_PAGE_SIZE) -> Follower:
+        """
+        Follow newly created orders, see PublicClient.follow_orders. Iterate with 'async for'.
+        """
+        async def fetch(before_id, after_id, limit):
+            return self._decoded(await self.get_orders(swth_address=swth_address, before_id=before_id,
+                                                       after_id=after_id, market=market, order_type=order_type,
+                                                       initiator=initiator, limit=limit))
+
+        async def block_time():
+            return self._decoded(await self.get_block_time())
+
+        return Follower(fetch, block_time=block_time, after_id=after_id, checkpoint=checkpoint,
+                        min_interval=min_interval, max_interval=max_interval, page_size=page_size)
+
+    async def close(self) -> None:
+        """
+        Release the worker threads used by the request layer, pending requests are completed first.
+        """
+        await self.request.aclose()
+
+    async def __aenter__(self) -> 'AsyncPublicClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
@@ -0,0 +1,208 @@
+"""
+Description:
+    Parallel backfill of historical trades. The trade id space is split into ranges which are fetched
+    concurrently by a pool of workers, spread over one or more clients, eg. clients of different nodes.
+    Trades are handed out merged in ascending id order and deduplicated, missing ids are reported as gaps.
+Usage:
+    from tradehub.backfill import TradeBackfill
+
+    clients = [PublicClient(node_ip) for node_ip in validator_crawler_mp(network='main')["active_peers"]]
+    backfill = TradeBackfill(clients, workers=16)
+    for trade in backfill.iter_trades(after_id=0):
+        store(trade)
+    print(backfill.stats.rows_per_second, backfill.stats.gaps)
+"""
+
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+
+from tradehub.pagination import MAX_PAGE_SIZE, PageCursor, iter_pages
+from tradehub.public_client import PublicClient
+
+
+class BackfillStats(object):
+    """
+    Progress of a backfill. Ranges of ids are half open, [first, stop).
+    """
+
+    def __init__(self):
+        self.started: float = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.rows: int = 0
+        self.duplicates: int = 0
+        self.ranges: int = 0
+        self.ranges_done: int = 0
+        self.requests: int = 0
+        self.gaps: List[Tuple[int, int]] = []
+        self.failed_ranges: List[Tuple[int, int]] = []
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "duplicates": self.duplicates,
+            "ranges": self.ranges,
+            "ranges_done": self.ranges_done,
+            "requests": self.requests,
+            "gaps": list(self.gaps),
+            "failed_ranges": list(self.failed_ranges),
+            "elapsed": self.elapsed,
+            "rows_per_second": self.rows_per_second,
+        }
+
+
+class TradeBackfill(object):
+    """
+    Range partitioned trade backfill over a worker pool.
+
+    Ranges are submitted in ascending id order and at most 'workers * 2' of them are held in memory, finished
+    ranges wait until all lower ones are handed out. A range failing on every client is skipped and recorded
+    in 'failed_ranges' and as gap. Gaps are only detected without market and address filter, otherwise missing
+    ids belong to other markets or addresses.
+    """
+
+    def __init__(self, clients: Union[PublicClient, Sequence[PublicClient]], workers: int = 8,
+                 range_size: int = 2000, page_size: int = MAX_PAGE_SIZE, market: Optional[str] = None,
+                 swth_address: Optional[str] = None, retries: int = 2,
+                 progress: Optional[Callable[[BackfillStats], None]] = None):
+        """
+        :param clients: PublicClient or list of them, ranges are assigned round robin.
+        :param workers: number of ranges fetched concurrently.
+        :param range_size: number of trade ids per range.
+        :param page_size: trades requested per round-trip, at most 200.
+        :param market: only backfill trades of this market.
+        :param swth_address: only backfill trades of this address.
+        :param retries: number of further clients a failed range is tried on.
+        :param progress: callable receiving the stats whenever a range is handed out.
+        """
+        self.clients: List[PublicClient] = [clients] if isinstance(clients, PublicClient) else list(clients)
+        if not self.clients:
+            raise ValueError("TradeBackfill needs at least one client!")
+        if range_size < 1:
+            raise ValueError(f"Range size has to be positive, got {range_size} instead.")
+        self.workers = workers
+        self.range_size = range_size
+        self.page_size = page_size
+        self.market = market
+        self.swth_address = swth_address
+        self.retries = retries
+        self.progress = progress
+        self.stats = BackfillStats()
+        self._lock = threading.Lock()
+
+    def latest_id(self) -> int:
+        """
+        Id of the newest trade matching the filters, 0 if there is none.
+        """
+        client = self.clients[0]
+        trades = client._decoded(client.get_trades(market=self.market, swth_address=self.swth_address, limit=1))
+        return int(trades[0]["id"]) if trades else 0
+
+    def partition(self, first: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Split the ids [first, stop) into ranges of range_size ids.
+        """
+        return [(start, min(start + self.range_size, stop)) for start in range(first, stop, self.range_size)]
+
+    def fetch_range(self, first: int, stop: int, client: PublicClient) -> List[dict]:
+        """
+        All trades with ids in [first, stop), newest first.
+        """
+        cursor = PageCursor(before_id=stop, after_id=first - 1, page_size=self.page_size)
+
+        def fetch(cursor_id):
+            with self._lock:
+                self.stats.requests += 1
+            return client._decoded(client.get_trades(market=self.market, before_id=cursor_id, after_id=first - 1,
+                                                     limit=self.page_size, swth_address=self.swth_address))
+
+        return [trade for page in iter_pages(fetch, cursor, prefetch=False) for trade in page]
+
+    def _fetch_with_retries(self, index: int, first: int, stop: int) -> Optional[List[dict]]:
+        attempts = min(self.retries + 1, len(self.clients))
+        for attempt in range(attempts):
+            client = self.clients[(index + attempt) % len(self.clients)]
+            try:
+                return self.fetch_range(first, stop, client)
+            except (requests.exceptions.RequestException, ValueError, KeyError):
+                if attempt == attempts - 1:
+                    return None
+
+    def iter_trades(self, after_id: int = 0, before_id: Optional[int] = None) -> Iterator[dict]:
+        """
+        Backfill trades with ids between after_id and before_id, both exclusive, in ascending id order.
+
+        :param after_id: start after this trade id, default from the first trade.
+        :param before_id: stop before this trade id, default after the newest trade.
+        :return: iterator over trades as dict
+        """
+        if before_id is None:
+            before_id = self.latest_id() + 1
+        ranges = self.partition(after_id + 1, before_id)
+        self.stats = stats = BackfillStats()
+        stats.ranges = len(ranges)
+        detect_gaps = self.market is None and self.swth_address is None
+        # first id expected next, everything below it was handed out already
+        expected = after_id + 1
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='trade-backfill')
+        pending = deque()
+        submitted = 0
+        try:
+            while submitted < len(ranges) or pending:
+                while submitted < len(ranges) and len(pending) < self.workers * 2:
+                    first, stop = ranges[submitted]
+                    pending.append((first, stop, executor.submit(self._fetch_with_retries, submitted, first, stop)))
+                    submitted += 1
+
+                first, stop, future = pending.popleft()
+                trades = future.result()
+                if trades is None:
+                    stats.failed_ranges.append((first, stop))
+                    if detect_gaps and expected < stop:
+                        stats.gaps.append((expected, stop))
+                    expected = max(expected, stop)
+                else:
+                    trades.sort(key=lambda trade: int(trade["id"]))
+                    for trade in trades:
+                        trade_id = int(trade["id"])
+                        if trade_id < expected:
+                            stats.duplicates += 1
+                            continue
+                        if detect_gaps and trade_id > expected:
+                            stats.gaps.append((expected, trade_id))
+                        expected = trade_id + 1
+                        stats.rows += 1
+                        yield trade
+                    if detect_gaps and stop == before_id and expected < stop:
+                        stats.gaps.append((expected, stop))
+                stats.ranges_done += 1
+                if self.progress is not None:
+                    self.progress(stats)
+        finally:
+            stats.finished = time.perf_counter()
+            for _, _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def run(self, after_id: int = 0, before_id: Optional[int] = None) -> List[dict]:
+        """
+        Backfill into a list, see iter_trades.
+
+        :return: list of trades in ascending id order
+        """
+        return list(self.iter_trades(after_id=after_id, before_id=before_id))
@@ -0,0 +1,262 @@
+"""
+Description:
+    Binary candle files for backtests which read the same series over and over. A file holds the candles of one
+    market and resolution as fixed-width little endian records after a 16 byte header:
+
+        header:  b'THCANDL1', int64 resolution in minutes
+        record:  int64 time (epoch seconds), float64 open, high, low, close, volume, quote_volume
+
+    Readers map the file with mmap and get the records as a read-only NumPy structured array without copying,
+    time lookups are binary searches on the sorted 'time' column. Appends write the new records at the end of
+    the file, the mapping is renewed when the file has grown.
+    Needs the optional numpy package.
+Usage:
+    from tradehub.candle_file import CandleStore
+
+    store = CandleStore("candles", client=public_client)
+    store.sync("swth_eth1", 1, from_epoch=1609459200)
+    candles = store.open("swth_eth1", 1).between(1609459200, 1612137600)
+    candles["close"].mean()
+"""
+
+import mmap
+import os
+import struct
+import time
+
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tradehub.columns import CANDLE_PRICE_COLUMNS, candles_to_columns
+from tradehub.utils import parse_timestamp
+
+MAGIC = b'THCANDL1'
+HEADER = struct.Struct('<8sq')
+
+
+def candle_dtype():
+    """
+    NumPy dtype of one candle record.
+    """
+    return np.dtype([('time', '<i8')] + [(field, '<f8') for field in CANDLE_PRICE_COLUMNS])
+
+
+def candles_to_records(candles: Sequence):
+    """
+    Convert candles as returned by get_candlesticks to records ordered by time, for candles with the same time
+    the last one is kept.
+
+    :param candles: candles as dict or Candle records.
+    :return: NumPy structured array with the candle_dtype
+    """
+    columns = candles_to_columns(candles)
+    records = np.empty(len(candles), dtype=candle_dtype())
+    for field in records.dtype.names:
+        records[field] = columns[field]
+    records = records[np.argsort(records['time'], kind='stable')]
+    if len(records) > 1:
+        last = np.append(records['time'][1:] != records['time'][:-1], True)
+        records = records[last]
+    return records
+
+
+class CandleFile(object):
+    """
+    One memory-mapped candle file.
+
+    Arrays returned by the read methods are views into the mapping, they stay valid after appends and after
+    'close' and show a replaced last candle, but do not include candles appended later.
+    """
+
+    def __init__(self, path: str, resolution: Optional[int] = None):
+        """
+        :param path: path of the file, created if missing and 'resolution' is given.
+        :param resolution: candle period in minutes, checked against the header of existing files.
+        :raises ValueError: If the file is not a candle file or has another resolution.
+        """
+        if np is None:
+            raise ImportError("Candle files need numpy, install it with 'pip install numpy'.")
+        self.path = path
+        self.dtype = candle_dtype()
+        if not os.path.exists(path):
+            if resolution is None:
+                raise ValueError(f"Candle file {path} does not exist!")
+            with open(path, 'wb') as file:
+                file.write(HEADER.pack(MAGIC, resolution))
+        with open(path, 'rb') as file:
+            magic, self.resolution = HEADER.unpack(file.read(HEADER.size).ljust(HEADER.size, b'\0'))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a candle file!")
+        if resolution is not None and resolution != self.resolution:
+            raise ValueError(f"{path} holds {self.resolution} minute candles, not {resolution}!")
+        self._mmap = None
+        self._records = np.empty(0, dtype=self.dtype)
+
+    def _size(self) -> int:
+        return (os.path.getsize(self.path) - HEADER.size) // self.dtype.itemsize
+
+    @property
+    def records(self):
+        """
+        All candles as read-only structured array, mapped again if the file has grown.
+        """
+        size = self._size()
+        if size != len(self._records):
+            with open(self.path, 'rb') as file:
+                # the previous mapping is released once no view uses it anymore
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._records = np.frombuffer(self._mmap, dtype=self.dtype, count=size, offset=HEADER.size)
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def first_time(self) -> Optional[int]:
+        records = self.records
+        return int(records['time'][0]) if len(records) else None
+
+    def last_time(self) -> Optional[int]:
+        records = self.records
+        return int(records['time'][-1]) if len(records) else None
+
+    def index(self, epoch) -> int:
+        """
+        Position of the first candle at or after a time.
+
+        :param epoch: epoch seconds, datetime or ISO 8601 str.
+        """
+        return int(np.searchsorted(self.records['time'], int(parse_timestamp(epoch)), side='left'))
+
+    def at(self, epoch):
+        """
+        Candle starting at a time, None if there is none.
+        """
+        records = self.records
+        index = self.index(epoch)
+        if index < len(records) and records['time'][index] == int(parse_timestamp(epoch)):
+            return records[index]
+        return None
+
+    def between(self, from_epoch=None, to_epoch=None):
+        """
+        Candles starting at or after 'from_epoch' and before 'to_epoch' as view without copying.
+
+        :param from_epoch: epoch seconds, datetime or ISO 8601 str, default the first candle.
+        :param to_epoch: epoch seconds, datetime or ISO 8601 str, default after the last candle.
+        """
+        records = self.records
+        start = self.index(from_epoch) if from_epoch is not None else 0
+        end = self.index(to_epoch) if to_epoch is not None else len(records)
+        return records[start:end]
+
+    def append(self, candles) -> int:
+        """
+        Append candles newer than the last candle of the file. A candle with the time of the last one replaces
+        it, so a candle which was still forming can be updated, older candles are left out.
+
+        :param candles: candles as returned by get_candlesticks or records with the candle_dtype.
+        :return: number of written candles
+        """
+        if not len(candles):
+            return 0
+        records = candles if isinstance(candles, np.ndarray) else candles_to_records(candles)
+        with open(self.path, 'r+b') as file:
+            file.seek(0, os.SEEK_END)
+            end = file.tell()
+            # drop the tail of an interrupted append
+            size = (end - HEADER.size) // self.dtype.itemsize
+            end = HEADER.size + size * self.dtype.itemsize
+            file.truncate(end)
+            if size:
+                file.seek(end - self.dtype.itemsize)
+                last = np.frombuffer(file.read(self.dtype.itemsize), dtype=self.dtype)['time'][0]
+                records = records[records['time'] >= last]
+                if len(records) and records['time'][0] == last:
+                    end -= self.dtype.itemsize
+            file.seek(end)
+            file.write(records.astype(self.dtype, copy=False).tobytes())
+        return len(records)
+
+    def close(self) -> None:
+        self._mmap = None
+        self._records = np.empty(0, dtype=self.dtype)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class CandleStore(object):
+    """
+    Directory of candle files, one per market and resolution.
+    """
+
+    def __init__(self, root: str, client=None):
+        """
+        :param root: directory of the files, created if missing.
+        :param client: PublicClient used by sync.
+        """
+        if np is None:
+            raise ImportError("Candle files need numpy, install it with 'pip install numpy'.")
+        self.root = root
+        self.client = client
+        self._files = {}
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, market: str, resolution: int) -> str:
+        return os.path.join(self.root, f"{market}-{resolution}.candles")
+
+    def open(self, market: str, resolution: int) -> CandleFile:
+        """
+        Candle file of a market and resolution, created if missing. Files are opened once per store.
+        """
+        key = (market, resolution)
+        if key not in self._files:
+            self._files[key] = CandleFile(self.path(market, resolution), resolution=resolution)
+        return self._files[key]
+
+    def append(self, market: str, resolution: int, candles) -> int:
+        return self.open(market, resolution).append(candles)
+
+    def sync(self, market: str, resolution: int, from_epoch: Optional[int] = None,
+             to_epoch: Optional[int] = None) -> int:
+        """
+        Fetch the candles from the last stored one on, the last candle is requested again because it may have
+        been stored while it was still forming.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param resolution: candle period in minutes, possible values are: 1, 5, 30, 60, 360 or 1440.
+        :param from_epoch: start of an empty file in epoch seconds, ignored once candles are stored.
+        :param to_epoch: end of the range in epoch seconds, default now.
+        :return: number of written candles
+        """
+        if self.client is None:
+            raise ValueError("Syncing needs a client!")
+        candle_file = self.open(market, resolution)
+        last = candle_file.last_time()
+        if last is not None:
+            from_epoch = last
+        elif from_epoch is None:
+            raise ValueError("The candle file is empty, from_epoch is required!")
+        to_epoch = int(time.time()) if to_epoch is None else int(to_epoch)
+        if from_epoch > to_epoch:
+            return 0
+        candles = self.client.get_candlesticks_range(market, resolution, int(from_epoch), to_epoch)
+        return candle_file.append(candles) if candles else 0
+
+    def close(self) -> None:
+        for candle_file in self._files.values():
+            candle_file.close()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
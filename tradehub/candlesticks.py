@@ -0,0 +1,132 @@
+"""
+Description:
+    Fetch candlesticks over long time ranges. The range is split into windows of a bounded number of candles
+    aligned to the candle period, the windows are requested concurrently and stitched into one series
+    ordered by time without duplicate candles. Other resolutions are resampled from the largest served
+    resolution dividing them.
+Usage:
+    candles = public_client.get_candlesticks_range("swth_eth1", 1, 1609459200, 1612137600)
+    candles = public_client.get_candlesticks_range("swth_eth1", 240, 1609459200, 1612137600)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple
+
+from tradehub.resample import resample_candles
+from tradehub.utils import parse_timestamp
+
+GRANULARITIES = (1, 5, 30, 60, 360, 1440)
+DEFAULT_CANDLES_PER_WINDOW = 500
+DEFAULT_WORKERS = 8
+
+
+def split_window(granularity: int, from_epoch: int, to_epoch: int,
+                 candles_per_window: int = DEFAULT_CANDLES_PER_WINDOW) -> List[Tuple[int, int]]:
+    """
+    Split [from_epoch, to_epoch] into windows of at most 'candles_per_window' candles. Inner boundaries are
+    multiples of the window length, so windows of different requests line up. Adjacent windows share their
+    boundary, a candle starting there is returned by both and dropped by merge_candles.
+
+    :param granularity: Candlestick period in minutes, possible values are: 1, 5, 30, 60, 360 or 1440.
+    :param from_epoch: Start of time range in epoch seconds.
+    :param to_epoch: End of time range in epoch seconds.
+    :param candles_per_window: Maximum number of candles requested at once.
+    :return: list of (from_epoch, to_epoch) tuples
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularity/Resolution has to be on off the following values: 1, 5, 30, 60, 360 or 1440")
+    if candles_per_window < 1:
+        raise ValueError(f"Candles per window has to be positive, got {candles_per_window} instead.")
+    if to_epoch < from_epoch:
+        raise ValueError(f"Start of time range {from_epoch} is after its end {to_epoch}.")
+    span = granularity * 60 * candles_per_window
+    windows = []
+    start = from_epoch
+    while True:
+        stop = (start // span + 1) * span
+        if stop >= to_epoch:
+            windows.append((start, to_epoch))
+            return windows
+        windows.append((start, stop))
+        start = stop
+
+
+def merge_candles(windows: Iterable[List[dict]]) -> List[dict]:
+    """
+    Stitch the candles of several windows into one series ordered by time, duplicate candle ids are dropped.
+
+    :param windows: lists of candles as returned by get_candlesticks.
+    :return: List with candles as dict.
+    """
+    candles = {}
+    for window in windows:
+        for candle in window:
+            candles.setdefault(candle["id"], candle)
+    return sorted(candles.values(), key=lambda candle: (parse_timestamp(candle["time"]), candle["id"]))
+
+
+def native_granularity(granularity: int) -> int:
+    """
+    Largest granularity served by get_candlesticks which divides 'granularity'.
+
+    :param granularity: Candlestick period in minutes.
+    :return: one of 1, 5, 30, 60, 360 or 1440
+    """
+    if granularity < 1:
+        raise ValueError(f"Granularity has to be a positive number of minutes, got {granularity} instead.")
+    return max(native for native in GRANULARITIES if granularity % native == 0)
+
+
+def resampled_range(granularity: int, from_epoch: int, to_epoch: int) -> Tuple[int, int, int]:
+    """
+    Served granularity and range of the request for candles of another granularity. The start is moved to the
+    next period boundary, so like get_candlesticks only candles starting within the range are returned, and
+    the end to the last period boundary, so the period containing 'to_epoch' is not returned as a finished
+    candle while it is still incomplete.
+
+    :return: (granularity, from_epoch, to_epoch) tuple, from_epoch is greater than to_epoch for empty ranges
+    """
+    period = granularity * 60
+    return native_granularity(granularity), -(-from_epoch // period) * period, to_epoch // period * period - 1
+
+
+def resample_fetched(candles: list, granularity: int) -> list:
+    """
+    Resample fetched candles, Candle records stay records.
+    """
+    resampled = resample_candles(candles, granularity)
+    if candles and not isinstance(candles[0], dict):
+        return type(candles[0]).from_list(resampled)
+    return resampled
+
+
+def fetch_candlesticks(client, market: str, granularity: int, from_epoch: int, to_epoch: int,
+                       candles_per_window: int = DEFAULT_CANDLES_PER_WINDOW,
+                       workers: int = DEFAULT_WORKERS) -> List[dict]:
+    """
+    Request the windows of a range concurrently with client.get_candlesticks and merge them.
+
+    :param client: tradehub PublicClient.
+    :param market: Market ticker used by blockchain (eg. swth_eth1).
+    :param granularity: Candlestick period in minutes, periods not served by get_candlesticks are resampled.
+    :param from_epoch: Start of time range for data in epoch seconds.
+    :param to_epoch: End of time range for data in epoch seconds.
+    :param candles_per_window: Maximum number of candles requested at once.
+    :param workers: Number of windows requested concurrently.
+    :return: List with candles as dict.
+    """
+    if granularity not in GRANULARITIES:
+        source, start, end = resampled_range(granularity, from_epoch, to_epoch)
+        if start > end:
+            return []
+        candles = fetch_candlesticks(client, market, source, start, end, candles_per_window, workers)
+        return resample_fetched(candles, granularity)
+    windows = split_window(granularity, from_epoch, to_epoch, candles_per_window)
+
+    def fetch(window):
+        return client._decoded(client.get_candlesticks(market, granularity, window[0], window[1]))
+
+    if len(windows) == 1:
+        return merge_candles([fetch(windows[0])])
+    with ThreadPoolExecutor(max_workers=min(workers, len(windows)), thread_name_prefix='candlesticks') as executor:
+        return merge_candles(executor.map(fetch, windows))
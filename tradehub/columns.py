@@ -0,0 +1,257 @@
+"""
+Description:
+    Columnar conversion of candlestick and trade responses. The string typed numbers and ISO 8601 timestamps
+    are converted in one vectorized pass over a matrix of the characters of all rows: times become int64 epoch
+    values, prices and volumes float64 or exact int64 scaled by 10 ** scale.
+    NumPy is optional, without it the same columns are built row by row into stdlib array.array columns.
+Usage:
+    from tradehub.columns import candles_to_columns, trades_to_columns
+
+    columns = candles_to_columns(public_client.get_candlesticks("swth_eth1", 5, 1610203000, 1610233090))
+    returns = columns["close"][1:] / columns["close"][:-1] - 1
+
+    # exact fixed point prices and quantities with 8 decimals
+    columns = trades_to_columns(public_client.get_trades(market="swth_eth1"), scale=8)
+"""
+
+from array import array
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tradehub.utils import parse_timestamp
+
+CANDLE_PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'quote_volume')
+TRADE_PRICE_COLUMNS = ('price', 'quantity')
+TIME_UNITS = {'s': 1, 'ms': 10 ** 3, 'us': 10 ** 6, 'ns': 10 ** 9}
+SIDES = {'buy': 1, 'sell': -1}
+
+_ZERO, _DOT, _MINUS, _PLUS, _Z = ord('0'), ord('.'), ord('-'), ord('+'), ord('Z')
+_NINE, _COLON, _T, _SPACE = ord('9'), ord(':'), ord('T'), ord(' ')
+_DATE_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_POW10 = np.array([10 ** power for power in range(19)], dtype=np.int64) if np is not None else None
+_POW10_FLOAT = np.array([10.0 ** power for power in range(19)]) if np is not None else None
+
+
+def _char_matrix(values: Sequence[str]):
+    """
+    Characters of all values as uint8 matrix, one row per value padded with zero bytes.
+    """
+    strings = np.array(values, dtype=np.bytes_)
+    width = strings.dtype.itemsize
+    return strings.view(np.uint8).reshape(len(values), width) if width else np.zeros((len(values), 0), np.uint8)
+
+
+def _fixed_point(matrix):
+    """
+    Plain decimal strings as signed int64 mantissa and number of decimals, None for other notations, signs or
+    dots without digits and more than 18 digits.
+    """
+    digit = (matrix >= _ZERO) & (matrix <= _ZERO + 9)
+    dot = matrix == _DOT
+    negative = matrix[:, 0] == _MINUS
+    allowed = digit | dot | (matrix == 0)
+    allowed[:, 0] |= negative
+    digits = digit.sum(axis=1)
+    if not allowed.all() or (dot.sum(axis=1) > 1).any() or (digits > 18).any() or \
+            ((digits == 0) & (matrix[:, 0] != 0)).any():
+        return None
+    lengths = (matrix != 0).sum(axis=1)
+    decimals = np.where(dot.any(axis=1), lengths - dot.argmax(axis=1) - 1, 0)
+    # horner scheme over the character columns, one vector operation per column
+    mantissa = np.zeros(len(matrix), dtype=np.int64)
+    for column in range(matrix.shape[1]):
+        mantissa = np.where(digit[:, column], mantissa * 10 + (matrix[:, column] - _ZERO), mantissa)
+    return np.where(negative, -mantissa, mantissa), decimals
+
+
+def parse_decimals(values: Sequence, scale: Optional[int] = None):
+    """
+    Convert decimal strings like "1251.51" to a float64 column or, with scale, to an exact int64 column of
+    value * 10 ** scale. Digits beyond scale are truncated. Empty strings become 0.
+
+    :raises ValueError: If a value is not a number, eg. a sign or dot without digits.
+
+    :param values: decimal strings, numbers like the floats of records are accepted as well and rounded to scale.
+    :param scale: number of decimals kept in the int64 column, None for float64.
+    :return: numpy array or array.array without NumPy
+    """
+    if np is None:
+        if scale is None:
+            return array('d', (float(value) if value != '' else 0.0 for value in values))
+        return array('q', (_scaled(value, scale) for value in values))
+    if not len(values) or not isinstance(values[0], str):
+        numbers = np.asarray(values, dtype=np.float64)
+        if scale is None:
+            return numbers
+        scaled = np.floor(numbers * 10 ** scale + 0.5)
+        if (np.abs(scaled) >= 2.0 ** 63).any():
+            raise OverflowError(f"Values do not fit into int64 with scale {scale}.")
+        return scaled.astype(np.int64)
+
+    fixed_point = _fixed_point(_char_matrix(values))
+    if fixed_point is None:
+        # exponents, long mantissas or other notations, convert row by row
+        if scale is None:
+            return np.array([float(value) if value != '' else 0.0 for value in values], dtype=np.float64)
+        return np.array([_scaled(value, scale) for value in values], dtype=np.int64)
+    mantissa, decimals = fixed_point
+    if scale is None:
+        # integers below 2 ** 53 and powers of ten up to 10 ** 22 are exact floats, so the division rounds correctly
+        if (np.abs(mantissa) < 2 ** 53).all():
+            return mantissa / _POW10_FLOAT[decimals]
+        return np.array([float(value) if value != '' else 0.0 for value in values], dtype=np.float64)
+    shift = scale - decimals
+    limit = np.iinfo(np.int64).max // _POW10[np.clip(shift, 0, 18)]
+    if ((shift > 18) & (mantissa != 0)).any() or (np.abs(mantissa) > limit).any():
+        raise OverflowError(f"Values do not fit into int64 with scale {scale}.")
+    truncated = np.abs(mantissa) // _POW10[np.clip(-shift, 0, 18)] * np.sign(mantissa)
+    return np.where(shift >= 0, mantissa * _POW10[np.clip(shift, 0, 18)], truncated)
+
+
+def _scaled(value: str, scale: int) -> int:
+    if value == '':
+        return 0
+    try:
+        return int(Decimal(value).scaleb(scale))
+    except InvalidOperation:
+        raise ValueError(f"Invalid decimal {value!r}.") from None
+
+
+def _days_from_civil(year, month, day):
+    # days since 1970-01-01 of proleptic gregorian dates, vectorized form of the era based algorithm
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def parse_times(values: Sequence, unit: str = 's'):
+    """
+    Convert ISO 8601 timestamps like "2021-01-10T21:59:53.563633+01:00" to an int64 epoch column.
+
+    :param values: timestamp strings with optional fraction and offset, epoch seconds are accepted as well.
+    :param unit: 's', 'ms', 'us' or 'ns', fractions below the unit are truncated.
+    :return: numpy array or array.array without NumPy
+    """
+    factor = TIME_UNITS[unit]
+    if np is None:
+        return array('q', (round(parse_timestamp(value) * 10 ** 6) * factor // 10 ** 6 for value in values))
+    if not len(values) or not isinstance(values[0], str):
+        return _epoch_column(values, factor)
+
+    matrix = _char_matrix(values)
+    if matrix.shape[1] < 19:
+        raise ValueError(f"Invalid timestamp {values[0]}.")
+    digits = matrix[:, :19].astype(np.int64) - _ZERO
+
+    def number(start, end):
+        result = digits[:, start]
+        for column in range(start + 1, end):
+            result = result * 10 + digits[:, column]
+        return result
+
+    seconds = (_days_from_civil(number(0, 4), number(5, 7), number(8, 10)) * 86400
+               + number(11, 13) * 3600 + number(14, 16) * 60 + number(17, 19))
+
+    # the offset takes the last 6 characters, eg. "+01:00", the last 5 for "+0100" or the last one for "Z"
+    lengths = (matrix != 0).sum(axis=1)
+    tail = np.take_along_axis(matrix, np.maximum(lengths[:, None] + np.arange(-6, 0), 0), axis=1).astype(np.int64)
+    utc = tail[:, 5] == _Z
+    signed = (tail == _PLUS) | (tail == _MINUS)
+    colon = ~utc & (lengths >= 25) & signed[:, 0] & (tail[:, 3] == _COLON)
+    plain = ~utc & ~colon & (lengths >= 24) & signed[:, 1]
+    has_offset = colon | plain
+    sign = np.where(colon, tail[:, 0], tail[:, 1])
+    hours = np.where(colon, (tail[:, 1] - _ZERO) * 10 + tail[:, 2], (tail[:, 2] - _ZERO) * 10 + tail[:, 3]) - _ZERO
+    offset = hours * 3600 + ((tail[:, 4] - _ZERO) * 10 + tail[:, 5] - _ZERO) * 60
+    seconds -= np.where(has_offset, np.where(sign == _MINUS, -offset, offset), 0)
+    result = seconds * factor
+
+    # fraction digits run from position 20 to the offset
+    end = np.where(colon, lengths - 6, np.where(plain, lengths - 5, np.where(utc, lengths - 1, lengths)))
+    places = len(str(factor)) - 1
+    if places and matrix.shape[1] > 20:
+        # digits below the unit are dropped
+        positions = np.arange(20, min(matrix.shape[1], 20 + places))
+        fraction = (matrix[:, 19] == _DOT)[:, None] & (positions < end[:, None])
+        weights = _POW10[places - 1 - (positions - 20)]
+        result += np.where(fraction, matrix[:, positions].astype(np.int64) - _ZERO, 0) @ weights
+
+    # rows in any other layout, eg. with surrounding spaces, are left to parse_timestamp
+    digit = (matrix >= _ZERO) & (matrix <= _NINE)
+    tail_digit = (tail >= _ZERO) & (tail <= _NINE)
+    offset_digits = tail_digit[:, 4:].all(axis=1) & np.where(colon, tail_digit[:, 1] & tail_digit[:, 2],
+                                                              tail_digit[:, 2] & tail_digit[:, 3])
+    regular = digit[:, _DATE_DIGITS].all(axis=1) & (matrix[:, 4] == _MINUS) & (matrix[:, 7] == _MINUS) \
+        & ((matrix[:, 10] == _T) | (matrix[:, 10] == _SPACE)) & (matrix[:, 13] == _COLON) & (matrix[:, 16] == _COLON) \
+        & ((end == 19) | ((matrix[:, 19] == _DOT) & (end > 20)
+                          & (digit[:, 20:] | (np.arange(20, matrix.shape[1]) >= end[:, None])).all(axis=1))) \
+        & (~has_offset | offset_digits)
+    rows = np.flatnonzero(~regular)
+    if len(rows):
+        result[rows] = _epoch_column([values[row] for row in rows], factor)
+    return result
+
+
+def _epoch_column(values: Sequence, factor: int):
+    # epoch floats hold microseconds, round to them before truncating to the unit
+    micros = np.round(np.asarray([parse_timestamp(value) for value in values], dtype=np.float64) * 10 ** 6)
+    micros = micros.astype(np.int64)
+    return micros // (10 ** 6 // factor) if factor <= 10 ** 6 else micros * (factor // 10 ** 6)
+
+
+def _column(rows: Sequence, field: str) -> list:
+    return [row[field] for row in rows]
+
+
+def candles_to_columns(candles: Sequence, scale: Optional[int] = None, unit: str = 's') -> Dict[str, object]:
+    """
+    Columns of a get_candlesticks response.
+
+    :param candles: candles as dict or Candle records.
+    :param scale: decimals of exact int64 price and volume columns, None for float64.
+    :param unit: unit of the int64 'time' column, default seconds.
+    :return: dict with 'id', 'time', 'open', 'high', 'low', 'close', 'volume' and 'quote_volume' columns
+    """
+    columns = {
+        "id": _ints(_column(candles, "id")),
+        "time": parse_times(_column(candles, "time"), unit=unit),
+    }
+    for field in CANDLE_PRICE_COLUMNS:
+        columns[field] = parse_decimals(_column(candles, field), scale=scale)
+    return columns
+
+
+def trades_to_columns(trades: Sequence, scale: Optional[int] = None, unit: str = 'us') -> Dict[str, object]:
+    """
+    Columns of a get_trades response.
+
+    :param trades: trades as dict or Trade records.
+    :param scale: decimals of exact int64 price and quantity columns, None for float64.
+    :param unit: unit of the int64 'block_created_at' column, default microseconds.
+    :return: dict with 'id', 'block_height', 'block_created_at', 'price', 'quantity' and 'side' columns,
+        side is 1 for taker buys and -1 for taker sells
+    """
+    columns = {
+        "id": _ints(_column(trades, "id")),
+        "block_height": _ints(_column(trades, "block_height")),
+        "block_created_at": parse_times(_column(trades, "block_created_at"), unit=unit),
+    }
+    for field in TRADE_PRICE_COLUMNS:
+        columns[field] = parse_decimals(_column(trades, field), scale=scale)
+    sides = [SIDES.get(side, 0) for side in _column(trades, "taker_side")]
+    columns["side"] = np.array(sides, dtype=np.int8) if np is not None else array('b', sides)
+    return columns
+
+
+def _ints(values: List):
+    if np is None:
+        return array('q', (int(value) for value in values))
+    return np.array(values).astype(np.int64)
@@ -0,0 +1,340 @@
+"""
+Description:
+    Follow mode for endpoints with increasing row ids like get_trades and get_orders. New rows are yielded
+    in id order as they appear, the polling interval follows the observed arrival rate and never drops below
+    the block time, and the last handed out id can be checkpointed to resume after a restart.
+Usage:
+    for trade in public_client.follow_trades(market="swth_eth1", checkpoint="swth_eth1.checkpoint"):
+        print(trade["id"], trade["price"])
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple, Union
+
+import requests
+
+from tradehub.pagination import MAX_PAGE_SIZE, PageCursor, aiter_pages, iter_pages
+from tradehub.utils import parse_duration
+
+DEFAULT_BLOCK_TIME = 2.0
+# node errors, undecodable responses and malformed or partial rows, the follower backs off and polls again
+TRANSIENT_ERRORS = (requests.exceptions.RequestException, ValueError, KeyError, TypeError)
+
+
+class FileCheckpoint(object):
+    """
+    Last handed out row id stored in a text file. Writes go to a temporary file which replaces the
+    checkpoint, so a crash never leaves a truncated checkpoint behind.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: file holding the id.
+        """
+        self.path = path
+
+    def load(self) -> Optional[int]:
+        try:
+            with open(self.path) as checkpoint_file:
+                content = checkpoint_file.read().strip()
+        except FileNotFoundError:
+            return None
+        return int(content) if content else None
+
+    def save(self, row_id: int) -> None:
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as checkpoint_file:
+            checkpoint_file.write(str(row_id))
+        os.replace(temporary, self.path)
+
+
+class AdaptiveInterval(object):
+    """
+    Polling interval derived from an EWMA of the row arrival rate.
+
+    The next poll is due when the next row is expected, 1 / rate, bounded by the block time, new rows can only
+    appear with a new block, and 'max_interval'. Quiet periods decay the rate, so polling slows down until a
+    row arrives again.
+    """
+
+    def __init__(self, block_time: float = DEFAULT_BLOCK_TIME, min_interval: Optional[float] = None,
+                 max_interval: float = 30.0, alpha: float = 0.3):
+        """
+        :param block_time: seconds between blocks.
+        :param min_interval: lower bound of the interval, default the block time.
+        :param max_interval: upper bound of the interval.
+        :param alpha: weight of the newest poll in the arrival rate EWMA.
+        """
+        self.block_time = block_time
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.alpha = alpha
+        self.rate: Optional[float] = None
+
+    def update(self, rows: int, elapsed: float) -> float:
+        """
+        Account the rows found by a poll and return the seconds until the next one.
+
+        :param rows: number of new rows.
+        :param elapsed: seconds since the previous poll.
+        :return: seconds to wait
+        """
+        if elapsed > 0:
+            sample = rows / elapsed
+            self.rate = sample if self.rate is None else self.alpha * sample + (1 - self.alpha) * self.rate
+        return self.interval()
+
+    def interval(self) -> float:
+        lower = self.block_time if self.min_interval is None else self.min_interval
+        if not self.rate:
+            return lower if self.rate is None else self.max_interval
+        return min(self.max_interval, max(lower, 1 / self.rate))
+
+
+class Follower(object):
+    """
+    Iterator over new rows of an endpoint, newest id last.
+
+    A backlog, eg. after resuming from an old id, is fetched in id windows of about 'chunk_size' rows, oldest
+    first, so rows are handed out while the rest is still fetched and memory stays bounded. The checkpoint
+    is saved once every row of a chunk was consumed, so rows are handed out at least once across restarts. Without 'after_id' and checkpoint only rows created after the start are yielded.
+    Works with blocking fetch functions via iteration and with coroutine functions via 'async for'.
+    Failed polls are retried with a backoff doubling up to 'max_interval', so a node error does not end
+    the iteration, they are counted in 'errors'.
+    """
+
+    def __init__(self, fetch: Callable[..., Union[List[dict], Awaitable[List[dict]]]],
+                 block_time: Optional[Callable[[], Union[str, Awaitable[str]]]] = None,
+                 after_id: Optional[int] = None, checkpoint: Union[None, str, FileCheckpoint] = None,
+                 min_interval: Optional[float] = None, max_interval: float = 30.0,
+                 page_size: int = MAX_PAGE_SIZE, block_time_refresh: float = 300.0,
+                 chunk_size: int = 10 * MAX_PAGE_SIZE, clock: Callable[[], float] = time.monotonic):
+        """
+        :param fetch: callable taking before_id, after_id and limit and returning rows newest first.
+        :param block_time: callable returning the block time like get_block_time, default 2 seconds.
+        :param after_id: yield rows after this id, default the checkpoint or the newest row.
+        :param checkpoint: FileCheckpoint or path of one to resume from and to store the last id.
+        :param min_interval: lower bound of the polling interval, default the block time.
+        :param max_interval: upper bound of the polling interval in seconds.
+        :param page_size: rows requested per round-trip, at most 200.
+        :param block_time_refresh: seconds after which the block time is requested again.
+        :param chunk_size: rows fetched before they are handed out while catching up with a backlog.
+        :param clock: monotonic time source, only replaced in tests.
+        """
+        self.fetch = fetch
+        self.block_time = block_time
+        self.checkpoint: Optional[FileCheckpoint] = FileCheckpoint(checkpoint) if isinstance(checkpoint, str) \
+            else checkpoint
+        self.last_id: Optional[int] = after_id
+        if self.last_id is None and self.checkpoint is not None:
+            self.last_id = self.checkpoint.load()
+        self.interval = AdaptiveInterval(min_interval=min_interval, max_interval=max_interval)
+        self.page_size = page_size
+        self.block_time_refresh = block_time_refresh
+        self.chunk_size = chunk_size
+        self.clock = clock
+        self.polls: int = 0
+        self.rows: int = 0
+        self._block_time_updated: Optional[float] = None
+        self._last_poll: Optional[float] = None
+        # ids per matching row, sizes the id windows of a backlog
+        self._ids_per_row: float = 1.0
+        self.errors: int = 0
+        self.last_error: Optional[Exception] = None
+        self._failures = 0
+        self._poll_rows = 0
+        self._stop = threading.Event()
+        self._async_stop: Optional[tuple] = None
+
+    def stop(self) -> None:
+        """
+        End the iteration, a waiting iterator wakes up immediately. Can be called from any thread.
+        """
+        self._stop.set()
+        if self._async_stop is not None:
+            loop, event = self._async_stop
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # the event loop is closed, nothing waits anymore
+                pass
+
+    def stats(self) -> dict:
+        return {"last_id": self.last_id, "polls": self.polls, "rows": self.rows, "errors": self.errors,
+                "rate": self.interval.rate, "interval": self.interval.interval(),
+                "block_time": self.interval.block_time}
+
+    def _block_time_due(self) -> bool:
+        return self.block_time is not None and (
+            self._block_time_updated is None or self.clock() - self._block_time_updated >= self.block_time_refresh)
+
+    def _set_block_time(self, value) -> None:
+        self._block_time_updated = self.clock()
+        try:
+            self.interval.block_time = parse_duration(value)
+        except (TypeError, ValueError):
+            pass
+
+    def _cursor(self, before_id: Optional[int] = None) -> PageCursor:
+        return PageCursor(before_id=before_id, after_id=self.last_id, page_size=self.page_size)
+
+    def _fetch_page(self, after_id: Optional[int]):
+        def fetch(before_id):
+            return self.fetch(before_id=before_id, after_id=after_id, limit=self.page_size)
+        return fetch
+
+    def _ascending(self, pages: List[List[dict]]) -> List[dict]:
+        rows = sorted((row for page in pages for row in page), key=lambda row: int(row["id"]))
+        if self.last_id is not None:
+            rows = [row for row in rows if int(row["id"]) > self.last_id]
+        return rows
+
+    def _newest(self, page: List[dict]) -> Tuple[List[dict], Optional[int]]:
+        """
+        New rows of the newest page in ascending id order and, if older new rows are left, the lowest id of the
+        page, which ends the backlog.
+        """
+        cursor = self._cursor()
+        rows = self._ascending([cursor.consume(page)])
+        if cursor.done:
+            return rows, None
+        if rows:
+            self._ids_per_row = (int(rows[-1]["id"]) - int(rows[0]["id"]) + 1) / len(rows)
+        return rows, cursor.before_id
+
+    def _window(self, end: int) -> int:
+        """
+        Exclusive upper id of the next backlog chunk, about 'chunk_size' matching rows after 'last_id'.
+        """
+        return min(end, self.last_id + 1 + max(self.page_size, int(self.chunk_size * self._ids_per_row)))
+
+    def _commit(self, rows: List[dict], before_id: Optional[int] = None) -> None:
+        self.rows += len(rows)
+        self._poll_rows += len(rows)
+        last_id = int(rows[-1]["id"]) if rows else self.last_id
+        if before_id is not None:
+            # ids only grow, no row can appear below the end of a fetched window anymore
+            self._ids_per_row = (before_id - 1 - self.last_id) / len(rows) if rows else self._ids_per_row * 2
+            last_id = max(last_id, before_id - 1)
+        if last_id != self.last_id:
+            self.last_id = last_id
+            if self.checkpoint is not None:
+                self.checkpoint.save(self.last_id)
+
+    def _polled(self) -> None:
+        """
+        Account a finished poll, the interval until the next one is updated.
+        """
+        now = self.clock()
+        if self._last_poll is not None:
+            self.interval.update(self._poll_rows, now - self._last_poll)
+        self._last_poll = now
+        self._poll_rows = 0
+        self.polls += 1
+
+    def _failed(self, error: Exception) -> float:
+        """
+        Account a failed poll and return the seconds until the next attempt, doubling up to 'max_interval'.
+        """
+        self.errors += 1
+        self.last_error = error
+        self._failures += 1
+        return min(self.interval.max_interval, self.interval.interval() * 2 ** self._failures)
+
+    def _start(self, latest: List[dict]) -> None:
+        self.last_id = int(latest[0]["id"]) if latest else 0
+        self._last_poll = self.clock()
+
+    def __iter__(self) -> Iterator[dict]:
+        end = None
+        while not self._stop.is_set():
+            if self._block_time_due():
+                try:
+                    self._set_block_time(self.block_time())
+                except TRANSIENT_ERRORS:
+                    # keep the previous block time until the next refresh
+                    self._block_time_updated = self.clock()
+            try:
+                if self.last_id is None:
+                    self._start(self.fetch(before_id=None, after_id=None, limit=1))
+                    self._stop.wait(self.interval.interval())
+                    continue
+                if end is None:
+                    newest, end = self._newest(self.fetch(before_id=None, after_id=self.last_id,
+                                                          limit=self.page_size))
+                while end is not None and self.last_id + 1 < end and not self._stop.is_set():
+                    before_id = self._window(end)
+                    rows = self._ascending(list(iter_pages(self._fetch_page(self.last_id), self._cursor(before_id),
+                                                           prefetch=False)))
+                    self._failures = 0
+                    yield from rows
+                    self._commit(rows, before_id)
+                if end is not None and self.last_id + 1 < end:
+                    # stopped while catching up, newer rows must not skip the rest of the backlog
+                    break
+            except TRANSIENT_ERRORS as error:
+                # a backlog continues after the last handed out chunk
+                self._stop.wait(self._failed(error))
+                continue
+            self._failures = 0
+            end = None
+            rows = self._ascending([newest])
+            yield from rows
+            self._commit(rows)
+            self._polled()
+            self._stop.wait(self.interval.interval())
+
+    async def _wait(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._async_stop[1].wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        event = asyncio.Event()
+        self._async_stop = (asyncio.get_running_loop(), event)
+        if self._stop.is_set():
+            event.set()
+        end = None
+        while not self._stop.is_set():
+            if self._block_time_due():
+                try:
+                    self._set_block_time(await self.block_time())
+                except TRANSIENT_ERRORS:
+                    # keep the previous block time until the next refresh
+                    self._block_time_updated = self.clock()
+            try:
+                if self.last_id is None:
+                    self._start(await self.fetch(before_id=None, after_id=None, limit=1))
+                    await self._wait(self.interval.interval())
+                    continue
+                if end is None:
+                    newest, end = self._newest(await self.fetch(before_id=None, after_id=self.last_id,
+                                                                limit=self.page_size))
+                while end is not None and self.last_id + 1 < end and not self._stop.is_set():
+                    before_id = self._window(end)
+                    rows = self._ascending([page async for page in aiter_pages(
+                        self._fetch_page(self.last_id), self._cursor(before_id), prefetch=False)])
+                    self._failures = 0
+                    for row in rows:
+                        yield row
+                    self._commit(rows, before_id)
+                if end is not None and self.last_id + 1 < end:
+                    # stopped while catching up, newer rows must not skip the rest of the backlog
+                    break
+            except TRANSIENT_ERRORS as error:
+                # a backlog continues after the last handed out chunk
+                await self._wait(self._failed(error))
+                continue
+            self._failures = 0
+            end = None
+            rows = self._ascending([newest])
+            for row in rows:
+                yield row
+            self._commit(rows)
+            self._polled()
+            await self._wait(self.interval.interval())
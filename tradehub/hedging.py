@@ -0,0 +1,125 @@
+"""
+Description:
+    Hedged requests for latency critical reads. If the first node has not answered after a percentile of the
+    recently observed latency a backup request is sent to the second best node and the first answer wins.
+Usage:
+    from tradehub.hedging import HedgePolicy
+    from tradehub.node_pool import NodePool
+
+    hedge = HedgePolicy(percentile=95)
+    public_client = PublicClient(node_pool=NodePool.from_ips(active_peers), hedge=hedge)
+    public_client.get_orderbook("swth_eth1")
+    print(hedge.stats())
+"""
+
+import math
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+HEDGED_PATHS = ('/get_orderbook', '/get_prices', '/get_order')
+
+
+class LatencyTracker(object):
+    """
+    Sliding window of latency samples with percentile lookups.
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        :param window: number of most recent samples kept.
+        """
+        self.count: int = 0
+        self._samples = deque(maxlen=window)
+        self._sorted = None
+        self._lock = threading.Lock()
+
+    def add(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+            self.count += 1
+            self._sorted = None
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Nearest rank percentile of the samples in the window.
+
+        :param percentile: value between 0 and 100.
+        :return: latency in seconds or None without samples.
+        """
+        with self._lock:
+            if not self._samples:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._samples)
+            index = max(0, math.ceil(percentile / 100 * len(self._sorted)) - 1)
+            return self._sorted[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgePolicy(object):
+    """
+    Configuration and counters of hedged requests used by NodePoolRequest.
+
+    The hedge delay is the given percentile of single attempt latencies, until 'min_samples' attempts were
+    observed 'initial_delay' is used. The backup attempt can not abort the blocking call of the slower node,
+    its response is discarded once the other one won.
+    """
+
+    def __init__(self, paths: Iterable[str] = HEDGED_PATHS, percentile: float = 95, initial_delay: float = 0.5,
+                 min_delay: float = 0.01, min_samples: int = 20, window: int = 1000, max_workers: int = 20):
+        """
+        :param paths: request paths that are hedged, default get_orderbook, get_prices and get_order.
+        :param percentile: percentile of attempt latency after which the backup request is sent.
+        :param initial_delay: hedge delay in seconds until enough samples are collected.
+        :param min_delay: lower bound for the hedge delay in seconds.
+        :param min_samples: number of samples needed before the percentile is used.
+        :param window: number of latency samples kept.
+        :param max_workers: threads used to run primary and backup attempts.
+        """
+        self.paths = frozenset(paths)
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.attempt_latencies = LatencyTracker(window=window)
+        self.latencies = LatencyTracker(window=window)
+        self.requests: int = 0
+        self.hedged: int = 0
+        self.backup_wins: int = 0
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedged-request')
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """
+        Seconds to wait for the primary attempt before the backup is sent.
+        """
+        if len(self.attempt_latencies) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, self.attempt_latencies.percentile(self.percentile))
+
+    def record(self, latency: float, hedged: bool, backup_won: bool) -> None:
+        self.latencies.add(latency)
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            self.backup_wins += backup_won
+
+    def stats(self) -> dict:
+        """
+        Counters and end to end latency percentiles of hedged paths.
+
+        :return: dict with requests, hedged, backup_wins, p50, p99 and the current delay.
+        """
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "backup_wins": self.backup_wins,
+            "p50": self.latencies.percentile(50),
+            "p99": self.latencies.percentile(99),
+            "delay": self.delay(),
+        }
@@ -0,0 +1,211 @@
+"""
+Description:
+    Index of the token and market metadata of get_tokens and get_markets with constant time lookups of tokens
+    by denom, markets by ticker and markets by base and quote denom. The lists are loaded on first use and
+    again once they are older than a time to live, or kept fresh by a background thread. One index per node
+    can be shared by every client of that node.
+Usage:
+    from tradehub.metadata import MetadataIndex
+
+    index = MetadataIndex.shared(public_client)
+    index.decimals("swth")                  # 8
+    index.market("swth_eth1")["lot_size"]   # "1"
+    index.pair("swth", "eth1")              # [{"name": "swth_eth1", ...}]
+"""
+
+import logging
+import threading
+import time
+
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+DATASETS = ('tokens', 'markets')
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataIndex(object):
+    """
+    Tokens and markets of a node by key.
+
+    Every list is loaded on first use and again once it is older than 'ttl'. An unknown key triggers one early
+    reload, so tokens and markets listed after the last load are found, at most every 'min_reload' seconds.
+    Reloads run outside the lock; while one is in flight and after a failed one, the previous list is served.
+    Thread safe.
+    """
+
+    _shared: Dict[str, 'MetadataIndex'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, client, ttl: float = 300.0, min_reload: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param client: PublicClient, raw clients are supported.
+        :param ttl: seconds until a list is loaded again.
+        :param min_reload: minimum seconds between reloads caused by unknown keys.
+        :param clock: monotonic time source, only replaced in tests.
+        """
+        self.client = client
+        self.ttl = ttl
+        self.min_reload = min_reload
+        self.clock = clock
+        self._tokens: Dict[str, dict] = {}
+        self._markets: Dict[str, dict] = {}
+        self._pairs: Dict[Tuple[str, str], List[dict]] = {}
+        self._loaded_at: Dict[str, Optional[float]] = {dataset: None for dataset in DATASETS}
+        self._retry_at: Dict[str, float] = {dataset: float('-inf') for dataset in DATASETS}
+        self._loading: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+
+    @classmethod
+    def shared(cls, client, **kwargs) -> 'MetadataIndex':
+        """
+        Index shared by all clients of the same node, created with 'client' and 'kwargs' on first use.
+
+        :param client: PublicClient, clients are told apart by their 'api_url'.
+        :return: MetadataIndex
+        """
+        key = getattr(client, 'api_url', None) or str(id(client))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(client, **kwargs)
+            return cls._shared[key]
+
+    def _fetch(self, dataset: str) -> list:
+        return self.client._decoded(self.client.get_tokens() if dataset == 'tokens' else self.client.get_markets())
+
+    def _store(self, dataset: str, rows: list) -> None:
+        if dataset == 'tokens':
+            self._tokens = {token["denom"]: token for token in rows}
+        else:
+            markets, pairs = {}, {}
+            for market in rows:
+                markets[market["name"]] = market
+                pairs.setdefault((market["base"], market["quote"]), []).append(market)
+            self._markets, self._pairs = markets, pairs
+        self._loaded_at[dataset] = self.clock()
+        self._retry_at[dataset] = float('-inf')
+
+    def _due(self, dataset: str, table: str, key) -> bool:
+        now = self.clock()
+        loaded_at = self._loaded_at[dataset]
+        if loaded_at is None:
+            return True
+        if dataset in self._loading or now < self._retry_at[dataset]:
+            return False
+        return now - loaded_at >= self.ttl or (key not in getattr(self, table) and now - loaded_at >= self.min_reload)
+
+    def _lookup(self, dataset: str, table: str, key):
+        with self._lock:
+            if not self._due(dataset, table, key):
+                return getattr(self, table).get(key)
+            self._loading.add(dataset)
+        # the node is asked without holding the lock, lookups of other keys keep being served meanwhile
+        try:
+            rows = self._fetch(dataset)
+        except Exception as error:
+            with self._lock:
+                self._loading.discard(dataset)
+                if self._loaded_at[dataset] is None:
+                    raise
+                self._retry_at[dataset] = self.clock() + self.min_reload
+                logger.warning("Reloading %s failed, serving the previous list: %r", dataset, error)
+                return getattr(self, table).get(key)
+        with self._lock:
+            self._loading.discard(dataset)
+            self._store(dataset, rows)
+            return getattr(self, table).get(key)
+
+    def refresh(self) -> None:
+        """
+        Load the token and market lists now.
+        """
+        rows = {dataset: self._fetch(dataset) for dataset in DATASETS}
+        with self._lock:
+            for dataset in DATASETS:
+                self._store(dataset, rows[dataset])
+
+    def token(self, denom: str) -> dict:
+        """
+        Token as returned by get_tokens.
+
+        :param denom: denom used by tradehub, eg. 'swth'.
+        :raises ValueError: if the denom is not listed by get_tokens.
+        :return: dict
+        """
+        token = self._lookup('tokens', '_tokens', denom)
+        if token is None:
+            raise ValueError(f"Unknown token {denom}!")
+        return token
+
+    def has_token(self, denom: str) -> bool:
+        return self._lookup('tokens', '_tokens', denom) is not None
+
+    def decimals(self, denom: str) -> int:
+        return int(self.token(denom)["decimals"])
+
+    def market(self, ticker: str) -> dict:
+        """
+        Market as returned by get_markets.
+
+        :param ticker: Market ticker used by blockchain (eg. swth_eth1).
+        :raises ValueError: if the market is not listed by get_markets.
+        :return: dict
+        """
+        market = self._lookup('markets', '_markets', ticker)
+        if market is None:
+            raise ValueError(f"Unknown market {ticker}!")
+        return market
+
+    def has_market(self, ticker: str) -> bool:
+        return self._lookup('markets', '_markets', ticker) is not None
+
+    def pair(self, base: str, quote: str) -> List[dict]:
+        """
+        Markets trading a base denom against a quote denom, eg. the spot and futures markets of a pair.
+
+        :param base: denom of the base token, eg. 'swth'.
+        :param quote: denom of the quote token, eg. 'eth1'.
+        :return: List with markets as dict, empty if there is none
+        """
+        return list(self._lookup('markets', '_pairs', (base, quote)) or [])
+
+    def lot_size(self, ticker: str) -> Decimal:
+        return Decimal(self.market(ticker)["lot_size"])
+
+    def tick_size(self, ticker: str) -> Decimal:
+        return Decimal(self.market(ticker)["tick_size"])
+
+    def start(self, interval: Optional[float] = None) -> 'MetadataIndex':
+        """
+        Reload both lists in a daemon thread every 'interval' seconds, so lookups do not wait for the node.
+        Failed reloads keep the previous lists and are retried at the next interval.
+
+        :param interval: seconds between reloads, default a little less than 'ttl'.
+        :return: self
+        """
+        if self._stop is not None:
+            return self
+        interval = interval if interval is not None else self.ttl * 0.9
+        self._stop = stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as error:
+                    logger.warning("Refreshing the metadata failed, keeping the previous lists: %r", error)
+                stop.wait(interval)
+
+        threading.Thread(target=run, name='metadata-refresh', daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the background reloads.
+        """
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
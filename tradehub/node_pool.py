@@ -0,0 +1,327 @@
+"""
+Description:
+    Load balanced transport over a pool of validator nodes. Every node keeps an EWMA of its latency and error
+    rate, requests go to the fastest healthy node and nodes that fail repeatedly or lag behind in block height
+    are ejected for a while.
+Usage:
+    from tradehub.node_pool import NodePool
+    from tradehub.utils import validator_crawler_mp
+
+    active_peers = validator_crawler_mp(network='main')["active_peers"]
+    public_client = PublicClient(node_pool=NodePool.from_ips(active_peers))
+"""
+
+import threading
+import time
+import requests
+
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterable, List, Optional
+from tradehub.hedging import HedgePolicy, LatencyTracker
+from tradescan.utils import AsyncRequest, DEFAULT_MAX_CONCURRENCY, Request, get_session
+
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError)
+
+
+def is_client_error(error: Exception) -> bool:
+    """
+    True for HTTP 4xx errors, these are caused by the request and not by the node.
+    """
+    return isinstance(error, requests.exceptions.HTTPError) and error.response is not None \
+        and error.response.status_code < 500
+
+
+class Node(object):
+    """
+    Health state of a single node in a NodePool.
+    """
+
+    def __init__(self, uri: str, request: Request):
+        self.uri: str = uri.rstrip('/')
+        self.request: Request = request
+        self.latency: Optional[float] = None
+        self.error_rate: float = 0.0
+        self.consecutive_failures: int = 0
+        self.block_height: Optional[int] = None
+        self.ejected_until: float = 0.0
+        self.requests: int = 0
+        self.failures: int = 0
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def stats(self) -> dict:
+        return {
+            "uri": self.uri,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "block_height": self.block_height,
+            "ejected": self.is_ejected(time.monotonic()),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class NodePool(object):
+    """
+    Pool of tradehub nodes with latency aware routing.
+
+    Nodes without any latency sample yet are preferred, so every node gets measured once before the
+    fastest one takes over. If every node is ejected the one whose ejection ends first is used anyway.
+    """
+
+    def __init__(self, uris: Iterable[str], timeout: int = 30, alpha: float = 0.2, max_error_rate: float = 0.5,
+                 max_consecutive_failures: int = 3, eject_seconds: float = 30, max_block_lag: int = 10,
+                 pool_maxsize: int = 10):
+        """
+        :param uris: URI addresses off tradehub nodes, eg. 'http://54.255.5.46:5001'.
+        :param timeout: request timeout in seconds.
+        :param alpha: weight of the newest sample in the latency and error rate EWMA.
+        :param max_error_rate: eject a node if its error rate EWMA exceeds this value.
+        :param max_consecutive_failures: eject a node after this many failed requests in a row.
+        :param eject_seconds: time an ejected node is skipped.
+        :param max_block_lag: eject a node whose block height is more than this many blocks behind the pool.
+        :param pool_maxsize: keep-alive connections per node.
+        """
+        session = get_session(pool_maxsize=pool_maxsize)
+        self.nodes: List[Node] = [Node(uri, Request(api_url=uri, timeout=timeout, session=session)) for uri in uris]
+        if not self.nodes:
+            raise ValueError("NodePool needs at least one node!")
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.max_consecutive_failures = max_consecutive_failures
+        self.eject_seconds = eject_seconds
+        self.max_block_lag = max_block_lag
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._monitor_stop = threading.Event()
+
+    @classmethod
+    def from_ips(cls, node_ips: Iterable[str], node_port: int = 5001, **kwargs) -> 'NodePool':
+        """
+        Create a pool from node ips like the 'active_peers' returned by validator_crawler_mp.
+
+        :param node_ips: ip addresses off tradehub nodes.
+        :param node_port: port off the tradehub nodes, default 5001.
+        :return: NodePool
+        """
+        return cls([f"http://{node_ip}:{node_port}" for node_ip in node_ips], **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def healthy_nodes(self) -> List[Node]:
+        now = time.monotonic()
+        return [node for node in self.nodes if not node.is_ejected(now)]
+
+    def select(self, exclude: Iterable[Node] = ()) -> Node:
+        """
+        Return the healthy node with the lowest latency EWMA.
+
+        :param exclude: nodes that should not be returned, eg. already tried ones.
+        :return: Node
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [node for node in self.nodes if node not in exclude] or self.nodes
+            healthy = [node for node in candidates if not node.is_ejected(now)]
+            if not healthy:
+                return min(candidates, key=lambda node: node.ejected_until)
+            return min(healthy, key=lambda node: node.latency or 0.0)
+
+    def record_success(self, node: Node, latency: float) -> None:
+        with self._lock:
+            node.requests += 1
+            node.consecutive_failures = 0
+            node.latency = latency if node.latency is None else self.alpha * latency + (1 - self.alpha) * node.latency
+            node.error_rate = (1 - self.alpha) * node.error_rate
+
+    def record_failure(self, node: Node) -> None:
+        with self._lock:
+            node.requests += 1
+            node.failures += 1
+            node.consecutive_failures += 1
+            node.error_rate = self.alpha + (1 - self.alpha) * node.error_rate
+            if node.consecutive_failures >= self.max_consecutive_failures or node.error_rate > self.max_error_rate:
+                self._eject(node)
+
+    def _eject(self, node: Node) -> None:
+        node.ejected_until = time.monotonic() + self.eject_seconds
+        # give the node a clean slate once it is back in rotation
+        node.consecutive_failures = 0
+        node.error_rate = 0.0
+        node.latency = None
+
+    def refresh_block_heights(self) -> None:
+        """
+        Request the block height of every node via '/get_status' and eject the ones lagging more than
+        max_block_lag blocks behind the highest one. Unreachable nodes count as failed request.
+        """
+        for node in self.nodes:
+            try:
+                status = node.request.get('/get_status')
+                height = int(status["result"]["sync_info"]["latest_block_height"])
+            except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+                self.record_failure(node)
+                continue
+            with self._lock:
+                node.block_height = height
+
+        with self._lock:
+            heights = [node.block_height for node in self.nodes if node.block_height is not None]
+            if not heights:
+                return
+            tip = max(heights)
+            for node in self.nodes:
+                if node.block_height is not None and tip - node.block_height > self.max_block_lag:
+                    self._eject(node)
+
+    def start_monitor(self, interval: float = 15) -> None:
+        """
+        Refresh block heights in a background thread every 'interval' seconds.
+
+        :param interval: seconds between two refreshes.
+        """
+        if self._monitor is not None:
+            return
+        self._monitor_stop.clear()
+
+        def run():
+            while not self._monitor_stop.is_set():
+                self.refresh_block_heights()
+                self._monitor_stop.wait(interval)
+
+        self._monitor = threading.Thread(target=run, name='node-pool-monitor', daemon=True)
+        self._monitor.start()
+
+    def stop_monitor(self) -> None:
+        if self._monitor is not None:
+            self._monitor_stop.set()
+            self._monitor.join()
+            self._monitor = None
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [node.stats() for node in self.nodes]
+
+
+class NodePoolRequest(Request):
+    """
+    Request sending every call to the currently best node of a NodePool.
+
+    GET requests failing with a connection error, timeout or 5xx status are retried on the next best node.
+    POST requests are never retried. With a HedgePolicy, GET requests to its paths are hedged on a second node.
+    """
+
+    def __init__(self, pool: NodePool, retries: int = 2, cache=None, coalesce: bool = False,
+                 hedge: Optional[HedgePolicy] = None, decoder=None, raw: bool = False, rate_limiter=None,
+                 concurrency=None, hooks=None):
+        """
+        :param pool: NodePool to route requests to.
+        :param retries: number of other nodes a failed GET request is retried on.
+        :param cache: Optional tradescan.cache.ResponseCache for GET responses.
+        :param coalesce: Share one round-trip between concurrent identical GET requests.
+        :param hedge: Optional HedgePolicy for latency critical paths.
+        :param decoder: Callable decoding the response body bytes, default orjson.loads if installed else json.loads.
+        :param raw: Return the undecoded response body bytes of GET requests.
+        :param rate_limiter: Optional tradescan.ratelimit.RateLimiter, buckets are kept per node of the pool.
+        :param concurrency: Optional tradescan.ratelimit.AIMDController limiting GET requests in flight.
+        :param hooks: Callables receiving a tradescan.metrics.RequestEvent for every GET attempt.
+        """
+        first = pool.nodes[0].request
+        super(NodePoolRequest, self).__init__(api_url='nodepool://' + ','.join(node.uri for node in pool.nodes),
+                                              timeout=first.timeout, session=first.session, cache=cache,
+                                              coalesce=coalesce, decoder=decoder, raw=raw,
+                                              rate_limiter=rate_limiter, concurrency=concurrency, hooks=hooks)
+        self.pool = pool
+        self.retries = retries
+        self.hedge = hedge
+
+    def _attempt(self, node: Node, path, params, latencies: Optional[LatencyTracker] = None, retry: bool = False):
+        start = time.perf_counter()
+        try:
+            r = self._send_to(node.uri, path, params, retry=retry)
+        except RETRYABLE_ERRORS as error:
+            if is_client_error(error):
+                self.pool.record_success(node, time.perf_counter() - start)
+            else:
+                self.pool.record_failure(node)
+            raise
+        latency = time.perf_counter() - start
+        self.pool.record_success(node, latency)
+        if latencies is not None:
+            latencies.add(latency)
+        return r
+
+    def _send(self, path, params):
+        if self.hedge is not None and path in self.hedge.paths and len(self.pool.healthy_nodes()) > 1:
+            return self._send_hedged(path, params)
+
+        tried = []
+        while True:
+            node = self.pool.select(exclude=tried)
+            try:
+                return self._attempt(node, path, params, retry=bool(tried))
+            except RETRYABLE_ERRORS as error:
+                tried.append(node)
+                if is_client_error(error) or len(tried) > self.retries or len(tried) >= len(self.pool):
+                    raise
+
+    def _send_hedged(self, path, params):
+        start = time.perf_counter()
+        primary = self.pool.select()
+        futures = {self.hedge.executor.submit(self._attempt, primary, path, params,
+                                              self.hedge.attempt_latencies): primary}
+        backup_future = None
+        timeout = self.hedge.delay()
+        error = None
+        while futures:
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            timeout = None
+            for future in done:
+                del futures[future]
+                try:
+                    r = future.result()
+                except RETRYABLE_ERRORS as attempt_error:
+                    if is_client_error(attempt_error):
+                        raise
+                    error = attempt_error
+                    continue
+                for other in futures:
+                    other.cancel()
+                self.hedge.record(time.perf_counter() - start, hedged=backup_future is not None,
+                                  backup_won=future is backup_future)
+                return r
+
+            if backup_future is None:
+                # primary is slower than the hedge delay or failed, ask the second best node
+                backup = self.pool.select(exclude=[primary])
+                backup_future = self.hedge.executor.submit(self._attempt, backup, path, params,
+                                                           self.hedge.attempt_latencies)
+                futures[backup_future] = backup
+        raise error
+
+    def post(self, path, data=None, json_data=None, params=None):
+        """Perform POST request"""
+        return self.pool.select().request.post(path, data=data, json_data=json_data, params=params)
+
+    def status(self):
+        return self.pool.select().request.status()
+
+
+class AsyncNodePoolRequest(AsyncRequest, NodePoolRequest):
+    """
+    Asyncio counterpart of NodePoolRequest, the routing, retries and hedging of NodePoolRequest run on the
+    worker threads of AsyncRequest.
+    """
+
+    def __init__(self, pool: NodePool, retries: int = 2, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, cache=None,
+                 coalesce: bool = False, hedge: Optional[HedgePolicy] = None, decoder=None, raw: bool = False,
+                 rate_limiter=None, concurrency=None, hooks=None):
+        """
+        :param max_concurrency: Maximum number of requests in flight over all nodes of the pool.
+        See NodePoolRequest for the other parameters.
+        """
+        NodePoolRequest.__init__(self, pool=pool, retries=retries, cache=cache, decoder=decoder, raw=raw,
+                                 hedge=hedge, rate_limiter=rate_limiter, concurrency=concurrency, hooks=hooks)
+        self._init_async(max_concurrency, coalesce)
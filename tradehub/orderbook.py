@@ -0,0 +1,278 @@
+"""
+Description:
+    Incremental L2 orderbook for get_orderbook snapshots. Price levels are kept in sorted arrays of exact
+    fixed-point integer prices. Successive snapshots are applied as diffs, only changed levels are parsed and
+    moved, and every change is reported as a level change. Best bid and ask, depth, VWAP and imbalance are
+    answered by binary search over cumulative quantities instead of walking the book.
+Usage:
+    from tradehub.orderbook import OrderBook
+
+    book = OrderBook()
+    while True:
+        for change in book.update(public_client.get_orderbook("swth_eth1")):
+            print(change["side"], change["price"], change["previous"], "->", change["quantity"])
+        print(book.best_bid(), book.best_ask(), book.vwap("asks", "100000"))
+"""
+
+import functools
+
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from itertools import accumulate
+from operator import itemgetter, mul
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from tradehub.amounts import from_base_units, to_base_units
+
+DEFAULT_SCALE = 18
+
+SIDES = ('bids', 'asks')
+
+_LEVEL = itemgetter('price', 'quantity')
+
+
+@functools.lru_cache(maxsize=65536)
+def _fixed_point(value: str, scale: int) -> int:
+    # prices and quantities repeat across snapshots, repeated strings are parsed once
+    return to_base_units(value, scale)
+
+
+class _BookSide(object):
+    """
+    One side of the book. Levels are ordered best first: 'keys' holds the integer price of asks and the
+    negated integer price of bids in ascending order. The cumulative quantity and notional sums are extended
+    on demand and a changed level only drops the sums from its index on, so changes deep in the book keep
+    the sums of the top levels.
+    """
+
+    def __init__(self, sign: int):
+        self.sign = sign
+        self.keys: List[int] = []
+        self.quantities: Dict[int, int] = {}
+        self.raw: Set[Tuple[str, str]] = set()
+        self._cumulative_quantity: List[int] = []
+        self._cumulative_notional: List[int] = []
+
+    def set(self, price: int, quantity: int) -> None:
+        key = self.sign * price
+        index = bisect_left(self.keys, key)
+        if quantity:
+            if key not in self.quantities:
+                self.keys.insert(index, key)
+            self.quantities[key] = quantity
+        elif key in self.quantities:
+            del self.keys[index]
+            del self.quantities[key]
+        del self._cumulative_quantity[index:]
+        del self._cumulative_notional[index:]
+
+    def price(self, index: int) -> int:
+        return self.sign * self.keys[index]
+
+    def cumulative(self, count: int) -> Tuple[List[int], List[int]]:
+        """
+        Cumulative quantity and notional, key * quantity, of at least the first 'count' levels.
+        """
+        quantities, notionals = self._cumulative_quantity, self._cumulative_notional
+        start = len(quantities)
+        if start < count:
+            keys = self.keys[start:count]
+            level_quantities = list(map(self.quantities.__getitem__, keys))
+            quantities.extend(accumulate(level_quantities, initial=quantities[-1] if quantities else 0))
+            notionals.extend(accumulate(map(mul, keys, level_quantities), initial=notionals[-1] if notionals else 0))
+            # drop the initial values
+            del quantities[start]
+            del notionals[start]
+        return quantities, notionals
+
+    def covering(self, quantity: int) -> int:
+        """
+        Index of the first level at which the cumulative quantity reaches 'quantity', len(self) if never.
+        """
+        count = 64
+        while True:
+            quantities, _ = self.cumulative(count)
+            index = bisect_left(quantities, quantity)
+            if index < len(quantities) or len(quantities) == len(self.keys):
+                return index
+            count *= 4
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class OrderBook(object):
+    """
+    L2 orderbook of a market, built from get_orderbook snapshots.
+
+    Prices and quantities are stored as integers scaled by 10 ** scale, so levels compare exactly; queries
+    take and return Decimal. Snapshots should be requested with the same 'limit', levels missing from a
+    snapshot are removed. Not thread safe.
+    """
+
+    def __init__(self, price_scale: int = DEFAULT_SCALE, quantity_scale: int = DEFAULT_SCALE):
+        """
+        :param price_scale: decimals kept of prices, digits beyond are truncated.
+        :param quantity_scale: decimals kept of quantities, digits beyond are truncated.
+        """
+        self.price_scale = price_scale
+        self.quantity_scale = quantity_scale
+        self.sides: Dict[str, _BookSide] = {"bids": _BookSide(-1), "asks": _BookSide(1)}
+        self.updates: int = 0
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, **kwargs) -> 'OrderBook':
+        book = cls(**kwargs)
+        book.update(snapshot)
+        return book
+
+    def _side(self, side: str) -> _BookSide:
+        try:
+            return self.sides[side]
+        except KeyError:
+            raise ValueError(f"Side has to be 'bids' or 'asks', got {side}!") from None
+
+    def _price(self, value: Union[str, Decimal, int, float]) -> int:
+        return _fixed_point(value, self.price_scale) if isinstance(value, str) \
+            else to_base_units(value, self.price_scale)
+
+    def _quantity(self, value: Union[str, Decimal, int, float]) -> int:
+        return _fixed_point(value, self.quantity_scale) if isinstance(value, str) \
+            else to_base_units(value, self.quantity_scale)
+
+    def update(self, snapshot: dict) -> List[dict]:
+        """
+        Apply a get_orderbook snapshot as diff against the current book.
+
+        :param snapshot: dict with 'asks' and 'bids' lists of 'price' and 'quantity' strings.
+        :return: list of level changes as dict with 'side', 'price', 'quantity' and 'previous', a removed
+            level has quantity 0 and a new one previous 0
+        """
+        changes = []
+        for side_name in SIDES:
+            side = self.sides[side_name]
+            levels = set(map(_LEVEL, snapshot.get(side_name) or ()))
+            # unchanged levels cancel out, only the difference is parsed
+            added = levels - side.raw
+            added_prices = {price for price, _ in added}
+            for price, quantity in added:
+                changes.append(self._set(side_name, side, price, quantity))
+            for price, _ in side.raw - levels:
+                if price not in added_prices:
+                    changes.append(self._set(side_name, side, price, '0'))
+            side.raw = levels
+        self.updates += 1
+        return changes
+
+    def _set(self, side_name: str, side: _BookSide, price: str, quantity: str) -> dict:
+        price_value = self._price(price)
+        quantity_value = self._quantity(quantity)
+        previous = side.quantities.get(side.sign * price_value, 0)
+        side.set(price_value, quantity_value)
+        return {"side": side_name, "price": from_base_units(price_value, self.price_scale),
+                "quantity": from_base_units(quantity_value, self.quantity_scale),
+                "previous": from_base_units(previous, self.quantity_scale)}
+
+    def _level(self, side: _BookSide, index: int) -> Tuple[Decimal, Decimal]:
+        return (from_base_units(side.price(index), self.price_scale),
+                from_base_units(side.quantities[side.keys[index]], self.quantity_scale))
+
+    def best_bid(self) -> Optional[Tuple[Decimal, Decimal]]:
+        """
+        :return: price and quantity of the highest bid or None for an empty side
+        """
+        bids = self.sides["bids"]
+        return self._level(bids, 0) if bids else None
+
+    def best_ask(self) -> Optional[Tuple[Decimal, Decimal]]:
+        """
+        :return: price and quantity of the lowest ask or None for an empty side
+        """
+        asks = self.sides["asks"]
+        return self._level(asks, 0) if asks else None
+
+    def spread(self) -> Optional[Decimal]:
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask[0] - bid[0] if bid and ask else None
+
+    def mid(self) -> Optional[Decimal]:
+        bid, ask = self.best_bid(), self.best_ask()
+        return (ask[0] + bid[0]) / 2 if bid and ask else None
+
+    def levels(self, side: str, limit: Optional[int] = None) -> List[Tuple[Decimal, Decimal]]:
+        """
+        Levels of a side, best first.
+
+        :param side: 'bids' or 'asks'.
+        :param limit: number of levels, default all.
+        :return: list of price and quantity
+        """
+        book_side = self._side(side)
+        return [self._level(book_side, index) for index in range(min(len(book_side), limit or len(book_side)))]
+
+    def depth(self, side: str, price: Union[str, Decimal]) -> Decimal:
+        """
+        Quantity offered up to a price: bids at or above and asks at or below it.
+
+        :param side: 'bids' or 'asks'.
+        :param price: limit price.
+        :return: Decimal quantity
+        """
+        book_side = self._side(side)
+        count = bisect_right(book_side.keys, book_side.sign * self._price(price))
+        quantities, _ = book_side.cumulative(count)
+        return from_base_units(quantities[count - 1] if count else 0, self.quantity_scale)
+
+    def vwap(self, side: str, size: Union[str, Decimal]) -> Optional[Decimal]:
+        """
+        Volume weighted average price of filling 'size' against a side, eg. 'asks' for a market buy.
+
+        :param side: 'bids' or 'asks'.
+        :param size: quantity to fill.
+        :return: Decimal price or None if the side holds less than 'size'
+        """
+        book_side = self._side(side)
+        size_value = self._quantity(size)
+        if size_value <= 0:
+            raise ValueError(f"Size has to be positive, got {size}!")
+        # first level at which the cumulative quantity covers the size, it is filled partially
+        index = book_side.covering(size_value)
+        if index == len(book_side):
+            return None
+        quantities, notionals = book_side.cumulative(index + 1)
+        filled, notional = (quantities[index - 1], book_side.sign * notionals[index - 1]) if index else (0, 0)
+        notional += (size_value - filled) * book_side.price(index)
+        return (Decimal(notional) / Decimal(size_value)).scaleb(-self.price_scale)
+
+    def imbalance(self, levels: Optional[int] = None) -> Optional[float]:
+        """
+        Order flow imbalance (bid quantity - ask quantity) / (bid quantity + ask quantity) of the top levels.
+
+        :param levels: number of levels per side, default all.
+        :return: float between -1 and 1 or None for an empty book
+        """
+        totals = []
+        for side_name in SIDES:
+            side = self.sides[side_name]
+            count = len(side) if levels is None else min(levels, len(side))
+            quantities, _ = side.cumulative(count)
+            totals.append(quantities[count - 1] if count else 0)
+        bid_quantity, ask_quantity = totals
+        if not bid_quantity + ask_quantity:
+            return None
+        return (bid_quantity - ask_quantity) / (bid_quantity + ask_quantity)
+
+    def to_dict(self) -> dict:
+        """
+        The book in the get_orderbook format, best levels first.
+        """
+        result = {}
+        for side_name in ('asks', 'bids'):
+            side = self.sides[side_name]
+            by_key = {side.sign * self._price(price): (price, quantity) for price, quantity in side.raw}
+            result[side_name] = [{"price": by_key[key][0], "quantity": by_key[key][1]}
+                                 for key in side.keys if key in by_key]
+        return result
+
+    def __len__(self) -> int:
+        return len(self.sides["bids"]) + len(self.sides["asks"])
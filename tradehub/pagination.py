@@ -0,0 +1,142 @@
+"""
+Description:
+    Cursor pagination over endpoints returning rows newest first with exclusive 'before_id' and 'after_id'
+    filters, like get_trades. The next page is requested while the current one is consumed, so a consumer
+    is not limited to one round-trip per page.
+Usage:
+    for trade in public_client.iter_trades(market="swth_eth1", after_id=100000):
+        print(trade["id"])
+"""
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+
+from tradehub.utils import parse_timestamp
+
+MAX_PAGE_SIZE = 200
+
+
+class PageCursor(object):
+    """
+    Position of a pagination over an id range and optional time range.
+
+    Ids are exclusive like the 'before_id' and 'after_id' request parameters. 'start_time' is inclusive,
+    'end_time' exclusive. Time bounds are checked per row, so the walk starts at the newest row or
+    'before_id' and stops at the first row older than 'start_time'.
+    """
+
+    def __init__(self, before_id: Optional[int] = None, after_id: Optional[int] = None,
+                 start_time=None, end_time=None, page_size: int = MAX_PAGE_SIZE,
+                 time_field: str = 'block_created_at'):
+        """
+        :param before_id: only rows with a lower id, None starts at the newest row.
+        :param after_id: only rows with a higher id.
+        :param start_time: only rows created at or after this time, epoch seconds, datetime or ISO 8601 str.
+        :param end_time: only rows created before this time, epoch seconds, datetime or ISO 8601 str.
+        :param page_size: rows requested per page, values above 200 have no effect.
+        :param time_field: row field holding the creation time.
+        """
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page size has to be between 1 and {MAX_PAGE_SIZE}, got {page_size} instead.")
+        self.before_id: Optional[int] = before_id
+        self.after_id: Optional[int] = after_id
+        self.start_time: Optional[float] = None if start_time is None else parse_timestamp(start_time)
+        self.end_time: Optional[float] = None if end_time is None else parse_timestamp(end_time)
+        self.page_size = page_size
+        self.time_field = time_field
+        self.done: bool = after_id is not None and before_id is not None and before_id - after_id <= 1
+        self.pages: int = 0
+        self.rows: int = 0
+
+    def consume(self, page: List[dict]) -> List[dict]:
+        """
+        Advance the cursor past a page and return its rows within the range.
+
+        :param page: rows as returned for the current 'before_id', newest first.
+        :return: rows to hand out, newest first.
+        """
+        self.pages += 1
+        rows = []
+        lowest = self.before_id
+        for row in page:
+            row_id = int(row["id"])
+            # guards against nodes ignoring the filters, every row is handed out once
+            if (self.before_id is not None and row_id >= self.before_id) or \
+                    (self.after_id is not None and row_id <= self.after_id):
+                continue
+            lowest = row_id if lowest is None else min(lowest, row_id)
+            if self.start_time is not None or self.end_time is not None:
+                created_at = parse_timestamp(row[self.time_field])
+                if self.end_time is not None and created_at >= self.end_time:
+                    continue
+                if self.start_time is not None and created_at < self.start_time:
+                    self.done = True
+                    break
+            rows.append(row)
+
+        if len(page) < self.page_size or lowest is None or lowest == self.before_id:
+            self.done = True
+        elif self.after_id is not None and lowest - self.after_id <= 1:
+            self.done = True
+        self.before_id = lowest
+        self.rows += len(rows)
+        return rows
+
+
+def iter_pages(fetch: Callable[[Optional[int]], List[dict]], cursor: PageCursor,
+               prefetch: bool = True) -> Iterator[List[dict]]:
+    """
+    Lazily walk the pages of a cursor.
+
+    :param fetch: callable returning the page before the given id, newest first.
+    :param cursor: PageCursor holding the range, advanced while iterating.
+    :param prefetch: request the next page in a background thread while the current one is consumed.
+    :return: iterator over pages of rows within the range.
+    """
+    if cursor.done:
+        return
+    if not prefetch:
+        while not cursor.done:
+            rows = cursor.consume(fetch(cursor.before_id))
+            if rows:
+                yield rows
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-prefetch')
+    try:
+        future = executor.submit(fetch, cursor.before_id)
+        while future is not None:
+            rows = cursor.consume(future.result())
+            future = None if cursor.done else executor.submit(fetch, cursor.before_id)
+            if rows:
+                yield rows
+    finally:
+        # a consumer stopping early leaves at most one prefetched page behind
+        executor.shutdown(wait=False)
+
+
+async def aiter_pages(fetch: Callable[[Optional[int]], Awaitable[List[dict]]], cursor: PageCursor,
+                      prefetch: bool = True) -> AsyncIterator[List[dict]]:
+    """
+    Asyncio counterpart of iter_pages, the next page is requested as a task on the running loop.
+
+    :param fetch: coroutine function returning the page before the given id, newest first.
+    :param cursor: PageCursor holding the range, advanced while iterating.
+    :param prefetch: request the next page while the current one is consumed.
+    :return: async iterator over pages of rows within the range.
+    """
+    task = None
+    try:
+        while not cursor.done:
+            page = await (task if task is not None else fetch(cursor.before_id))
+            task = None
+            rows = cursor.consume(page)
+            if prefetch and not cursor.done:
+                task = asyncio.ensure_future(fetch(cursor.before_id))
+            if rows:
+                yield rows
+    finally:
+        if task is not None:
+            task.cancel()
@@ -1,4 +1,13 @@
-from typing import Union, List, Optional
+from typing import Any, Callable, Iterator, Union, List, Optional
+from tradehub.candlesticks import DEFAULT_CANDLES_PER_WINDOW, DEFAULT_WORKERS, fetch_candlesticks
+from tradehub.follow import FileCheckpoint, Follower
+from tradehub.hedging import HedgePolicy
+from tradehub.node_pool import NodePool, NodePoolRequest
+from tradehub.pagination import MAX_PAGE_SIZE, PageCursor, iter_pages
+from tradehub.records import Candle, Order, Trade
+from tradescan.cache import ResponseCache
+from tradescan.metrics import RequestEvent
+from tradescan.ratelimit import AIMDController, RateLimiter
 from tradescan.utils import Request
 
 
@@ -8,7 +17,12 @@ class PublicClient(object):
     available with validators, tokens, delegators, addresses, and blockchain stats.
     """
 
-    def __init__(self, node_ip: Union[None, str], node_port: Union[None, int] = 5001, uri: Union[None, str] = None):
+    def __init__(self, node_ip: Union[None, str] = None, node_port: Union[None, int] = 5001, uri: Union[None, str] = None,
+                 cache: Optional[ResponseCache] = None, coalesce: bool = False, node_pool: Optional[NodePool] = None,
+                 hedge: Optional[HedgePolicy] = None, decoder: Optional[Callable[[bytes], Any]] = None,
+                 raw: bool = False, rate_limiter: Optional[RateLimiter] = None,
+                 concurrency: Optional[AIMDController] = None,
+                 hooks: Optional[List[Callable[[RequestEvent], None]]] = None, records: bool = False):
         """
         Create a public client using IP:Port or URI format.
 
@@ -19,18 +33,79 @@ class PublicClient(object):
 
             public_client = PublicClient(uri="https://tradehub-api-server.network/")
 
+            # cache slow changing endpoints like get_tokens or get_markets in process
+
+            public_client = PublicClient(uri="https://tradehub-api-server.network/", cache=ResponseCache())
+
+            # or spread requests over a pool of nodes, routed to the fastest healthy one
+
+            public_client = PublicClient(node_pool=NodePool.from_ips(["54.255.5.46", "168.119.70.59"]))
+
+            # hedge latency critical reads like get_orderbook on a second node of the pool
+
+            public_client = PublicClient(node_pool=NodePool.from_ips(["54.255.5.46", "168.119.70.59"]),
+                                         hedge=HedgePolicy(percentile=95))
+
+            # return undecoded response bytes, eg. to archive them straight to disk
+
+            public_client = PublicClient(uri="https://tradehub-api-server.network/", raw=True)
+
+            # pace requests and adapt the number of requests in flight to the node
+
+            public_client = PublicClient(uri="https://tradehub-api-server.network/",
+                                         rate_limiter=RateLimiter(node_rate=20, endpoint_rates={'/get_trades': 5}),
+                                         concurrency=AIMDController(latency_target=0.5))
+
+            # collect latency, size, decode time and status metrics per path and node
+
+            metrics = MetricsRegistry()
+            public_client = PublicClient(uri="https://tradehub-api-server.network/", hooks=[metrics])
+
+            # return trades, orders and candles as compact records with parsed numbers instead of dicts
+
+            public_client = PublicClient(uri="https://tradehub-api-server.network/", records=True)
+
         :param node_ip: ip address off a tradehub node.
         :param node_port: prt off a tradehub node, default 5001.
         :param uri: URI address off tradehub node.
+        :param cache: optional response cache, only paths with a configured TTL are cached.
+        :param coalesce: share one round-trip between concurrent identical requests, default False.
+        :param node_pool: route requests over a pool of nodes instead of a single IP or URI.
+        :param hedge: send backup requests for slow get_orderbook, get_prices and get_order calls, needs a node pool.
+        :param decoder: callable decoding response bytes, default orjson.loads if installed else json.loads.
+        :param raw: return the undecoded response body as bytes instead of decoded JSON, default False.
+        :param rate_limiter: token bucket limits per node and endpoint.
+        :param concurrency: AIMD controller for the number of requests in flight.
+        :param hooks: callables receiving a RequestEvent for every request attempt, eg. a MetricsRegistry.
+        :param records: return Trade, Order and Candle records from get_trades, get_orders and get_candlesticks.
         """
         if node_ip and uri:
             raise ValueError("Use IP [+Port] or URI, not both!")
 
+        if node_pool is not None and (node_ip or uri):
+            raise ValueError("Use IP [+Port], URI or a node pool, not several!")
+
         if node_ip and not node_port:
             raise ValueError("Port has to be set if an IP address is provided!")
 
-        self.api_url: str = uri or f"http://{node_ip}:{node_port}"
-        self.request: Request = Request(api_url=self.api_url, timeout=30)
+        if hedge is not None and node_pool is None:
+            raise ValueError("Hedged requests need a node pool!")
+
+        if records and raw:
+            raise ValueError("Records are built from decoded responses, use either records or raw!")
+
+        self.records: bool = records
+
+        if node_pool is not None:
+            self.request: Request = NodePoolRequest(pool=node_pool, cache=cache, coalesce=coalesce, hedge=hedge,
+                                                    decoder=decoder, raw=raw, rate_limiter=rate_limiter,
+                                                    concurrency=concurrency, hooks=hooks)
+            self.api_url: str = self.request.url
+        else:
+            self.api_url: str = uri or f"http://{node_ip}:{node_port}"
+            self.request: Request = Request(api_url=self.api_url, timeout=30, cache=cache, coalesce=coalesce,
+                                            decoder=decoder, raw=raw, rate_limiter=rate_limiter,
+                                            concurrency=concurrency, hooks=hooks)
 
     def get_account(self, swth_address: str) -> dict:
         """
@@ -382,7 +457,41 @@ class PublicClient(object):
             "from": from_epoch,
             "to": to_epoch
         }
-        return self.request.get(path='/candlesticks', params=api_params)
+        candles = self.request.get(path='/candlesticks', params=api_params)
+        return self._then(candles, Candle.from_list) if self.records else candles
+
+    def get_candlesticks_range(self, market: str, granularity: int, from_epoch: int, to_epoch: int,
+                               candles_per_window: int = DEFAULT_CANDLES_PER_WINDOW,
+                               workers: int = DEFAULT_WORKERS) -> List[dict]:
+        """
+        Get candlesticks for a market over a long time range. The range is split into windows of at most
+        'candles_per_window' candles which are requested concurrently, the result is one series ordered by time
+        without duplicate candles.
+
+        Example::
+
+            # January 2021 in 1 minute candles, 45 windows
+            public_client.get_candlesticks_range("swth_eth1", 1, 1609459200, 1612137600)
+            # 4 hour candles resampled from 1 hour candles
+            public_client.get_candlesticks_range("swth_eth1", 240, 1609459200, 1612137600)
+
+        The expected return result for this function is the same as for get_candlesticks. Granularities other
+        than 1, 5, 30, 60, 360 or 1440 are resampled locally from the largest of them dividing the granularity,
+        their ids count the candle periods since the epoch. Resampled candles are only returned for periods
+        which end within the range, so the last one is never built from an incomplete period.
+
+        :raises ValueError: If 'granularity' is not a positive number of minutes.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param granularity: Candlestick period in minutes, eg. 1, 5, 15, 30, 60, 240, 360 or 1440.
+        :param from_epoch: Start of time range for data in epoch seconds.
+        :param to_epoch: End of time range for data in epoch seconds.
+        :param candles_per_window: Maximum number of candles requested at once, default 500.
+        :param workers: Number of windows requested concurrently, default 8.
+        :return: List with candles as dict.
+        """
+        return fetch_candlesticks(self, market, granularity, from_epoch, to_epoch,
+                                  candles_per_window=candles_per_window, workers=workers)
 
     def get_delegation_rewards(self, swth_address: str) -> dict:
         """
@@ -918,7 +1027,8 @@ class PublicClient(object):
             "order_status": order_status,
             "limit": limit
         }
-        return self.request.get(path='/get_orders', params=api_params)
+        orders = self.request.get(path='/get_orders', params=api_params)
+        return self._then(orders, Order.from_list) if self.records else orders
 
     def get_position(self, swth_address: str, market: str):
         """
@@ -1435,7 +1545,8 @@ class PublicClient(object):
             "limit": limit,
             "account": swth_address
         }
-        return self.request.get(path='/get_trades', params=api_params)
+        trades = self.request.get(path='/get_trades', params=api_params)
+        return self._then(trades, Trade.from_list) if self.records else trades
 
     def get_username_check(self, username: str) -> bool:
         """
@@ -1459,3 +1570,114 @@ class PublicClient(object):
             "username": username
         }
         return self.request.get(path='/username_check', params=api_params)
+
+    def iter_trades(self, market: Optional[str] = None, swth_address: Optional[str] = None,
+                    before_id: Optional[int] = None, after_id: Optional[int] = None, start_time=None, end_time=None,
+                    page_size: int = MAX_PAGE_SIZE, prefetch: bool = True) -> Iterator[dict]:
+        """
+        Lazily iterate over all trades in an id or time range, newest first. Pages are requested with
+        'before_id' and the next page is prefetched while the current one is consumed.
+
+        Example::
+
+            for trade in public_client.iter_trades(market="swth_eth1", start_time="2021-01-10T00:00:00Z"):
+                print(trade["id"], trade["price"])
+
+        Time bounds are checked per trade, so old time ranges are reached faster if combined with 'before_id'.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param swth_address: tradehub switcheo address starting with 'swth1' on mainnet and 'tswth1' on testnet.
+        :param before_id: get trades before id(exclusive), default start at the newest trade.
+        :param after_id: get trades after id(exclusive).
+        :param start_time: get trades created at or after this time, epoch seconds, datetime or ISO 8601 str.
+        :param end_time: get trades created before this time, epoch seconds, datetime or ISO 8601 str.
+        :param page_size: trades requested per round-trip, at most 200.
+        :param prefetch: request the next page in the background, default True.
+        :return: Iterator over trades as dict
+        """
+        cursor = PageCursor(before_id=before_id, after_id=after_id, start_time=start_time, end_time=end_time,
+                            page_size=page_size)
+
+        def fetch(cursor_id):
+            return self._decoded(self.get_trades(market=market, before_id=cursor_id, after_id=after_id,
+                                                 limit=page_size, swth_address=swth_address))
+
+        for page in iter_pages(fetch, cursor, prefetch=prefetch):
+            yield from page
+
+    def follow_trades(self, market: Optional[str] = None, swth_address: Optional[str] = None,
+                      after_id: Optional[int] = None, checkpoint: Union[None, str, FileCheckpoint] = None,
+                      min_interval: Optional[float] = None, max_interval: float = 30.0,
+                      page_size: int = MAX_PAGE_SIZE) -> Follower:
+        """
+        Follow new trades as they appear, oldest first. The polling interval adapts to the arrival rate of trades
+        and is never shorter than the block time.
+
+        Example::
+
+            # resume from the last trade handed out before a restart
+            for trade in public_client.follow_trades(market="swth_eth1", checkpoint="swth_eth1.checkpoint"):
+                print(trade["id"], trade["price"])
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param swth_address: tradehub switcheo address starting with 'swth1' on mainnet and 'tswth1' on testnet.
+        :param after_id: yield trades after this id(exclusive), default the checkpoint or only new trades.
+        :param checkpoint: path of a file or FileCheckpoint storing the id of the last trade handed out.
+        :param min_interval: lower bound of the polling interval in seconds, default the block time.
+        :param max_interval: upper bound of the polling interval in seconds, default 30.
+        :param page_size: trades requested per round-trip, at most 200.
+        :return: Follower iterating over trades as dict, call stop() to end it.
+        """
+        def fetch(before_id, after_id, limit):
+            return self._decoded(self.get_trades(market=market, before_id=before_id, after_id=after_id, limit=limit,
+                                                 swth_address=swth_address))
+
+        return Follower(fetch, block_time=lambda: self._decoded(self.get_block_time()), after_id=after_id,
+                        checkpoint=checkpoint, min_interval=min_interval, max_interval=max_interval,
+                        page_size=page_size)
+
+    def follow_orders(self, swth_address: Optional[str] = None, market: Optional[str] = None,
+                      order_type: Optional[str] = None, initiator: Optional[str] = None,
+                      after_id: Optional[int] = None, checkpoint: Union[None, str, FileCheckpoint] = None,
+                      min_interval: Optional[float] = None, max_interval: float = 30.0,
+                      page_size: int = MAX_PAGE_SIZE) -> Follower:
+        """
+        Follow newly created orders, oldest first, see follow_trades. Later status changes of an order that was
+        already handed out are not reported again.
+
+        Example::
+
+            for order in public_client.follow_orders(market="swth_eth1", initiator="user"):
+                print(order["id"], order["side"], order["price"])
+
+        :param swth_address: tradehub switcheo address starting with 'swth1' on mainnet and 'tswth1' on testnet.
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param order_type: Return specific orders, allowed values: 'limit', 'market', 'stop-market' or 'stop-limit'.
+        :param initiator: Filter by user or automated market maker orders, allowed values: 'user' or 'amm'.
+        :param after_id: yield orders after this id(exclusive), default the checkpoint or only new orders.
+        :param checkpoint: path of a file or FileCheckpoint storing the id of the last order handed out.
+        :param min_interval: lower bound of the polling interval in seconds, default the block time.
+        :param max_interval: upper bound of the polling interval in seconds, default 30.
+        :param page_size: orders requested per round-trip, at most 200.
+        :return: Follower iterating over orders as dict, call stop() to end it.
+        """
+        def fetch(before_id, after_id, limit):
+            return self._decoded(self.get_orders(swth_address=swth_address, before_id=before_id, after_id=after_id,
+                                                 market=market, order_type=order_type, initiator=initiator,
+                                                 limit=limit))
+
+        return Follower(fetch, block_time=lambda: self._decoded(self.get_block_time()), after_id=after_id,
+                        checkpoint=checkpoint, min_interval=min_interval, max_interval=max_interval,
+                        page_size=page_size)
+
+    def _then(self, response, callback: Callable[[Any], Any]):
+        """
+        Apply callback to a response, the async client applies it once the response is awaited.
+        """
+        return callback(response)
+
+    def _decoded(self, response):
+        """
+        Decode the response of raw clients, helpers like pagination need the rows.
+        """
+        return self.request.decoder(response) if isinstance(response, (bytes, bytearray)) else response
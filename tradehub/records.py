@@ -0,0 +1,183 @@
+"""
+Description:
+    Compact record types for trades, orders and candles. Every record uses __slots__, numbers are parsed once
+    when the record is built and low cardinality strings like markets, sides and denoms are interned, so
+    large histories take a fraction of the memory of the decoded JSON dicts.
+    Records support item access like the dicts they replace, eg. trade["price"], so helpers written for dicts
+    keep working.
+Usage:
+    public_client = PublicClient(uri="https://tradehub-api-server.network/", records=True)
+    trades = public_client.get_trades(market="swth_eth1")
+    print(trades[0].price * trades[0].quantity)
+
+    # or convert decoded responses yourself
+    trades = Trade.from_list(public_client.get_trades())
+"""
+
+from sys import intern
+from typing import Callable, Iterable, List, Optional
+
+from tradehub.utils import parse_timestamp
+
+
+def _number(value, number: Callable[[str], float]) -> Optional[float]:
+    if value is None or value == '':
+        return None
+    return number(value)
+
+
+def _int(value) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def _intern(value) -> Optional[str]:
+    return intern(value) if isinstance(value, str) else value
+
+
+class _Record(object):
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def keys(self) -> tuple:
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        """
+        Plain dict with the parsed values.
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and all(getattr(self, field) == getattr(other, field)
+                                                 for field in self.__slots__)
+
+    # records compare by value but their fields can be reassigned, so they are not hashable
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, market={self.market!r})"
+
+    @classmethod
+    def from_list(cls, rows: Iterable[dict], number: Callable[[str], float] = float) -> list:
+        """
+        Convert decoded response rows.
+
+        :param rows: dicts as returned by the API.
+        :param number: parser for decimal strings, default float, eg. decimal.Decimal for exact values.
+        :return: list of records
+        """
+        from_dict = cls.from_dict
+        return [from_dict(row, number) for row in rows]
+
+
+class Trade(_Record):
+    """
+    Trade as returned by get_trades. Ids and heights are int, amounts parsed by 'number' (float by default)
+    and 'block_created_at' is epoch seconds.
+    """
+
+    __slots__ = ('id', 'block_created_at', 'block_height', 'market', 'price', 'quantity',
+                 'taker_id', 'taker_address', 'taker_fee_amount', 'taker_fee_denom', 'taker_side', 'taker_username',
+                 'maker_id', 'maker_address', 'maker_fee_amount', 'maker_fee_denom', 'maker_side', 'maker_username',
+                 'liquidation')
+
+    @classmethod
+    def from_dict(cls, data: dict, number: Callable[[str], float] = float) -> 'Trade':
+        trade = cls.__new__(cls)
+        trade.id = int(data["id"])
+        trade.block_created_at = parse_timestamp(data["block_created_at"])
+        trade.block_height = _int(data.get("block_height"))
+        trade.market = _intern(data.get("market"))
+        trade.price = _number(data.get("price"), number)
+        trade.quantity = _number(data.get("quantity"), number)
+        trade.taker_id = data.get("taker_id")
+        trade.taker_address = data.get("taker_address")
+        trade.taker_fee_amount = _number(data.get("taker_fee_amount"), number)
+        trade.taker_fee_denom = _intern(data.get("taker_fee_denom"))
+        trade.taker_side = _intern(data.get("taker_side"))
+        trade.taker_username = data.get("taker_username")
+        trade.maker_id = data.get("maker_id")
+        trade.maker_address = data.get("maker_address")
+        trade.maker_fee_amount = _number(data.get("maker_fee_amount"), number)
+        trade.maker_fee_denom = _intern(data.get("maker_fee_denom"))
+        trade.maker_side = _intern(data.get("maker_side"))
+        trade.maker_username = data.get("maker_username")
+        trade.liquidation = _intern(data.get("liquidation"))
+        return trade
+
+
+class Order(_Record):
+    """
+    Order as returned by get_orders. Ids and heights are int, amounts parsed by 'number' (float by default)
+    and 'block_created_at' is epoch seconds.
+    """
+
+    __slots__ = ('id', 'order_id', 'block_created_at', 'block_height', 'triggered_block_height', 'address',
+                 'username', 'market', 'side', 'price', 'quantity', 'available', 'filled', 'order_status',
+                 'order_type', 'initiator', 'time_in_force', 'stop_price', 'trigger_type', 'allocated_margin_denom',
+                 'allocated_margin_amount', 'is_liquidation', 'is_post_only', 'is_reduce_only', 'type')
+
+    @classmethod
+    def from_dict(cls, data: dict, number: Callable[[str], float] = float) -> 'Order':
+        order = cls.__new__(cls)
+        order.id = int(data["id"])
+        order.order_id = data.get("order_id")
+        order.block_created_at = parse_timestamp(data["block_created_at"])
+        order.block_height = _int(data.get("block_height"))
+        order.triggered_block_height = _int(data.get("triggered_block_height"))
+        order.address = data.get("address")
+        order.username = data.get("username")
+        order.market = _intern(data.get("market"))
+        order.side = _intern(data.get("side"))
+        order.price = _number(data.get("price"), number)
+        order.quantity = _number(data.get("quantity"), number)
+        order.available = _number(data.get("available"), number)
+        order.filled = _number(data.get("filled"), number)
+        order.order_status = _intern(data.get("order_status"))
+        order.order_type = _intern(data.get("order_type"))
+        order.initiator = _intern(data.get("initiator"))
+        order.time_in_force = _intern(data.get("time_in_force"))
+        order.stop_price = _number(data.get("stop_price"), number)
+        order.trigger_type = _intern(data.get("trigger_type"))
+        order.allocated_margin_denom = _intern(data.get("allocated_margin_denom"))
+        order.allocated_margin_amount = _number(data.get("allocated_margin_amount"), number)
+        order.is_liquidation = data.get("is_liquidation")
+        order.is_post_only = data.get("is_post_only")
+        order.is_reduce_only = data.get("is_reduce_only")
+        order.type = _intern(data.get("type"))
+        return order
+
+
+class Candle(_Record):
+    """
+    Candle as returned by get_candlesticks. 'time' is epoch seconds, 'resolution' minutes and prices and
+    volumes parsed by 'number' (float by default).
+    """
+
+    __slots__ = ('id', 'market', 'time', 'resolution', 'open', 'high', 'low', 'close', 'volume', 'quote_volume')
+
+    @classmethod
+    def from_dict(cls, data: dict, number: Callable[[str], float] = float) -> 'Candle':
+        candle = cls.__new__(cls)
+        candle.id = int(data["id"])
+        candle.market = _intern(data.get("market"))
+        candle.time = parse_timestamp(data["time"])
+        candle.resolution = _int(data.get("resolution"))
+        candle.open = _number(data.get("open"), number)
+        candle.high = _number(data.get("high"), number)
+        candle.low = _number(data.get("low"), number)
+        candle.close = _number(data.get("close"), number)
+        candle.volume = _number(data.get("volume"), number)
+        candle.quote_volume = _number(data.get("quote_volume"), number)
+        return candle
@@ -0,0 +1,229 @@
+"""
+Description:
+    Candles of any resolution built locally. resample_candles merges candles of a finer resolution, for
+    example 1 minute candles to 15 minute or 4 hour candles, resample_records does the same vectorized on
+    candle file records and CandleAggregator builds candles from a stream of trades in constant time per trade.
+    Periods are aligned to multiples of the period since the epoch (plus an optional offset), like the
+    candles served by get_candlesticks, and periods without candles or trades are left out.
+Usage:
+    from tradehub.resample import CandleAggregator, resample_candles
+
+    candles = resample_candles(public_client.get_candlesticks_range("swth_eth1", 1, 1609459200, 1612137600), 15)
+
+    aggregator = CandleAggregator(240, on_close=print)
+    for trade in public_client.follow_trades(market="swth_eth1"):
+        aggregator.add(trade)
+"""
+
+import time
+
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tradehub.utils import parse_timestamp
+
+
+def _period(resolution: int) -> int:
+    if resolution < 1:
+        raise ValueError(f"Resolution has to be a positive number of minutes, got {resolution} instead!")
+    return int(resolution) * 60
+
+
+def _amount(value, number: Callable[[str], Decimal]):
+    return number(value) if isinstance(value, str) else value
+
+
+def bucket_start(epoch: float, resolution: int, offset: int = 0) -> int:
+    """
+    Start of the candle period containing a time.
+
+    :param epoch: time in epoch seconds.
+    :param resolution: candle period in minutes.
+    :param offset: shift of the period boundaries in seconds.
+    :return: epoch seconds
+    """
+    epoch = int(epoch // 1)
+    return epoch - (epoch - offset) % _period(resolution)
+
+
+def _plain(value) -> str:
+    # amounts are plain decimal strings like in the API, never exponent notation like '2.1E-7'
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    return format(value.normalize(), 'f') if isinstance(value, Decimal) else str(value)
+
+
+def _candle(market: Optional[str], resolution: int, start: int, values: list) -> dict:
+    return {"id": start // _period(resolution), "market": market,
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(start)), "resolution": resolution,
+            "open": _plain(values[0]), "close": _plain(values[3]), "high": _plain(values[1]),
+            "low": _plain(values[2]), "volume": _plain(values[4]), "quote_volume": _plain(values[5])}
+
+
+def resample_candles(candles: Iterable, resolution: int, offset: int = 0,
+                     number: Callable[[str], Decimal] = Decimal) -> List[dict]:
+    """
+    Merge candles into candles of a coarser resolution.
+
+    Example::
+
+        # 4 hour candles, which get_candlesticks does not serve
+        resample_candles(public_client.get_candlesticks_range("swth_eth1", 60, 1609459200, 1612137600), 240)
+
+    :raises ValueError: If 'resolution' is not a multiple of the resolution of the candles.
+
+    :param candles: candles as returned by get_candlesticks, dict or Candle records.
+    :param resolution: candle period in minutes.
+    :param offset: shift of the period boundaries in seconds.
+    :param number: parser of amount strings, Decimal keeps the sums exact.
+    :return: List with candles as dict in the format of get_candlesticks, ids count the periods since the epoch.
+    """
+    period = _period(resolution)
+    result = []
+    market, start, values = None, None, None
+    for epoch, candle in sorted(((parse_timestamp(candle["time"]), candle) for candle in candles),
+                                key=lambda item: item[0]):
+        source = candle.get("resolution")
+        if source and period % (int(source) * 60):
+            raise ValueError(f"Resolution {resolution} is not a multiple of the candle resolution {source}!")
+        candle_start = bucket_start(epoch, resolution, offset)
+        high, low = _amount(candle["high"], number), _amount(candle["low"], number)
+        if candle_start != start:
+            if values is not None:
+                result.append(_candle(market, resolution, start, values))
+            market, start = candle.get("market"), candle_start
+            values = [_amount(candle["open"], number), high, low, _amount(candle["close"], number),
+                      _amount(candle["volume"], number), _amount(candle["quote_volume"], number)]
+            continue
+        if high > values[1]:
+            values[1] = high
+        if low < values[2]:
+            values[2] = low
+        values[3] = _amount(candle["close"], number)
+        values[4] += _amount(candle["volume"], number)
+        values[5] += _amount(candle["quote_volume"], number)
+    if values is not None:
+        result.append(_candle(market, resolution, start, values))
+    return result
+
+
+def resample_records(records, resolution: int, offset: int = 0):
+    """
+    Merge candle records ordered by time, like the records of a CandleFile, into records of a coarser
+    resolution with NumPy reductions.
+
+    :param records: NumPy structured array with 'time', 'open', 'high', 'low', 'close', 'volume' and
+        'quote_volume' fields.
+    :param resolution: candle period in minutes.
+    :param offset: shift of the period boundaries in seconds.
+    :return: new NumPy structured array with the dtype of 'records'
+    """
+    times = records['time']
+    starts = times - (times - offset) % _period(resolution)
+    if not len(records):
+        return np.empty(0, dtype=records.dtype)
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] != starts[:-1])))
+    last = np.append(first[1:], len(records)) - 1
+    result = np.empty(len(first), dtype=records.dtype)
+    result['time'] = starts[first]
+    result['open'] = records['open'][first]
+    result['close'] = records['close'][last]
+    result['high'] = np.maximum.reduceat(records['high'], first)
+    result['low'] = np.minimum.reduceat(records['low'], first)
+    result['volume'] = np.add.reduceat(records['volume'], first)
+    result['quote_volume'] = np.add.reduceat(records['quote_volume'], first)
+    return result
+
+
+class CandleAggregator(object):
+    """
+    Candles of one resolution built from trades in the order they happened, for example as yielded by
+    follow_trades. Every market keeps one open candle, which is closed by the first trade of a later period
+    or by 'flush'.
+    """
+
+    def __init__(self, resolution: int, offset: int = 0, number: Callable[[str], Decimal] = Decimal,
+                 on_close: Optional[Callable[[dict], None]] = None):
+        """
+        :param resolution: candle period in minutes, any positive number.
+        :param offset: shift of the period boundaries in seconds.
+        :param number: parser of amount strings, Decimal keeps volumes exact.
+        :param on_close: called with every closed candle.
+        """
+        self.resolution = resolution
+        self.offset = offset
+        self.number = number
+        self.on_close = on_close
+        self._period = _period(resolution)
+        # market -> [start, open, high, low, close, volume, quote_volume]
+        self._candles: Dict[Optional[str], list] = {}
+
+    def add(self, trade) -> Optional[dict]:
+        """
+        Add a trade to the candle of its market and period.
+
+        :raises ValueError: If the trade is older than the open candle of its market.
+
+        :param trade: trade as returned by get_trades, dict or Trade record.
+        :return: the candle closed by this trade or None
+        """
+        epoch = int(parse_timestamp(trade["block_created_at"]) // 1)
+        start = epoch - (epoch - self.offset) % self._period
+        market = trade.get("market")
+        price, quantity = _amount(trade["price"], self.number), _amount(trade["quantity"], self.number)
+        candle = self._candles.get(market)
+        if candle is not None and start == candle[0]:
+            if price > candle[2]:
+                candle[2] = price
+            elif price < candle[3]:
+                candle[3] = price
+            candle[4] = price
+            candle[5] += quantity
+            candle[6] += price * quantity
+            return None
+        if candle is not None and start < candle[0]:
+            raise ValueError(f"Trade {trade['id']} is older than the open {market} candle, add trades oldest first!")
+        self._candles[market] = [start, price, price, price, price, quantity, price * quantity]
+        return self._close(market, candle) if candle is not None else None
+
+    def add_all(self, trades: Sequence) -> List[dict]:
+        """
+        Add trades ordered oldest first.
+
+        :return: List with the closed candles.
+        """
+        closed = (self.add(trade) for trade in trades)
+        return [candle for candle in closed if candle is not None]
+
+    def _close(self, market: Optional[str], candle: list) -> dict:
+        result = _candle(market, self.resolution, candle[0], candle[1:])
+        if self.on_close is not None:
+            self.on_close(result)
+        return result
+
+    def current(self, market: Optional[str] = None) -> Optional[dict]:
+        """
+        Open candle of a market, None if the market had no trade yet.
+        """
+        candle = self._candles.get(market)
+        return _candle(market, self.resolution, candle[0], candle[1:]) if candle is not None else None
+
+    def flush(self, until: Optional[float] = None) -> List[dict]:
+        """
+        Close the open candles whose period has ended.
+
+        :param until: time in epoch seconds, datetime or ISO 8601 str, default closes every open candle.
+        :return: List with the closed candles.
+        """
+        end = parse_timestamp(until) if until is not None else None
+        closed = []
+        for market, candle in list(self._candles.items()):
+            if end is None or candle[0] + self._period <= end:
+                del self._candles[market]
+                closed.append(self._close(market, candle))
+        return closed
@@ -0,0 +1,294 @@
+"""
+Description:
+    Local SQLite store of trades and orders. The store syncs get_trades and get_orders incrementally by id, so
+    only rows newer than the last sync are requested, and answers queries by market, address, block height
+    and time from indexes without any network call.
+    Every row is kept exactly as returned by the API, the indexed columns are extracted next to it.
+Usage:
+    from tradehub.store import TradeStore
+
+    with TradeStore("tradehub.sqlite", client=public_client) as store:
+        store.sync_trades(market="swth_eth1")
+        trades = store.trades(market="swth_eth1", start_time="2021-01-10T00:00:00Z")
+"""
+
+import json
+import sqlite3
+import threading
+
+from typing import Any, Callable, List, Optional
+
+from tradehub.pagination import MAX_PAGE_SIZE, PageCursor, iter_pages
+from tradehub.utils import parse_timestamp
+from tradescan.utils import DEFAULT_DECODER
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    block_height INTEGER,
+    time REAL,
+    market TEXT,
+    taker_address TEXT,
+    maker_address TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trades_market ON trades (market, id);
+CREATE INDEX IF NOT EXISTS trades_taker_address ON trades (taker_address, id);
+CREATE INDEX IF NOT EXISTS trades_maker_address ON trades (maker_address, id);
+CREATE INDEX IF NOT EXISTS trades_block_height ON trades (block_height);
+CREATE INDEX IF NOT EXISTS trades_time ON trades (time);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    order_id TEXT,
+    block_height INTEGER,
+    time REAL,
+    market TEXT,
+    address TEXT,
+    order_status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_order_id ON orders (order_id);
+CREATE INDEX IF NOT EXISTS orders_market ON orders (market, id);
+CREATE INDEX IF NOT EXISTS orders_address ON orders (address, id);
+CREATE INDEX IF NOT EXISTS orders_block_height ON orders (block_height);
+CREATE INDEX IF NOT EXISTS orders_time ON orders (time);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    endpoint TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    last_id INTEGER NOT NULL,
+    PRIMARY KEY (endpoint, scope)
+);
+"""
+
+
+def _int(value) -> Optional[int]:
+    return int(value) if value not in (None, '') else None
+
+
+def _trade_row(trade: dict) -> tuple:
+    return (int(trade["id"]), _int(trade.get("block_height")), parse_timestamp(trade["block_created_at"]),
+            trade.get("market"), trade.get("taker_address"), trade.get("maker_address"),
+            json.dumps(trade, separators=(',', ':')))
+
+
+def _order_row(order: dict) -> tuple:
+    return (int(order["id"]), order.get("order_id"), _int(order.get("block_height")),
+            parse_timestamp(order["block_created_at"]), order.get("market"), order.get("address"),
+            order.get("order_status"), json.dumps(order, separators=(',', ':')))
+
+
+class TradeStore(object):
+    """
+    Trades and orders of a tradehub node in a SQLite database.
+
+    A sync walks from the newest row down to the last id stored for the same filters, pages are written as they
+    arrive and the last id is stored once the walk is complete, so an interrupted sync is repeated from the
+    previous last id and rows are replaced idempotently. Orders are synced by id as well, changes of an order
+    after it was stored, eg. its status, are picked up by syncing again from an older id with 'after_id'.
+    Thread safe, all calls share one connection.
+    """
+
+    def __init__(self, path: str, client=None, page_size: int = MAX_PAGE_SIZE,
+                 decoder: Callable[[str], Any] = DEFAULT_DECODER):
+        """
+        :param path: database file, created if missing, or ':memory:'.
+        :param client: PublicClient used by the sync calls, queries work without.
+        :param page_size: rows requested per round-trip, at most 200.
+        :param decoder: callable decoding stored rows, default orjson.loads if installed else json.loads.
+        """
+        if client is not None and getattr(client, 'records', False):
+            raise ValueError("The store needs a client returning dicts, disable records!")
+        self.path = path
+        self.client = client
+        self.page_size = page_size
+        self.decoder = decoder
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> 'TradeStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def last_id(self, endpoint: str, **filters) -> Optional[int]:
+        """
+        Id of the newest row synced from an endpoint with the given filters.
+
+        :param endpoint: 'get_trades' or 'get_orders'.
+        :param filters: filters of the sync call, eg. market="swth_eth1".
+        :return: int or None before the first sync
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT last_id FROM sync_state WHERE endpoint = ? AND scope = ?",
+                                           (endpoint, self._scope(filters))).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _scope(filters: dict) -> str:
+        return json.dumps({key: value for key, value in filters.items() if value is not None}, sort_keys=True)
+
+    def _sync(self, endpoint: str, table: str, to_row: Callable[[dict], tuple], fetch: Callable[..., Any],
+              filters: dict, after_id: Optional[int]) -> int:
+        if self.client is None:
+            raise ValueError("Syncing needs a client!")
+        last_id = self.last_id(endpoint, **filters)
+        if after_id is None:
+            after_id = last_id
+
+        def fetch_page(before_id):
+            return self.client._decoded(fetch(before_id=before_id, after_id=after_id, limit=self.page_size,
+                                              **filters))
+
+        rows = 0
+        newest = last_id
+        statement = None
+        for page in iter_pages(fetch_page, PageCursor(after_id=after_id, page_size=self.page_size)):
+            values = [to_row(row) for row in page]
+            if not values:
+                continue
+            statement = statement or f"INSERT OR REPLACE INTO {table} VALUES ({', '.join('?' * len(values[0]))})"
+            with self._lock, self._connection:
+                self._connection.executemany(statement, values)
+            rows += len(values)
+            newest = max(newest or 0, max(value[0] for value in values))
+        if newest is not None and newest != last_id:
+            with self._lock, self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                                         (endpoint, self._scope(filters), newest))
+        return rows
+
+    def sync_trades(self, market: Optional[str] = None, swth_address: Optional[str] = None,
+                    after_id: Optional[int] = None) -> int:
+        """
+        Store all trades newer than the last sync with the same filters, the first sync stores the full history.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param swth_address: tradehub switcheo address starting with 'swth1' on mainnet and 'tswth1' on testnet.
+        :param after_id: sync trades after this id(exclusive) instead of the last synced id.
+        :return: number of stored trades
+        """
+        return self._sync('get_trades', 'trades', _trade_row, self.client.get_trades if self.client else None,
+                          {"market": market, "swth_address": swth_address}, after_id)
+
+    def sync_orders(self, swth_address: Optional[str] = None, market: Optional[str] = None,
+                    after_id: Optional[int] = None) -> int:
+        """
+        Store all orders newer than the last sync with the same filters, the first sync stores the full history.
+
+        :param swth_address: tradehub switcheo address starting with 'swth1' on mainnet and 'tswth1' on testnet.
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param after_id: sync orders after this id(exclusive), eg. 0 to refresh the status of stored orders.
+        :return: number of stored orders
+        """
+        return self._sync('get_orders', 'orders', _order_row, self.client.get_orders if self.client else None,
+                          {"swth_address": swth_address, "market": market}, after_id)
+
+    def _select(self, table: str, conditions: List[str], params: list, order_by: str,
+                limit: Optional[int]) -> List[dict]:
+        if order_by not in ('asc', 'desc'):
+            raise ValueError(f"order_by has to be 'asc' or 'desc', got {order_by}!")
+        query = f"SELECT data FROM {table}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY id {order_by.upper()}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params = params + [limit]
+        with self._lock:
+            data = self._connection.execute(query, params).fetchall()
+        decoder = self.decoder
+        return [decoder(row[0]) for row in data]
+
+    @staticmethod
+    def _ranges(conditions: List[str], params: list, start_time, end_time, from_height: Optional[int],
+                to_height: Optional[int], after_id: Optional[int], before_id: Optional[int]) -> None:
+        for condition, value in (("time >= ?", start_time), ("time < ?", end_time),
+                                 ("block_height >= ?", from_height), ("block_height <= ?", to_height),
+                                 ("id > ?", after_id), ("id < ?", before_id)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(parse_timestamp(value) if condition.startswith("time") else int(value))
+
+    def trades(self, market: Optional[str] = None, address: Optional[str] = None, start_time=None,
+               end_time=None, from_height: Optional[int] = None, to_height: Optional[int] = None,
+               after_id: Optional[int] = None, before_id: Optional[int] = None, order_by: str = 'desc',
+               limit: Optional[int] = None) -> List[dict]:
+        """
+        Stored trades, newest first by default. No network call is made.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param address: taker or maker address.
+        :param start_time: trades created at or after this time, epoch seconds, datetime or ISO 8601 str.
+        :param end_time: trades created before this time, epoch seconds, datetime or ISO 8601 str.
+        :param from_height: trades at or after this block height.
+        :param to_height: trades at or before this block height.
+        :param after_id: trades after this id(exclusive).
+        :param before_id: trades before this id(exclusive).
+        :param order_by: 'desc' or 'asc' by id.
+        :param limit: maximum number of trades.
+        :return: List of trades as dict, as returned by get_trades
+        """
+        conditions, params = [], []
+        if market is not None:
+            conditions.append("market = ?")
+            params.append(market)
+        if address is not None:
+            conditions.append("(taker_address = ? OR maker_address = ?)")
+            params.extend((address, address))
+        self._ranges(conditions, params, start_time, end_time, from_height, to_height, after_id, before_id)
+        return self._select('trades', conditions, params, order_by, limit)
+
+    def orders(self, market: Optional[str] = None, address: Optional[str] = None,
+               order_status: Optional[str] = None, start_time=None, end_time=None,
+               from_height: Optional[int] = None, to_height: Optional[int] = None, after_id: Optional[int] = None,
+               before_id: Optional[int] = None, order_by: str = 'desc', limit: Optional[int] = None) -> List[dict]:
+        """
+        Stored orders, newest first by default. No network call is made.
+
+        :param market: Market ticker used by blockchain (eg. swth_eth1).
+        :param address: address of the order.
+        :param order_status: eg. 'open', 'filled' or 'cancelled', as of the sync of the order.
+        :param start_time: orders created at or after this time, epoch seconds, datetime or ISO 8601 str.
+        :param end_time: orders created before this time, epoch seconds, datetime or ISO 8601 str.
+        :param from_height: orders at or after this block height.
+        :param to_height: orders at or before this block height.
+        :param after_id: orders after this id(exclusive).
+        :param before_id: orders before this id(exclusive).
+        :param order_by: 'desc' or 'asc' by id.
+        :param limit: maximum number of orders.
+        :return: List of orders as dict, as returned by get_orders
+        """
+        conditions, params = [], []
+        for column, value in (("market", market), ("address", address), ("order_status", order_status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        self._ranges(conditions, params, start_time, end_time, from_height, to_height, after_id, before_id)
+        return self._select('orders', conditions, params, order_by, limit)
+
+    def order(self, order_id: str) -> Optional[dict]:
+        """
+        Stored order by its order id or None.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return self.decoder(row[0]) if row else None
+
+    def count(self, table: str = 'trades') -> int:
+        """
+        Number of stored rows of 'trades' or 'orders'.
+        """
+        if table not in ('trades', 'orders'):
+            raise ValueError(f"table has to be 'trades' or 'orders', got {table}!")
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
@@ -0,0 +1,495 @@
+"""
+Description:
+    Access to the tendermint RPC of a validator node on port 26657.
+    The RPC client sends JSON-RPC batches, so one round-trip fetches blocks, block results or validator sets
+    of many heights, and splits '/blockchain' header ranges into the 20 block chunks the node allows.
+    The websocket client subscribes to NewBlock and Tx events over the '/websocket' JSON-RPC endpoint and
+    delivers them to callbacks or an async iterator. Lost connections are reopened with exponential backoff
+    and every subscription is renewed.
+Usage:
+    from tradehub.tendermint import TendermintRPCClient, TendermintWebsocketClient
+
+    rpc = TendermintRPCClient.from_ip("54.255.5.46")
+    blocks = rpc.blocks(range(6000000, 6000500))
+    headers = rpc.blockchain_range(6000000, 6000500)
+
+    client = TendermintWebsocketClient.from_ip("54.255.5.46")
+    client.subscribe_new_blocks(lambda event: print(event["data"]["value"]["block"]["header"]["height"]))
+    client.run_forever()
+
+    # or as async iterator
+    async with TendermintWebsocketClient.from_ip("54.255.5.46") as client:
+        client.subscribe_txs("message.action='create_order'")
+        async for event in client:
+            print(event["query"], event["events"]["tx.hash"])
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tradescan.utils import DEFAULT_DECODER, get_session
+from tradescan.websocket import ConnectionClosed, WebSocket, WebSocketError, connect
+
+NEW_BLOCK_QUERY = "tm.event='NewBlock'"
+TX_QUERY = "tm.event='Tx'"
+
+# tendermint answers at most 20 block metas per '/blockchain' call
+BLOCKCHAIN_MAX_RANGE = 20
+DEFAULT_BATCH_SIZE = 100
+
+
+class TendermintRPCError(Exception):
+    """
+    Error object returned by a tendermint JSON-RPC call.
+    """
+
+    def __init__(self, error: dict):
+        super(TendermintRPCError, self).__init__(f"{error.get('message', '')} {error.get('data', '')}".strip())
+        self.code = error.get("code")
+        self.error = error
+
+
+class TendermintRPCClient(object):
+    """
+    JSON-RPC client for the tendermint RPC over HTTP.
+
+    Calls of a batch are split into round-trips of 'batch_size' calls, which are sent by up to 'workers'
+    threads over the shared keep-alive session. Results are returned in the order of the calls.
+    """
+
+    def __init__(self, uri: str, timeout: int = 30, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 4,
+                 session=None, decoder: Optional[Callable[[bytes], Any]] = None):
+        """
+        :param uri: URI of the RPC, eg. 'http://54.255.5.46:26657'.
+        :param timeout: request timeout in seconds.
+        :param batch_size: calls sent per round-trip.
+        :param workers: round-trips of one batch sent concurrently.
+        :param session: requests.Session to use instead of the shared one.
+        :param decoder: callable decoding response bytes, default orjson.loads if installed else json.loads.
+        """
+        self.uri = uri.rstrip('/')
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.workers = workers
+        self.http = session or get_session()
+        self.decoder = decoder or DEFAULT_DECODER
+        self.requests: int = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_ip(cls, node_ip: str, node_port: int = 26657, **kwargs) -> 'TendermintRPCClient':
+        """
+        Create a client for the RPC of a validator node.
+
+        :param node_ip: ip address off a tradehub node.
+        :param node_port: tendermint RPC port, default 26657.
+        :return: TendermintRPCClient
+        """
+        return cls(f"http://{node_ip}:{node_port}", **kwargs)
+
+    def _post(self, payload) -> Any:
+        with self._lock:
+            self.requests += 1
+        r = self.http.post(url=self.uri, data=json.dumps(payload), timeout=self.timeout,
+                           headers={'Content-Type': 'application/json'})
+        r.raise_for_status()
+        return self.decoder(r.content)
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def call(self, method: str, **params) -> Any:
+        """
+        Single JSON-RPC call, parameters with value None are dropped.
+
+        :raises TendermintRPCError: if the node answers with an error.
+        :return: result of the call
+        """
+        response = self._post({"jsonrpc": "2.0", "id": self._next_id(), "method": method,
+                               "params": {key: value for key, value in params.items() if value is not None}})
+        if response.get("error"):
+            raise TendermintRPCError(response["error"])
+        return response["result"]
+
+    def batch(self, calls: Iterable[Tuple[str, dict]], raise_errors: bool = True) -> List[Any]:
+        """
+        Send many calls as JSON-RPC batches.
+
+        :param calls: (method, params) tuples.
+        :param raise_errors: raise the first error, otherwise errors are returned as TendermintRPCError
+            in place of their result.
+        :raises TendermintRPCError: if a call failed and raise_errors is set.
+        :return: list of results in the order of the calls
+        """
+        payloads = [{"jsonrpc": "2.0", "id": self._next_id(), "method": method,
+                     "params": {key: value for key, value in params.items() if value is not None}}
+                    for method, params in calls]
+        chunks = [payloads[start:start + self.batch_size] for start in range(0, len(payloads), self.batch_size)]
+        if len(chunks) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)),
+                                    thread_name_prefix='tendermint-rpc') as executor:
+                responses = list(executor.map(self._post, chunks))
+        else:
+            responses = [self._post(chunk) for chunk in chunks]
+
+        # responses of a batch may come in any order
+        by_id = {}
+        for response in responses:
+            for item in response if isinstance(response, list) else [response]:
+                by_id[item.get("id")] = item
+        results = []
+        for payload in payloads:
+            item = by_id.get(payload["id"])
+            if item is None:
+                error = TendermintRPCError({"message": "missing response", "data": payload["method"]})
+            elif item.get("error"):
+                error = TendermintRPCError(item["error"])
+            else:
+                results.append(item["result"])
+                continue
+            if raise_errors:
+                raise error
+            results.append(error)
+        return results
+
+    def status(self) -> dict:
+        return self.call('status')
+
+    def net_info(self) -> dict:
+        return self.call('net_info')
+
+    def block(self, height: Optional[int] = None) -> dict:
+        """
+        Block at height, default the latest one.
+        """
+        return self.call('block', height=None if height is None else str(height))
+
+    def block_results(self, height: Optional[int] = None) -> dict:
+        """
+        Transaction results and events of the block at height, default the latest one.
+        """
+        return self.call('block_results', height=None if height is None else str(height))
+
+    def validators(self, height: Optional[int] = None, page: int = 1, per_page: int = 100) -> dict:
+        """
+        Validator set at height, default the latest one.
+        """
+        return self.call('validators', height=None if height is None else str(height), page=str(page),
+                         per_page=str(per_page))
+
+    def blocks(self, heights: Iterable[int], raise_errors: bool = True) -> List[dict]:
+        """
+        Blocks of many heights in batched round-trips.
+
+        :param heights: block heights.
+        :return: list of '/block' results in the order of heights
+        """
+        return self.batch([('block', {"height": str(height)}) for height in heights], raise_errors=raise_errors)
+
+    def blocks_results(self, heights: Iterable[int], raise_errors: bool = True) -> List[dict]:
+        """
+        Block results of many heights in batched round-trips.
+
+        :param heights: block heights.
+        :return: list of '/block_results' results in the order of heights
+        """
+        return self.batch([('block_results', {"height": str(height)}) for height in heights],
+                          raise_errors=raise_errors)
+
+    def validator_sets(self, heights: Iterable[int], per_page: int = 100, raise_errors: bool = True) -> List[dict]:
+        """
+        First page of the validator sets of many heights in batched round-trips.
+
+        :param heights: block heights.
+        :param per_page: validators per set, at most 100.
+        :return: list of '/validators' results in the order of heights
+        """
+        return self.batch([('validators', {"height": str(height), "page": "1", "per_page": str(per_page)})
+                           for height in heights], raise_errors=raise_errors)
+
+    def blockchain(self, min_height: int, max_height: int) -> dict:
+        """
+        Block metas between min_height and max_height, both inclusive, at most 20 and newest first.
+        """
+        return self.call('blockchain', minHeight=str(min_height), maxHeight=str(max_height))
+
+    def blockchain_range(self, min_height: int, max_height: int) -> List[dict]:
+        """
+        Block metas of any range, split into '/blockchain' calls of 20 blocks sent as batches.
+
+        :param min_height: first height, inclusive.
+        :param max_height: last height, inclusive.
+        :return: list of block metas in ascending height order
+        """
+        calls = [('blockchain', {"minHeight": str(start),
+                                 "maxHeight": str(min(start + BLOCKCHAIN_MAX_RANGE - 1, max_height))})
+                 for start in range(min_height, max_height + 1, BLOCKCHAIN_MAX_RANGE)]
+        metas = {}
+        for result in self.batch(calls):
+            for meta in result.get("block_metas", []):
+                metas[int(meta["header"]["height"])] = meta
+        return [metas[height] for height in sorted(metas)]
+
+
+class TendermintWebsocketClient(object):
+    """
+    Subscription client for the tendermint '/websocket' endpoint.
+
+    Events are dicts with 'query', 'data' and 'events' as sent by tendermint. Every event is passed to the
+    callbacks of its subscription and, once 'async for' is used, put on a bounded queue. If the iterating
+    consumer falls behind the oldest events are dropped and counted in 'dropped'. Events emitted while the
+    connection was down are lost, NewBlock heights in 'missed_heights' tell which blocks to request again.
+    Error responses, eg. to an invalid query, are passed to 'on_error' and raised by the iterator.
+    """
+
+    def __init__(self, uri: str, reconnect_delay: float = 0.5, max_reconnect_delay: float = 30.0,
+                 ping_interval: float = 20.0, queue_size: int = 10000, timeout: float = 10.0,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        :param uri: websocket URI, eg. 'ws://54.255.5.46:26657/websocket'.
+        :param reconnect_delay: first delay before reconnecting, doubled after every failed attempt.
+        :param max_reconnect_delay: upper bound of the reconnect delay.
+        :param ping_interval: seconds without message after which a ping is sent, the connection counts as
+            dead if another interval passes without any message.
+        :param queue_size: events buffered for the async iterator.
+        :param timeout: seconds for connecting and the handshake.
+        :param on_error: optional callable receiving TendermintRPCError responses.
+        """
+        self.uri = uri
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.on_error = on_error
+        self.subscriptions: Dict[str, List[Callable[[dict], None]]] = {}
+        self.connects: int = 0
+        self.reconnects: int = 0
+        self.events: int = 0
+        self.dropped: int = 0
+        self.last_height: Optional[int] = None
+        self.missed_heights: List[int] = []
+        self._ids = itertools.count(1)
+        self._websocket: Optional[WebSocket] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._iterating = False
+        self._connected: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_ip(cls, node_ip: str, node_port: int = 26657, **kwargs) -> 'TendermintWebsocketClient':
+        """
+        Create a client for the RPC of a validator node.
+
+        :param node_ip: ip address off a tradehub node.
+        :param node_port: tendermint RPC port, default 26657.
+        :return: TendermintWebsocketClient
+        """
+        return cls(f"ws://{node_ip}:{node_port}/websocket", **kwargs)
+
+    def subscribe(self, query: str, callback: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Subscribe to events matching a tendermint query. Subscriptions added while connected are sent at once,
+        the others with the next connect.
+
+        :param query: tendermint event query, eg. "tm.event='Tx' AND message.action='create_order'".
+        :param callback: optional callable receiving every event of the query.
+        """
+        new = query not in self.subscriptions
+        callbacks = self.subscriptions.setdefault(query, [])
+        if callback is not None:
+            callbacks.append(callback)
+        if new and self._websocket is not None and not self._websocket.closed:
+            asyncio.ensure_future(self._send_subscribe(self._websocket, query))
+
+    def subscribe_new_blocks(self, callback: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Subscribe to NewBlock events.
+
+        :param callback: optional callable receiving every NewBlock event.
+        """
+        self.subscribe(NEW_BLOCK_QUERY, callback)
+
+    def subscribe_txs(self, condition: Optional[str] = None, callback: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Subscribe to Tx events, optionally narrowed by a condition.
+
+        :param condition: query condition joined with AND, eg. "message.action='create_order'".
+        :param callback: optional callable receiving every matching Tx event.
+        """
+        self.subscribe(TX_QUERY if condition is None else f"{TX_QUERY} AND {condition}", callback)
+
+    async def _send_subscribe(self, websocket: WebSocket, query: str) -> None:
+        await websocket.send(json.dumps({"jsonrpc": "2.0", "method": "subscribe", "id": next(self._ids),
+                                         "params": {"query": query}}))
+
+    def _enqueue(self, item) -> None:
+        if not self._iterating:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def _dispatch(self, message: dict) -> None:
+        if message.get("error"):
+            error = TendermintRPCError(message["error"])
+            if self.on_error is not None:
+                self.on_error(error)
+            self._enqueue(error)
+            return
+        result = message.get("result")
+        if not result or "query" not in result:
+            # acknowledgement of a subscribe call
+            return
+        self.events += 1
+        self._track_height(result)
+        for callback in self.subscriptions.get(result["query"], ()):
+            callback(result)
+        self._enqueue(result)
+
+    def _track_height(self, event: dict) -> None:
+        if event["query"] != NEW_BLOCK_QUERY:
+            return
+        try:
+            height = int(event["data"]["value"]["block"]["header"]["height"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if self.last_height is not None and height > self.last_height + 1:
+            self.missed_heights.extend(range(self.last_height + 1, height))
+        self.last_height = height if self.last_height is None else max(self.last_height, height)
+
+    async def _receive(self, websocket: WebSocket) -> None:
+        waiting_for_pong = False
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.recv(), self.ping_interval)
+            except asyncio.TimeoutError:
+                if waiting_for_pong:
+                    raise ConnectionClosed(reason='no message since the last ping')
+                waiting_for_pong = True
+                await websocket.ping()
+                continue
+            waiting_for_pong = False
+            self._dispatch(json.loads(message))
+
+    async def run(self) -> None:
+        """
+        Connect, subscribe and dispatch events until close is called, reconnecting whenever the connection
+        is lost or can not be opened.
+        """
+        self._prepare()
+        delay = self.reconnect_delay
+        while not self._closing:
+            try:
+                websocket = await connect(self.uri, timeout=self.timeout)
+            except (OSError, asyncio.TimeoutError, WebSocketError):
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+                delay = min(self.max_reconnect_delay, delay * 2)
+                continue
+            self.connects += 1
+            if self.connects > 1:
+                self.reconnects += 1
+            self._websocket = websocket
+            try:
+                for query in list(self.subscriptions):
+                    await self._send_subscribe(websocket, query)
+                self._connected.set()
+                delay = self.reconnect_delay
+                await self._receive(websocket)
+            except (ConnectionClosed, OSError, ValueError):
+                pass
+            finally:
+                self._connected.clear()
+                self._websocket = None
+                await websocket.close()
+
+    def _prepare(self) -> None:
+        # asyncio primitives are created on the loop running the client
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._connected = asyncio.Event()
+
+    def start(self) -> asyncio.Task:
+        """
+        Run the client as task on the running event loop.
+        """
+        self._prepare()
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    def run_forever(self) -> None:
+        """
+        Block and deliver events to the callbacks until stop is called, eg. from a callback.
+        """
+        self._closing = False
+        asyncio.run(self.run())
+
+    def stop(self) -> None:
+        """
+        Close the connection and end run, must be called on the loop running the client.
+        """
+        self._closing = True
+        if self._websocket is not None:
+            asyncio.ensure_future(self._websocket.close())
+        if self._queue is not None:
+            # wake up a waiting iterator
+            if self._queue.full():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until a connection is open and all subscriptions are sent.
+        """
+        self.start()
+        await asyncio.wait_for(self._connected.wait(), timeout)
+
+    async def close(self) -> None:
+        """
+        Stop the client and wait for its task.
+        """
+        self.stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> 'TendermintWebsocketClient':
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        self.start()
+        self._iterating = True
+        try:
+            while not self._closing or not self._queue.empty():
+                item = await self._queue.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._iterating = False
+
+    def stats(self) -> dict:
+        return {"connects": self.connects, "reconnects": self.reconnects, "events": self.events,
+                "dropped": self.dropped, "last_height": self.last_height, "missed_heights": len(self.missed_heights)}
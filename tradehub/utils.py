@@ -1,8 +1,12 @@
+import functools
 import json
-import math
 import multiprocessing as mp
+import re
 import requests
 
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_EVEN
+
 from tradescan.public_client import PublicClient as TradescanPublicClient
 
 
@@ -223,7 +227,66 @@ def parse_validator_status(request_json, validator_ip):
     }
 
 def to_tradehub_asset_amount(amount, power = 8):
+    from tradehub.amounts import to_base_units
+
     if 0.00000001 < amount < 1000000:
-        return "{:.0f}".format(amount * math.pow(10, power))
+        return str(to_base_units(amount, power, rounding=ROUND_HALF_EVEN))
     else:
         raise ValueError('Asset amount {} outside of acceptable range {}-{}.'.format(amount, 0.00000001, 1000000))
+
+
+_TIMESTAMP_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:?\d{2})?$')
+
+
+def parse_timestamp(value):
+    """
+    Convert a timestamp like 'block_created_at' to epoch seconds.
+
+    Accepts ISO 8601 strings with any number of fractional digits, eg. '2021-01-10T21:59:53.563633+01:00' or
+    the nanosecond '2021-01-10T20:59:53.563633123Z' of tendermint, datetime objects and epoch seconds.
+    Strings and datetimes without offset are treated as UTC.
+
+    :param value: timestamp as str, datetime, int or float
+    :return: epoch seconds as float
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return _parse_timestamp_string(value)
+
+
+# rows created in the same block share their timestamp, repeated strings are parsed once
+@functools.lru_cache(maxsize=65536)
+def _parse_timestamp_string(value):
+    match = _TIMESTAMP_PATTERN.match(value.strip())
+    if match is None:
+        raise ValueError('Invalid timestamp {}.'.format(value))
+    date, time, fraction, offset = match.groups()
+    seconds = datetime.fromisoformat(date + 'T' + time).replace(tzinfo=timezone.utc).timestamp()
+    if fraction:
+        seconds += int(fraction) / 10 ** len(fraction)
+    if offset and offset != 'Z':
+        sign = -1 if offset[0] == '-' else 1
+        seconds -= sign * (int(offset[1:3]) * 3600 + int(offset[-2:]) * 60)
+    return seconds
+
+
+def parse_duration(value):
+    """
+    Convert a duration like the block time '00:00:02.190211' (HH:MM:SS.ZZZZZZ) to seconds.
+
+    :param value: duration as str, int or float seconds
+    :return: seconds as float
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    parts = value.strip().split(':')
+    if not 1 <= len(parts) <= 3:
+        raise ValueError('Invalid duration {}.'.format(value))
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
@@ -0,0 +1,134 @@
+"""
+Description:
+    In-process response cache for slow changing endpoints like tokens, markets or transaction types.
+    Entries expire after a per path TTL and the least recently used ones are evicted once the cache
+    exceeds its memory bound.
+Usage:
+    from tradescan.cache import ResponseCache
+
+    cache = ResponseCache(ttls={'/get_tokens': 600}, max_bytes=8 * 1024 * 1024)
+    public_client = PublicClient(uri="https://tradehub-api-server.network/", cache=cache)
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+DEFAULT_TTLS = {
+    '/get_tokens': 300,
+    '/get_markets': 300,
+    '/get_market': 300,
+    '/get_transaction_types': 3600,
+    '/get_all_validators': 60,
+    '/get_txns_fees': 300,
+}
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+MISSING = object()
+
+
+class ResponseCache(object):
+    """
+    Thread safe TTL and LRU cache for decoded responses keyed by (path, params).
+
+    Only paths listed in 'ttls' are cached. The size of an entry is the length of the raw response body,
+    which is used to keep the total below 'max_bytes'.
+
+    .. warning::
+
+        Cached responses are shared between callers and must be treated as read only.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param ttls: dict path -> time to live in seconds, default DEFAULT_TTLS.
+        :param max_bytes: upper bound for the summed size of all cached responses.
+        :param clock: monotonic time source, only replaced in tests.
+        """
+        self.ttls: Dict[str, float] = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_bytes: int = max_bytes
+        self.clock = clock
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.size: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl(self, path: str) -> Optional[float]:
+        """
+        Time to live for responses of a path or None if the path is not cached.
+
+        :param path: request path, eg. '/get_tokens'.
+        :return: ttl in seconds or None
+        """
+        return self.ttls.get(path)
+
+    def get(self, key: Hashable):
+        """
+        Return the cached response for key or MISSING if it is unknown or expired.
+
+        :param key: key built from path and params.
+        :return: cached response or MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.size -= size
+            self.misses += 1
+            return MISSING
+
+    def set(self, key: Hashable, value, size: int, ttl: float) -> None:
+        """
+        Store a response and evict least recently used entries until the cache fits into max_bytes.
+
+        :param key: key built from path and params.
+        :param value: decoded response.
+        :param size: size of the raw response in bytes.
+        :param ttl: time to live in seconds.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (self.clock() + ttl, size, value)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Counters of the cache.
+
+        :return: dict with hits, misses, evictions, entries and bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,177 @@
+"""
+Description:
+    Record real API responses to cassette files and look them up again, eg. to replay them with the StubServer
+    for offline and reproducible benchmarks.
+Usage:
+    from tradescan.cassette import Cassette, RecordingSession
+
+    cassette = Cassette()
+    public_client = PublicClient(uri="https://tradehub-api-server.network/")
+    public_client.request.http = RecordingSession(cassette, public_client.request.http)
+    public_client.get_tokens()
+    cassette.save("tradehub.json")
+
+    with StubServer(cassette=Cassette.load("tradehub.json"), latency=0.02, jitter=0.01) as server:
+        PublicClient(uri=server.url).get_tokens()
+"""
+
+import base64
+import json
+import threading
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+CASSETTE_VERSION = 1
+
+
+def normalize_query(query: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Sorted query parameters of a query string, so equal requests match independent of parameter order.
+
+    :param query: query string without '?'.
+    :return: tuple of (key, value) pairs
+    """
+    return tuple(sorted(parse_qsl(query, keep_blank_values=True)))
+
+
+class Interaction(object):
+    """
+    One recorded request and its response.
+    """
+
+    __slots__ = ('method', 'path', 'query', 'status', 'content_type', 'body')
+
+    def __init__(self, method: str, path: str, query: Tuple[Tuple[str, str], ...], status: int,
+                 content_type: str, body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+    def to_dict(self) -> dict:
+        try:
+            body, encoding = self.body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(self.body).decode('ascii'), 'base64'
+        return {
+            "method": self.method,
+            "path": self.path,
+            "query": [list(pair) for pair in self.query],
+            "status": self.status,
+            "content_type": self.content_type,
+            "encoding": encoding,
+            "body": body,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Interaction':
+        if data.get("encoding") == 'base64':
+            body = base64.b64decode(data["body"])
+        else:
+            body = data["body"].encode('utf-8')
+        return cls(method=data["method"], path=data["path"], query=tuple(tuple(pair) for pair in data["query"]),
+                   status=data["status"], content_type=data.get("content_type", 'application/json'), body=body)
+
+
+class Cassette(object):
+    """
+    Thread safe collection of interactions keyed by method, path and normalized query.
+    The latest recording of a request wins.
+    """
+
+    def __init__(self, interactions: Optional[List[Interaction]] = None):
+        self._interactions: Dict[tuple, Interaction] = {}
+        self._by_path: Dict[Tuple[str, str], Interaction] = {}
+        self._lock = threading.Lock()
+        for interaction in interactions or []:
+            self.add(interaction)
+
+    def add(self, interaction: Interaction) -> None:
+        with self._lock:
+            self._interactions[(interaction.method, interaction.path, interaction.query)] = interaction
+            self._by_path.setdefault((interaction.method, interaction.path), interaction)
+
+    def record(self, response: requests.Response) -> Interaction:
+        """
+        Add the request and response of a requests.Response.
+
+        :param response: response returned by requests.
+        :return: Interaction
+        """
+        url = urlsplit(response.request.url if response.request is not None else response.url)
+        interaction = Interaction(method=response.request.method if response.request is not None else 'GET',
+                                  path=url.path, query=normalize_query(url.query), status=response.status_code,
+                                  content_type=response.headers.get('Content-Type', 'application/json'),
+                                  body=response.content)
+        self.add(interaction)
+        return interaction
+
+    def find(self, method: str, path: str, query: Tuple[Tuple[str, str], ...] = (),
+             exact: bool = True) -> Optional[Interaction]:
+        """
+        Look up a recorded interaction with the same method, path and query. With 'exact' unset a request
+        without recording of its query gets the first recording of the path, which is only right for
+        endpoints answering every query alike, paginated endpoints would get the wrong page.
+
+        :param method: HTTP method, eg. 'GET'.
+        :param path: request path.
+        :param query: normalized query, see normalize_query.
+        :param exact: only return interactions with the same query, default True.
+        :return: Interaction or None
+        """
+        with self._lock:
+            interaction = self._interactions.get((method, path, query))
+            if interaction is None and not exact:
+                interaction = self._by_path.get((method, path))
+            return interaction
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return sorted({path for _, path in self._by_path})
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def save(self, file_path: str) -> None:
+        with self._lock:
+            interactions = [interaction.to_dict() for interaction in self._interactions.values()]
+        with open(file_path, 'w') as cassette_file:
+            json.dump({"version": CASSETTE_VERSION, "interactions": interactions}, cassette_file, indent=1)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'Cassette':
+        with open(file_path) as cassette_file:
+            data = json.load(cassette_file)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')}, expected {CASSETTE_VERSION}.")
+        return cls([Interaction.from_dict(interaction) for interaction in data["interactions"]])
+
+
+class RecordingSession(object):
+    """
+    Wrapper around a requests.Session (or the requests module) that records every response into a cassette.
+    It can be used wherever Request expects its 'http' transport.
+    """
+
+    def __init__(self, cassette: Cassette, session=None):
+        """
+        :param cassette: Cassette to record into.
+        :param session: transport performing the real requests, default the requests module.
+        """
+        self.cassette = cassette
+        self.session = session or requests
+
+    def get(self, url, params=None, **kwargs):
+        response = self.session.get(url, params=params, **kwargs)
+        self.cassette.record(response)
+        return response
+
+    def post(self, url, data=None, json=None, **kwargs):
+        response = self.session.post(url, data=data, json=json, **kwargs)
+        self.cassette.record(response)
+        return response
@@ -0,0 +1,122 @@
+"""
+Description:
+    Single-flight coalescing of identical in-flight requests. While a call for a key is running every other
+    caller asking for the same key waits for it and receives the same result instead of sending its own request.
+Usage:
+    from tradescan.coalesce import SingleFlight
+
+    single_flight = SingleFlight()
+    result = single_flight.do(key, lambda: request.get(path, params))
+"""
+
+import asyncio
+import threading
+
+from typing import Awaitable, Callable, Hashable
+
+
+class _Call(object):
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Thread based single-flight group.
+
+    .. warning::
+
+        The result object is shared between all coalesced callers and must be treated as read only.
+    """
+
+    def __init__(self):
+        self.calls: int = 0
+        self.coalesced: int = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable):
+        """
+        Run func unless a call with the same key is in flight, in that case wait for its result.
+        Exceptions raised by func are raised in every waiting caller.
+
+        :param key: hashable key identifying the request.
+        :param func: callable without arguments performing the request.
+        :return: result of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight(object):
+    """
+    Asyncio single-flight group. The request runs as its own task, so cancelling one waiting caller does not
+    cancel the request for the others.
+
+    .. warning::
+
+        The result object is shared between all coalesced callers and must be treated as read only.
+    """
+
+    def __init__(self):
+        self.calls: int = 0
+        self.coalesced: int = 0
+        self._tasks = {}
+        self._loop = None
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        """
+        Await func unless a call with the same key is in flight, in that case await its result.
+
+        :param key: hashable key identifying the request.
+        :param func: callable without arguments returning an awaitable performing the request.
+        :return: result of func
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._tasks = {}
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
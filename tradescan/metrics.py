@@ -0,0 +1,201 @@
+"""
+Description:
+    Per path and node instrumentation of requests. Request calls its hooks with a RequestEvent for every
+    attempt, MetricsRegistry is such a hook collecting latency, response size and decode time histograms,
+    status codes, errors and retries. It exports the Prometheus text format or a plain snapshot dict.
+Usage:
+    from tradescan.metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    public_client = PublicClient(uri="https://tradehub-api-server.network/", hooks=[metrics])
+    public_client.get_trades()
+    print(metrics.to_prometheus())
+"""
+
+import threading
+
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+DEFAULT_DECODE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class RequestEvent(object):
+    """
+    Outcome of a single GET attempt passed to the Request hooks.
+
+    'decode_time' is None for failed attempts and raw responses, 'error' holds the exception of failed ones.
+    'retry' is True if the attempt repeats a failed one on another node.
+    """
+
+    __slots__ = ('node', 'path', 'status', 'latency', 'size', 'decode_time', 'error', 'retry')
+
+    def __init__(self, node: str, path: str, status: Optional[int], latency: float, size: int = 0,
+                 decode_time: Optional[float] = None, error: Optional[Exception] = None, retry: bool = False):
+        self.node = node
+        self.path = path
+        self.status = status
+        self.latency = latency
+        self.size = size
+        self.decode_time = decode_time
+        self.error = error
+        self.retry = retry
+
+
+class Histogram(object):
+    """
+    Histogram with fixed upper bounds like a Prometheus histogram. Not thread safe on its own.
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds: Tuple[float, ...] = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Dict[str, int]:
+        """
+        Cumulative counts keyed by upper bound, the last one is '+Inf'.
+        """
+        result = {}
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            result['+Inf' if bound == float('inf') else repr(bound)] = total
+        return result
+
+    def snapshot(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "buckets": self.cumulative()}
+
+
+class _Series(object):
+
+    __slots__ = ('latency', 'size', 'decode_time', 'status', 'errors', 'retries')
+
+    def __init__(self, registry: 'MetricsRegistry'):
+        self.latency = Histogram(registry.latency_buckets)
+        self.size = Histogram(registry.size_buckets)
+        self.decode_time = Histogram(registry.decode_buckets)
+        self.status: Dict[Optional[int], int] = {}
+        self.errors: int = 0
+        self.retries: int = 0
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry(object):
+    """
+    Request hook aggregating RequestEvents per (path, node).
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+                 size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+                 decode_buckets: Sequence[float] = DEFAULT_DECODE_BUCKETS, namespace: str = 'tradehub_client'):
+        """
+        :param latency_buckets: upper bounds of the latency histogram in seconds.
+        :param size_buckets: upper bounds of the response size histogram in bytes.
+        :param decode_buckets: upper bounds of the decode time histogram in seconds.
+        :param namespace: prefix of the exported Prometheus metric names.
+        """
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.decode_buckets = tuple(decode_buckets)
+        self.namespace = namespace
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        key = (event.path, event.node)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self)
+            series.latency.observe(event.latency)
+            series.status[event.status] = series.status.get(event.status, 0) + 1
+            if event.retry:
+                series.retries += 1
+            if event.error is not None:
+                series.errors += 1
+                return
+            series.size.observe(event.size)
+            if event.decode_time is not None:
+                series.decode_time.observe(event.decode_time)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> dict:
+        """
+        In process view of all metrics.
+
+        :return: dict path -> node -> dict with requests, errors, retries, status, latency, bytes and decode_time.
+        """
+        result = {}
+        with self._lock:
+            for (path, node), series in self._series.items():
+                result.setdefault(path, {})[node] = {
+                    "requests": series.latency.count,
+                    "errors": series.errors,
+                    "retries": series.retries,
+                    "status": dict(series.status),
+                    "latency": series.latency.snapshot(),
+                    "bytes": series.size.snapshot(),
+                    "decode_time": series.decode_time.snapshot(),
+                }
+        return result
+
+    def to_prometheus(self) -> str:
+        """
+        Export all metrics in the Prometheus text exposition format.
+
+        :return: str
+        """
+        name = self.namespace
+        counters = {
+            f"{name}_requests_total": ("Requests by status code.", []),
+            f"{name}_request_errors_total": ("Failed requests.", []),
+            f"{name}_request_retries_total": ("Requests retried on another node.", []),
+        }
+        histograms = {
+            f"{name}_request_latency_seconds": ("Request latency in seconds.", []),
+            f"{name}_response_bytes": ("Response body size in bytes.", []),
+            f"{name}_decode_seconds": ("Response decode time in seconds.", []),
+        }
+        with self._lock:
+            for (path, node), series in sorted(self._series.items()):
+                labels = f'path="{_escape(path)}",node="{_escape(node)}"'
+                for status, count in sorted(series.status.items(), key=lambda item: str(item[0])):
+                    counters[f"{name}_requests_total"][1].append(
+                        f'{name}_requests_total{{{labels},status="{status or "none"}"}} {count}')
+                counters[f"{name}_request_errors_total"][1].append(
+                    f'{name}_request_errors_total{{{labels}}} {series.errors}')
+                counters[f"{name}_request_retries_total"][1].append(
+                    f'{name}_request_retries_total{{{labels}}} {series.retries}')
+                for metric, histogram in ((f"{name}_request_latency_seconds", series.latency),
+                                          (f"{name}_response_bytes", series.size),
+                                          (f"{name}_decode_seconds", series.decode_time)):
+                    lines = histograms[metric][1]
+                    for bound, count in histogram.cumulative().items():
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{metric}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+
+        output = []
+        for metric_type, metrics in (("counter", counters), ("histogram", histograms)):
+            for metric, (description, lines) in metrics.items():
+                output.append(f"# HELP {metric} {description}")
+                output.append(f"# TYPE {metric} {metric_type}")
+                output.extend(lines)
+        return "\n".join(output) + "\n"
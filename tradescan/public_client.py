@@ -16,15 +16,29 @@ class PublicClient(object):
     """
 
     def __init__(self,
-                 api_url = 'https://tradescan.switcheo.org'):
+                 api_url = 'https://tradescan.switcheo.org',
+                 cache = None,
+                 rate_limiter = None,
+                 concurrency = None,
+                 hooks = None):
         """
         :param api_url: The URL for the Switcheo API endpoint.
         :type api_url: str
+        :param cache: Optional response cache for slow changing endpoints like tokens or markets.
+        :type cache: tradescan.cache.ResponseCache
+        :param rate_limiter: Optional token bucket limits per endpoint.
+        :type rate_limiter: tradescan.ratelimit.RateLimiter
+        :param concurrency: Optional AIMD controller for the number of requests in flight.
+        :type concurrency: tradescan.ratelimit.AIMDController
+        :param hooks: Optional callables receiving a RequestEvent for every request, eg. a MetricsRegistry.
+        :type hooks: list
         """
-        self.request = Request(api_url = api_url, timeout = 30)
+        self.request = Request(api_url = api_url, timeout = 30, cache = cache, rate_limiter = rate_limiter,
+                               concurrency = concurrency, hooks = hooks)
         self.validators = self.get_validator_public_nodes()
         self.transaction_types = self.get_transaction_types()
         self.tokens = self.get_token_list()
+        self._token_set = frozenset(self.tokens)
 
 
     def get_address_rewards(self, address):
@@ -150,7 +164,7 @@ class PublicClient(object):
 
     def get_rich_list(self, token):
         api_params = {}
-        if token is not None and token.lower() in self.tokens:
+        if token is not None and token.lower() in self._token_set:
             api_params["token"] = token.lower()
         return self.request.get(path = '/get_rich_list', params = api_params)
 
@@ -159,7 +173,7 @@ class PublicClient(object):
 
     def get_token(self, token):
         api_params = {}
-        if token is not None and token.lower() in self.tokens:
+        if token is not None and token.lower() in self._token_set:
             api_params["token"] = token.lower()
         return self.request.get(path = '/token', params = api_params)
 
@@ -0,0 +1,192 @@
+"""
+Description:
+    Client side pacing of requests. Token buckets limit the request rate per node and per endpoint and an
+    AIMD controller adapts the number of requests in flight to the latency and errors the node shows.
+Usage:
+    from tradescan.ratelimit import AIMDController, RateLimiter
+
+    rate_limiter = RateLimiter(node_rate=20, endpoint_rates={'/get_trades': 5})
+    concurrency = AIMDController(initial_limit=4, max_limit=64, latency_target=0.5)
+    public_client = PublicClient(uri="https://tradehub-api-server.network/", rate_limiter=rate_limiter,
+                                 concurrency=concurrency)
+"""
+
+import threading
+import time
+
+from typing import Callable, Dict, Optional, Tuple, Union
+
+
+class TokenBucket(object):
+    """
+    Thread safe token bucket. Tokens refill continuously at 'rate' per second up to 'burst'.
+
+    Callers reserve tokens even if the bucket is empty and sleep until their reservation is covered,
+    so waiting callers are served in order without polling.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        :param rate: tokens added per second.
+        :param burst: bucket capacity, default one second worth of tokens.
+        :param clock: monotonic time source, only replaced in tests.
+        :param sleep: sleep function, only replaced in tests.
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate has to be positive, got {rate} instead.")
+        self.rate: float = rate
+        self.burst: float = max(1.0, rate if burst is None else burst)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens: float = self.burst
+        self._updated: float = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Take tokens from the bucket and return the seconds the caller has to wait before using them.
+
+        :param tokens: number of tokens to take.
+        :return: delay in seconds, 0 if the tokens were available.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Block until the tokens are available.
+
+        :param tokens: number of tokens to take.
+        :return: seconds waited.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+class RateLimiter(object):
+    """
+    Token bucket limits per node and per (node, endpoint). A request has to pass both buckets.
+    """
+
+    def __init__(self, node_rate: Optional[float] = None, node_burst: Optional[float] = None,
+                 endpoint_rates: Optional[Dict[str, Union[float, Tuple[float, float]]]] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        :param node_rate: requests per second allowed per node, None for no limit.
+        :param node_burst: burst size per node, default one second worth of requests.
+        :param endpoint_rates: dict path -> rate or (rate, burst) applied per node and path.
+        :param clock: monotonic time source, only replaced in tests.
+        :param sleep: sleep function, only replaced in tests.
+        """
+        self.node_rate = node_rate
+        self.node_burst = node_burst
+        self.endpoint_rates = {
+            path: rate if isinstance(rate, tuple) else (rate, None) for path, rate in (endpoint_rates or {}).items()
+        }
+        self.clock = clock
+        self.sleep = sleep
+        self.waited: float = 0.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, rate: float, burst: Optional[float]) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(rate, burst, clock=self.clock, sleep=self.sleep)
+        return bucket
+
+    def acquire(self, url: str, path: str) -> float:
+        """
+        Block until a request to path on the node at url is allowed.
+
+        :param url: base URL of the node.
+        :param path: request path.
+        :return: seconds waited.
+        """
+        delay = 0.0
+        if self.node_rate:
+            delay += self._bucket(url, self.node_rate, self.node_burst).reserve()
+        if path in self.endpoint_rates:
+            rate, burst = self.endpoint_rates[path]
+            delay = max(delay, self._bucket((url, path), rate, burst).reserve())
+        if delay > 0:
+            with self._lock:
+                self.waited += delay
+            self.sleep(delay)
+        return delay
+
+
+class AIMDController(object):
+    """
+    Additive increase / multiplicative decrease limit for requests in flight.
+
+    Every healthy response raises the limit by 'increase / limit', which adds about 'increase' per round of
+    requests. A response slower than 'latency_target', an error, a 429 or 5xx status multiplies the limit by
+    'decrease', at most once per 'latency_target' seconds so one burst of failures only backs off once.
+    """
+
+    def __init__(self, initial_limit: float = 4, min_limit: float = 1, max_limit: float = 64,
+                 latency_target: float = 1.0, increase: float = 1.0, decrease: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param initial_limit: number of requests in flight allowed at start.
+        :param min_limit: lower bound of the limit.
+        :param max_limit: upper bound of the limit.
+        :param latency_target: responses slower than this many seconds count as overload.
+        :param increase: additive increase per round of requests.
+        :param decrease: factor applied to the limit on overload.
+        :param clock: monotonic time source, only replaced in tests.
+        """
+        self.limit: float = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.in_flight: int = 0
+        self.decreases: int = 0
+        self._last_decrease = None
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Block until the number of requests in flight is below the current limit.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Finish a request and adapt the limit.
+
+        :param latency: seconds the request took.
+        :param overloaded: True if the request failed because of the node, eg. timeout, 429 or 5xx.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded or latency > self.latency_target:
+                now = self.clock()
+                if self._last_decrease is None or now - self._last_decrease >= self.latency_target:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {"limit": self.limit, "in_flight": self.in_flight, "decreases": self.decreases}
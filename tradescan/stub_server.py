@@ -0,0 +1,295 @@
+"""
+Description:
+    Local HTTP stub server answering API paths with canned JSON responses or responses replayed from a
+    cassette, optionally with a configurable latency and jitter, and a websocket stub server answering
+    JSON-RPC subscriptions like the tendermint RPC.
+    Used by the benchmarks and tests to exercise the clients without a live node.
+Usage:
+    from tradescan.stub_server import StubServer
+
+    with StubServer(routes={'/get_tokens': [{"denom": "swth"}]}) as server:
+        client = PublicClient(uri=server.url)
+
+    with StubServer(cassette=Cassette.load("tradehub.json"), latency=0.02, jitter=0.01, seed=1) as server:
+        client = PublicClient(uri=server.url)
+
+    with WebsocketStubServer() as server:
+        client = TendermintWebsocketClient(server.url)
+        server.publish("tm.event='NewBlock'", {"type": "tendermint/event/NewBlock", "value": {...}})
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+from tradescan.cassette import Cassette, normalize_query
+from tradescan.websocket import ConnectionClosed, accept
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super(_StubHandler, self).setup()
+        self.server.stub.connection_opened()
+
+    def do_GET(self):
+        self._replay('GET')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self._replay('POST', self.rfile.read(length) if length else b'')
+
+    def _replay(self, method, body=b''):
+        stub = self.server.stub
+        stub.request_received()
+        delay = stub.delay()
+        if delay:
+            time.sleep(delay)
+        url = urlsplit(self.path)
+        status, content_type, body = stub.response(method, url.path, normalize_query(url.query), body)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(object):
+    """
+    Threaded HTTP/1.1 server on localhost serving fixed JSON bodies per path or interactions of a cassette.
+    Routes take precedence over the cassette, unknown paths and requests whose query was not recorded are
+    answered with 404.
+    Keep-alive is supported, so connection reuse by the client can be observed through 'connections'.
+    """
+
+    def __init__(self, routes: dict = None, host: str = '127.0.0.1', port: int = 0, latency: float = 0,
+                 cassette: Optional[Cassette] = None, jitter: float = 0, seed: Optional[int] = None,
+                 loose_matching: bool = False):
+        """
+        :param routes: dict path -> JSON serializable response body or callable building it from the query.
+        :param latency: seconds to wait before answering a request.
+        :param host: interface to bind, default localhost.
+        :param port: port to bind, default 0 picks a free port.
+        :param cassette: replay recorded interactions, matched by method, path and query.
+        :param jitter: additional random delay between 0 and jitter seconds.
+        :param seed: seed of the jitter random generator for reproducible runs.
+        :param loose_matching: answer requests with a query which was not recorded with the first recording of
+            their path instead of 404, see Cassette.find.
+        """
+        self.routes = {}
+        self.post_routes = {}
+        for path, body in (routes or {}).items():
+            self.add_route(path, body)
+        self.cassette = cassette
+        self.loose_matching = loose_matching
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_route(self, path: str, body) -> None:
+        """
+        Answer GET requests to path with body. A callable body is called with the query parameters as dict
+        and its return value is sent, eg. to serve paginated endpoints.
+        """
+        self.routes[path] = body if callable(body) else json.dumps(body).encode('utf-8')
+
+    def add_post_route(self, path: str, handler) -> None:
+        """
+        Answer POST requests to path with the return value of handler, called with the decoded JSON body.
+        """
+        self.post_routes[path] = handler
+
+    def delay(self) -> float:
+        """
+        Seconds the next response is delayed, latency plus a random share of the jitter.
+        """
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def response(self, method: str, path: str, query: tuple, body: bytes = b'') -> tuple:
+        """
+        Status, content type and body answering a request.
+        """
+        if method == 'POST' and path in self.post_routes:
+            return 200, 'application/json', json.dumps(self.post_routes[path](json.loads(body or b'null'))).encode('utf-8')
+        if method == 'GET' and path in self.routes:
+            body = self.routes[path]
+            if callable(body):
+                body = json.dumps(body(dict(query))).encode('utf-8')
+            return 200, 'application/json', body
+        if self.cassette is not None:
+            interaction = self.cassette.find(method, path, query, exact=not self.loose_matching)
+            if interaction is not None:
+                return interaction.status, interaction.content_type, interaction.body
+            error = {"error": "no recorded interaction for " + path, "query": [list(pair) for pair in query]}
+            return 404, 'application/json', json.dumps(error).encode('utf-8')
+        return 404, 'application/json', json.dumps({"error": "unknown path " + path}).encode('utf-8')
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def request_received(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+class WebsocketStubServer(object):
+    """
+    Websocket server on localhost running its own event loop in a background thread. It answers JSON-RPC
+    'subscribe' and 'unsubscribe' calls like the tendermint RPC and pushes events published from any thread
+    to the matching subscribers. Queries have to contain 'tm.event', others are answered with an error.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        """
+        :param host: interface to bind, default localhost.
+        :param port: port to bind, default 0 picks a free port.
+        """
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.subscribe_calls = 0
+        self._subscribers = {}
+        self._writers = set()
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/websocket"
+
+    async def _handle(self, reader, writer):
+        websocket = await accept(reader, writer)
+        if websocket is None:
+            return
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request = json.loads(await websocket.recv())
+                query = request.get("params", {}).get("query", '')
+                if request.get("method") == 'subscribe' and 'tm.event' in query:
+                    self.subscribe_calls += 1
+                    self._subscribers.setdefault(query, {})[websocket] = request.get("id")
+                    response = {"jsonrpc": "2.0", "id": request.get("id"), "result": {}}
+                elif request.get("method") == 'unsubscribe':
+                    self._subscribers.get(query, {}).pop(websocket, None)
+                    response = {"jsonrpc": "2.0", "id": request.get("id"), "result": {}}
+                else:
+                    response = {"jsonrpc": "2.0", "id": request.get("id"),
+                                "error": {"code": -32603, "message": "Internal error", "data": f"bad query {query}"}}
+                await websocket.send(json.dumps(response))
+        except (ConnectionClosed, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            for subscribers in self._subscribers.values():
+                subscribers.pop(websocket, None)
+            writer.close()
+
+    def subscribers(self, query: str) -> int:
+        """
+        Number of connections subscribed to query.
+        """
+        return len(self._subscribers.get(query, {}))
+
+    def publish(self, query: str, data: dict, events: dict = None) -> None:
+        """
+        Send an event to every subscriber of query and wait until it is written.
+
+        :param query: subscription query, eg. "tm.event='NewBlock'".
+        :param data: event data, eg. {"type": "tendermint/event/NewBlock", "value": {...}}.
+        :param events: event attributes like {"tx.hash": ["..."]}.
+        """
+        async def send():
+            for websocket, subscription_id in list(self._subscribers.get(query, {}).items()):
+                message = {"jsonrpc": "2.0", "id": f"{subscription_id}#event",
+                           "result": {"query": query, "data": data, "events": events or {}}}
+                try:
+                    await websocket.send(json.dumps(message))
+                except ConnectionClosed:
+                    pass
+        asyncio.run_coroutine_threadsafe(send(), self._loop).result()
+
+    def disconnect_all(self) -> None:
+        """
+        Drop every connection without close handshake, like a restarting node.
+        """
+        def drop():
+            for writer in list(self._writers):
+                writer.transport.abort()
+        self._loop.call_soon_threadsafe(drop)
+
+    def start(self) -> 'WebsocketStubServer':
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self._loop).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        async def shutdown():
+            self._server.close()
+            for writer in list(self._writers):
+                writer.transport.abort()
+            await self._server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+        self._loop.close()
+
+    def __enter__(self) -> 'WebsocketStubServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
@@ -1,6 +1,33 @@
+import asyncio
+import functools
 import json
+import threading
+import time
 import requests
 
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from tradescan.cache import MISSING
+from tradescan.coalesce import AsyncSingleFlight, SingleFlight
+from tradescan.metrics import RequestEvent
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_CONCURRENCY = 100
+
+# orjson decodes large payloads several times faster than the stdlib, it is used if installed
+DEFAULT_DECODER = orjson.loads if orjson is not None else json.loads
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
 class TradescanApiException(Exception):
 
     def __init__(self, error_code, error_message, error):
@@ -8,21 +35,165 @@ class TradescanApiException(Exception):
         self.error_code = error_code
         self.error = error
 
+
+def get_session(pool_maxsize = DEFAULT_POOL_MAXSIZE, pool_connections = DEFAULT_POOL_CONNECTIONS):
+    """
+    Return a keep-alive session shared by every Request created with the same pool configuration.
+
+    The session is created once per process and mounted with an HTTPAdapter that keeps up to
+    'pool_maxsize' idle connections per host for 'pool_connections' hosts, so repeated calls
+    against the same node reuse the TCP (and TLS) connection instead of opening a new one.
+
+    :param pool_maxsize: maximum number of connections kept alive per host.
+    :param pool_connections: number of hosts to keep connection pools for.
+    :return: requests.Session
+    """
+    key = (pool_connections, pool_maxsize)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections = pool_connections, pool_maxsize = pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[key] = session
+        return session
+
+
+def request_key(path, params = None):
+    """
+    Build a hashable key from path and params. Parameters with value None are dropped like requests does
+    and the remaining ones are sorted, so equal requests map to equal keys.
+
+    :param path: request path.
+    :param params: dict with query parameters.
+    :return: tuple
+    """
+    if not params:
+        return path, ()
+    return path, tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in params.items() if value is not None
+    ))
+
+
 class Request(object):
 
-    def __init__(self, api_url = 'https://switcheo.org', timeout = 30):
+    def __init__(self, api_url = 'https://switcheo.org', timeout = 30, pooled = True,
+                 pool_maxsize = DEFAULT_POOL_MAXSIZE, session = None, cache = None, coalesce = False,
+                 decoder = None, raw = False, rate_limiter = None, concurrency = None, hooks = None):
+        """
+        :param api_url: The URL for the API endpoint.
+        :param timeout: Request timeout in seconds.
+        :param pooled: Reuse keep-alive connections from a shared session, if False every call opens a new connection.
+        :param pool_maxsize: Maximum number of keep-alive connections per host for the shared session.
+        :param session: Use this requests.Session instead of the shared one.
+        :param cache: Optional tradescan.cache.ResponseCache for GET responses.
+        :param coalesce: Share one round-trip between concurrent identical GET requests.
+        :param decoder: Callable decoding the response body bytes, default orjson.loads if installed else json.loads.
+        :param raw: Return the undecoded response body bytes of GET requests.
+        :param rate_limiter: Optional tradescan.ratelimit.RateLimiter pacing GET requests per node and path.
+        :param concurrency: Optional tradescan.ratelimit.AIMDController limiting GET requests in flight.
+        :param hooks: Callables receiving a tradescan.metrics.RequestEvent for every GET attempt.
+        """
         self.url = api_url.rstrip('/')
         self.timeout = timeout
+        if session is None and pooled:
+            session = get_session(pool_maxsize = pool_maxsize)
+        self.session = session
+        self.http = session or requests
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce else None
+        self.decoder = decoder or DEFAULT_DECODER
+        self.raw = raw
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.hooks = list(hooks or [])
 
-    def get(self, path, params=None):
-        """Perform GET request"""
-        r = requests.get(url=self.url + path, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
+    def get(self, path, params=None, raw=None):
+        """Perform GET request, with raw=True the undecoded response body is returned as bytes"""
+        raw = self.raw if raw is None else raw
+        key = None
+        ttl = self.cache.ttl(path) if self.cache is not None else None
+        if ttl:
+            key = (self.url, raw, request_key(path, params))
+            result = self.cache.get(key)
+            if result is not MISSING:
+                return result
+        if self.single_flight is not None:
+            key = key or (self.url, raw, request_key(path, params))
+            return self.single_flight.do(key, functools.partial(self._get, path, params, raw, key, ttl))
+        return self._get(path, params, raw, key, ttl)
+
+    def _get(self, path, params, raw = False, key = None, ttl = None):
+        r = self._send(path, params)
+        event = getattr(r, 'request_event', None)
+        if event is None:
+            result = r.content if raw else self.decoder(r.content)
+        else:
+            if raw:
+                result = r.content
+            else:
+                start = time.perf_counter()
+                result = self.decoder(r.content)
+                event.decode_time = time.perf_counter() - start
+            self._emit(event)
+        if ttl:
+            self.cache.set(key, result, size=len(r.content), ttl=ttl)
+        return result
+
+    def _send(self, path, params):
+        """Send the GET request and return the checked response"""
+        return self._send_to(self.url, path, params)
+
+    def _send_to(self, url, path, params, retry = False):
+        """Send the GET request to the node at url, paced by the rate limiter and concurrency controller"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url, path)
+        if self.concurrency is None and not self.hooks:
+            r = self.http.get(url=url + path, params=params, timeout=self.timeout)
+            r.raise_for_status()
+            return r
+
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        start = time.perf_counter()
+        r = None
+        overloaded = False
+        try:
+            r = self.http.get(url=url + path, params=params, timeout=self.timeout)
+            r.raise_for_status()
+        except requests.exceptions.RequestException as error:
+            # timeouts, connection errors, 429 and 5xx are caused by the node
+            overloaded = r is None or r.status_code == 429 or r.status_code >= 500
+            self._report(url, path, r, time.perf_counter() - start, retry, error)
+            raise
+        finally:
+            # the slot is given back on every exit, other errors do not count against the node
+            latency = time.perf_counter() - start
+            if self.concurrency is not None:
+                self.concurrency.release(latency, overloaded=overloaded)
+        self._report(url, path, r, latency, retry)
+        return r
+
+    def _report(self, url, path, r, latency, retry, error = None):
+        if self.hooks:
+            event = RequestEvent(node=url, path=path, status=r.status_code if r is not None else None,
+                                 latency=latency, size=len(r.content) if r is not None else 0, error=error,
+                                 retry=retry)
+            if error is None:
+                # emitted by _get once the decode time is known
+                r.request_event = event
+            else:
+                self._emit(event)
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            hook(event)
 
     def post(self, path, data=None, json_data=None, params=None):
         """Perform POST request"""
-        r = requests.post(url=self.url + path, data=data, json=json_data, params=params, timeout=self.timeout)
+        r = self.http.post(url=self.url + path, data=data, json=json_data, params=params, timeout=self.timeout)
         try:
             r.raise_for_status()
         except requests.exceptions.HTTPError:
@@ -30,6 +201,81 @@ class Request(object):
         return r.json()
 
     def status(self):
-        r = requests.get(url=self.url)
+        r = self.http.get(url=self.url)
         r.raise_for_status()
         return r.json()
+
+
+class AsyncRequest(Request):
+    """
+    Asyncio counterpart of Request. get and post are coroutines with the same arguments.
+
+    The blocking calls run on a dedicated thread pool sharing one keep-alive session, at most
+    'max_concurrency' of them are in flight at the same time, further calls wait for a free slot.
+    """
+
+    def __init__(self, api_url = 'https://switcheo.org', timeout = 30, max_concurrency = DEFAULT_MAX_CONCURRENCY,
+                 session = None, cache = None, coalesce = False, decoder = None, raw = False, rate_limiter = None,
+                 concurrency = None, hooks = None):
+        """
+        :param api_url: The URL for the API endpoint.
+        :param timeout: Request timeout in seconds.
+        :param max_concurrency: Maximum number of requests in flight, also used as per-host pool size.
+        :param session: Use this requests.Session instead of the shared one.
+        :param cache: Optional tradescan.cache.ResponseCache for GET responses.
+        :param coalesce: Share one round-trip between concurrent identical GET requests.
+        :param decoder: Callable decoding the response body bytes, default orjson.loads if installed else json.loads.
+        :param raw: Return the undecoded response body bytes of GET requests.
+        :param rate_limiter: Optional tradescan.ratelimit.RateLimiter, waits for a token on a worker thread.
+        :param concurrency: Optional tradescan.ratelimit.AIMDController limiting GET requests in flight.
+        :param hooks: Callables receiving a tradescan.metrics.RequestEvent for every GET attempt.
+        """
+        super(AsyncRequest, self).__init__(api_url = api_url, timeout = timeout, pool_maxsize = max_concurrency,
+                                           session = session, cache = cache, decoder = decoder, raw = raw,
+                                           rate_limiter = rate_limiter, concurrency = concurrency, hooks = hooks)
+        self._init_async(max_concurrency, coalesce)
+
+    def _init_async(self, max_concurrency, coalesce):
+        # coalesced callers wait on the event loop instead of blocking a worker thread
+        self.async_single_flight = AsyncSingleFlight() if coalesce else None
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers = max_concurrency, thread_name_prefix = 'async-request')
+        self._semaphore = None
+        self._loop = None
+
+    def _slot(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives are bound to the loop they are first used on
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, func, *args, **kwargs):
+        async with self._slot():
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get(self, path, params=None, raw=None):
+        """Perform GET request, with raw=True the undecoded response body is returned as bytes"""
+        raw = self.raw if raw is None else raw
+        if self.async_single_flight is not None:
+            return await self.async_single_flight.do(
+                (self.url, raw, request_key(path, params)),
+                functools.partial(self._run, super(AsyncRequest, self).get, path, params=params, raw=raw))
+        return await self._run(super(AsyncRequest, self).get, path, params=params, raw=raw)
+
+    async def post(self, path, data=None, json_data=None, params=None):
+        """Perform POST request"""
+        return await self._run(super(AsyncRequest, self).post, path, data=data, json_data=json_data, params=params)
+
+    async def status(self):
+        return await self._run(super(AsyncRequest, self).status)
+
+    def close(self):
+        """Release the worker threads, pending calls are completed first."""
+        self._executor.shutdown(wait = True)
+
+    async def aclose(self):
+        """Release the worker threads like close, waiting for pending calls without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
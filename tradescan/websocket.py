@@ -0,0 +1,262 @@
+"""
+Description:
+    Minimal RFC 6455 websocket on asyncio streams, enough for JSON-RPC subscriptions: text and binary
+    messages, fragmentation, ping/pong and close. The client side masks its frames, the server side is
+    used by the stub servers.
+Usage:
+    from tradescan.websocket import connect
+
+    websocket = await connect("ws://127.0.0.1:26657/websocket")
+    await websocket.send('{"jsonrpc": "2.0", "method": "subscribe", "id": 1, "params": {"query": "tm.event=\'NewBlock\'"}}')
+    message = await websocket.recv()
+    await websocket.close()
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+
+from typing import Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+class WebSocketError(Exception):
+    """
+    Handshake or protocol failure.
+    """
+
+
+class ConnectionClosed(WebSocketError):
+    """
+    The connection was closed by a close frame or the underlying stream.
+    """
+
+    def __init__(self, code: Optional[int] = None, reason: str = ''):
+        super(ConnectionClosed, self).__init__(f"Connection closed with code {code} {reason}".strip())
+        self.code = code
+        self.reason = reason
+
+
+def accept_key(key: str) -> str:
+    """
+    Sec-WebSocket-Accept answer of a Sec-WebSocket-Key.
+    """
+    return base64.b64encode(hashlib.sha1((key + GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def _mask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    # xor all bytes at once as big integers instead of byte by byte
+    repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(payload), 'big')
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool, fin: bool = True) -> bytes:
+    """
+    Serialize a single frame.
+
+    :param opcode: frame opcode.
+    :param payload: frame payload.
+    :param mask: mask the payload, required for frames sent by clients.
+    :param fin: last frame of a message.
+    :return: bytes
+    """
+    head = bytearray([(0x80 if fin else 0) | opcode])
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        head.append(mask_bit | length)
+    elif length < 1 << 16:
+        head.append(mask_bit | 126)
+        head += struct.pack('!H', length)
+    else:
+        head.append(mask_bit | 127)
+        head += struct.pack('!Q', length)
+    if mask:
+        key = os.urandom(4)
+        return bytes(head) + key + _mask(payload, key)
+    return bytes(head) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[bool, int, bytes]:
+    """
+    Read a single frame.
+
+    :return: tuple of fin, opcode and unmasked payload
+    """
+    try:
+        first, second = await reader.readexactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack('!H', await reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack('!Q', await reader.readexactly(8))
+        if length > MAX_MESSAGE_SIZE:
+            raise WebSocketError(f"Frame of {length} bytes exceeds the limit of {MAX_MESSAGE_SIZE} bytes.")
+        key = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError) as error:
+        raise ConnectionClosed(reason=str(error)) from error
+    if key is not None:
+        payload = _mask(payload, key)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Tuple[str, dict]:
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError) as error:
+        raise WebSocketError(f"Incomplete handshake: {error}") from error
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+class WebSocket(object):
+    """
+    Open websocket connection. recv answers pings on its own and assembles fragmented messages.
+    Only one coroutine should call recv at a time, send can be called concurrently.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client: bool):
+        self.reader = reader
+        self.writer = writer
+        self.client = client
+        self.closed: bool = False
+        self._write_lock = asyncio.Lock()
+
+    async def _write(self, opcode: int, payload: bytes) -> None:
+        if self.closed and opcode != OPCODE_CLOSE:
+            raise ConnectionClosed(reason='connection already closed')
+        async with self._write_lock:
+            try:
+                self.writer.write(encode_frame(opcode, payload, mask=self.client))
+                await self.writer.drain()
+            except ConnectionError as error:
+                self.closed = True
+                raise ConnectionClosed(reason=str(error)) from error
+
+    async def send(self, message: Union[str, bytes]) -> None:
+        """
+        Send a text message for str and a binary one for bytes.
+        """
+        if isinstance(message, str):
+            await self._write(OPCODE_TEXT, message.encode('utf-8'))
+        else:
+            await self._write(OPCODE_BINARY, bytes(message))
+
+    async def ping(self, payload: bytes = b'') -> None:
+        await self._write(OPCODE_PING, payload)
+
+    async def recv(self) -> Union[str, bytes]:
+        """
+        Wait for the next text or binary message.
+
+        :raises ConnectionClosed: if a close frame arrives or the stream ends.
+        :return: str for text and bytes for binary messages
+        """
+        opcode = None
+        fragments = []
+        while True:
+            fin, frame_opcode, payload = await read_frame(self.reader)
+            if frame_opcode == OPCODE_PING:
+                await self._write(OPCODE_PONG, payload)
+                continue
+            if frame_opcode == OPCODE_PONG:
+                continue
+            if frame_opcode == OPCODE_CLOSE:
+                code = struct.unpack('!H', payload[:2])[0] if len(payload) >= 2 else None
+                if not self.closed:
+                    await self.close(code or 1000)
+                raise ConnectionClosed(code, payload[2:].decode('utf-8', 'replace'))
+            if frame_opcode != OPCODE_CONTINUATION:
+                opcode = frame_opcode
+            fragments.append(payload)
+            if fin:
+                message = b''.join(fragments)
+                return message.decode('utf-8') if opcode == OPCODE_TEXT else message
+
+    async def close(self, code: int = 1000, reason: str = '') -> None:
+        """
+        Send a close frame and close the stream.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._write(OPCODE_CLOSE, struct.pack('!H', code) + reason.encode('utf-8'))
+        except ConnectionClosed:
+            pass
+        self.writer.close()
+
+
+async def connect(uri: str, timeout: float = 10) -> WebSocket:
+    """
+    Open a client connection to a ws:// or wss:// URI.
+
+    :param uri: websocket URI, eg. 'ws://127.0.0.1:26657/websocket'.
+    :param timeout: seconds for connecting and the handshake.
+    :return: WebSocket
+    """
+    url = urlsplit(uri)
+    if url.scheme not in ('ws', 'wss'):
+        raise WebSocketError(f"Unsupported scheme {url.scheme}, use ws or wss.")
+    port = url.port or (443 if url.scheme == 'wss' else 80)
+    path = (url.path or '/') + (f"?{url.query}" if url.query else '')
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(url.hostname, port, ssl=url.scheme == 'wss'), timeout)
+    key = base64.b64encode(os.urandom(16)).decode('ascii')
+    writer.write((f"GET {path} HTTP/1.1\r\n"
+                  f"Host: {url.hostname}:{port}\r\n"
+                  "Upgrade: websocket\r\n"
+                  "Connection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\n"
+                  "Sec-WebSocket-Version: 13\r\n\r\n").encode('ascii'))
+    try:
+        status, headers = await asyncio.wait_for(_read_headers(reader), timeout)
+    except (asyncio.TimeoutError, WebSocketError):
+        writer.close()
+        raise
+    if status.split(' ')[1:2] != ['101'] or headers.get('sec-websocket-accept') != accept_key(key):
+        writer.close()
+        raise WebSocketError(f"Websocket handshake failed: {status}")
+    return WebSocket(reader, writer, client=True)
+
+
+async def accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[WebSocket]:
+    """
+    Answer the handshake of an incoming connection, used by the stub servers.
+
+    :return: WebSocket or None if the request was no websocket upgrade
+    """
+    _, headers = await _read_headers(reader)
+    key = headers.get('sec-websocket-key')
+    if key is None or headers.get('upgrade', '').lower() != 'websocket':
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        writer.close()
+        return None
+    writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                  "Upgrade: websocket\r\n"
+                  "Connection: Upgrade\r\n"
+                  f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n").encode('ascii'))
+    await writer.drain()
+    return WebSocket(reader, writer, client=False)